@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# coding=utf-8
+import sys
+from os.path import exists as file_exists
+
+import pygame as pg
+
+from pysurvive.map.cache import LevelCache
+
+
+def main() -> None:
+    """
+    Script expect 1 or more positional arguments:
+        * The map files to compile into the level cache.
+    """
+    args = sys.argv[1:]
+    if not args:
+        print("ERROR: Invalid number of arguments.")
+        sys.exit(1)
+
+    for map_file in args:
+        if not file_exists(map_file):
+            print(f"Map file {map_file} doesnt exists.")
+            sys.exit(1)
+
+        print("Compiling map file", map_file)
+        compiled = LevelCache(map_file).compile()
+        print(compiled)
+
+
+if __name__ == "__main__":
+    pg.init()
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# coding=utf-8
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
+
+import pygame as pg
+
+from pysurvive.config import ASSET_LOADER_WORKERS
+from pysurvive.logger import Logger
+from pysurvive.player.misc import Spritesheet
+from pysurvive.utils import NoneSound
+
+logger = Logger()
+
+
+def _load_image_data(filename: str) -> tuple[bytes, tuple[int, int]]:
+    """Decode an image in a worker process. Returns the RGBA pixel data."""
+    image = pg.image.load(filename)
+    return pg.image.tobytes(image, "RGBA"), image.get_size()
+
+
+def _load_file_data(filename: str) -> bytes:
+    """Read a (sound) file in a worker process."""
+    with open(filename, "rb") as file:
+        return file.read()
+
+
+def _image_from_data(data: tuple[bytes, tuple[int, int]]) -> pg.surface.Surface:
+    """Create the surface from the pixel data of a worker process."""
+    buffer, size = data
+    return pg.image.frombuffer(buffer, size, "RGBA")
+
+
+def _spritesheet_from_data(spritesheet: Spritesheet) -> Spritesheet:
+    """Map the frames of a spritesheet from the frame buffer of a worker."""
+    spritesheet.attach()
+    return spritesheet
+
+
+def _discard_spritesheet(spritesheet: Spritesheet) -> None:
+    """Remove the frame buffer of a spritesheet that is never attached."""
+    spritesheet.discard()
+
+
+def _sound_from_data(data: bytes) -> Union[pg.mixer.Sound, NoneSound]:
+    """Create the sound from the file content of a worker process."""
+    if not pg.mixer or not pg.mixer.get_init():
+        return NoneSound()
+    return pg.mixer.Sound(file=io.BytesIO(data))
+
+
+class AssetFuture:
+
+    """
+    Future of a requested asset. The result of the worker is post-processed
+    (e.g. the surface is restored from the pixel data) by the first call of
+    result(), so pygame is only used by the calling thread and never by
+    the result thread of the worker pool.
+    """
+
+    def __init__(
+        self,
+        future: Future,
+        postprocess: Callable[[Any], Any],
+        on_error: Callable[[Exception], None],
+        release: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self.future = future
+        self.postprocess = postprocess
+        self.on_error = on_error
+        # Releases the resources of a result that is never post-processed.
+        self.release = release
+        self.lock = threading.Lock()
+        self.processed = False
+        self.value: Any = None
+
+    def __repr__(self) -> str:
+        return f"AssetFuture(done={self.done()}, processed={self.processed})"
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self) -> bool:
+        return self.future.cancel()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the worker and returns the post-processed asset.
+        Raises the error of the worker or of the post-processing.
+        """
+        with self.lock:
+            if not self.processed:
+                try:
+                    self.value = self.postprocess(self.future.result(timeout))
+                except TimeoutError:
+                    raise
+                except Exception as error:
+                    self.on_error(error)
+                    raise
+                self.processed = True
+            return self.value
+
+    def discard(self) -> None:
+        """
+        Release the result of the worker if it hasn't been post-processed
+        (e.g. remove the frame buffer of a spritesheet). The future is
+        cancelled afterwards.
+        """
+        with self.lock:
+            if self.processed:
+                return
+            if (
+                self.release is not None
+                and self.future.done()
+                and not self.future.cancelled()
+                and self.future.exception() is None
+            ):
+                self.release(self.future.result())
+            self.future.cancel()
+            if not self.future.cancelled():
+                self.future = Future()
+                self.future.cancel()
+
+
+class AssetLoader:
+
+    """
+    Central service to load assets (spritesheets, tileset images, sounds)
+    in parallel. All requests share one long-lived worker pool, so the
+    process spawn cost is paid only once at startup.
+
+    The workers are spawned (not forked), because the pool is started
+    lazily, when the game may already run other threads and hold the
+    state of pygame/SDL, which must not be copied into the workers.
+
+    Every request returns a future. Identical requests (same kind of asset
+    and path) return the same future, so an asset is loaded only once.
+    The results of the workers are post-processed (e.g. the surfaces are
+    restored from the pixel data) by the caller of result() (see
+    AssetFuture).
+    """
+
+    _loader = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._loader is None:
+            cls._loader = super().__new__(cls, *args, **kwargs)
+            cls._loader.workers = ASSET_LOADER_WORKERS
+            cls._loader.executor = None
+            cls._loader.futures = {}
+            cls._loader.lock = threading.Lock()
+
+        return cls._loader
+
+    def __repr__(self) -> str:
+        return f"AssetLoader(workers={self.workers}, assets={len(self.futures)})"
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Returns the worker pool and start it on the first request."""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(
+                "Started asset loader with %s workers.",
+                self.workers or os.cpu_count(),
+            )
+        return self.executor
+
+    def _submit(
+        self,
+        key: tuple[Any, ...],
+        function: Callable,
+        postprocess: Callable[[Any], Any],
+        *args: Any,
+        release: Optional[Callable[[Any], None]] = None,
+    ) -> AssetFuture:
+        """
+        Submit a load request to the worker pool.
+        Returns the existing future if the asset is already requested.
+        """
+
+        def _on_error(error: Exception) -> None:
+            logger.warning("Error while loading asset %s: %s", key[1], error)
+            # Allow to request the asset again.
+            with self.lock:
+                if self.futures.get(key) is future:
+                    self.futures.pop(key)
+
+        with self.lock:
+            future = self.futures.get(key)
+            if future is not None:
+                return future
+
+            future = AssetFuture(
+                self._get_executor().submit(function, *args),
+                postprocess,
+                _on_error,
+                release,
+            )
+            self.futures[key] = future
+
+        return future
+
+    def load_spritesheet(
+        self, spritesheet_path: str, sprite_size: int = 512
+    ) -> AssetFuture:
+        """Request a spritesheet (see Spritesheet)."""
+        return self._submit(
+            ("spritesheet", spritesheet_path, sprite_size),
+            Spritesheet,
+            _spritesheet_from_data,
+            spritesheet_path,
+            sprite_size,
+            release=_discard_spritesheet,
+        )
+
+    def load_spritesheets(
+        self, spritesheet_paths: Iterable[str], sprite_size: int = 512
+    ) -> list[AssetFuture]:
+        """Request multiple spritesheets at once."""
+        return [self.load_spritesheet(path, sprite_size) for path in spritesheet_paths]
+
+    def load_image(self, filename: Union[str, Path]) -> AssetFuture:
+        """
+        Request an image (e.g. a tileset). The surface is not converted,
+        because this has to be done with the display of the main process.
+        """
+        filename = os.path.abspath(filename)
+        return self._submit(
+            ("image", filename), _load_image_data, _image_from_data, filename
+        )
+
+    def load_images(self, filenames: Iterable[Union[str, Path]]) -> list[AssetFuture]:
+        """Request multiple images at once."""
+        return [self.load_image(filename) for filename in filenames]
+
+    def load_sound(self, filename: Union[str, Path]) -> AssetFuture:
+        """Request a sound. Returns a NoneSound if the mixer is not available."""
+        filename = os.path.abspath(filename)
+        return self._submit(
+            ("sound", filename), _load_file_data, _sound_from_data, filename
+        )
+
+    def load_sounds(self, filenames: Iterable[Union[str, Path]]) -> list[AssetFuture]:
+        """Request multiple sounds at once."""
+        return [self.load_sound(filename) for filename in filenames]
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker pool. It is started again on the next request.
+        Requests that haven't been collected are dropped and their results
+        released (e.g. the frame buffers of the spritesheets).
+        """
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True, cancel_futures=True)
+                self.executor = None
+            dropped = [
+                self.futures.pop(key)
+                for key, future in list(self.futures.items())
+                if not future.processed
+            ]
+        # Outside of the lock, since a failing result() takes the lock too.
+        for future in dropped:
+            future.discard()
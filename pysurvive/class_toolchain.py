@@ -3,6 +3,7 @@
 import math
 from typing import Optional
 
+import numpy as np
 import pygame as pg
 
 
@@ -23,6 +24,73 @@ class LineSegment:
         return ((self.x1, self.y1), (self.x2, self.y2))
 
 
+def get_segment_array(walls) -> np.ndarray:
+    """
+    Returns the line segments of all walls as (N, 4) array
+    with x1, y1, x2, y2 per row.
+    """
+    segments = [
+        (segment.x1, segment.y1, segment.x2, segment.y2)
+        for wall in walls
+        for segment in wall.segments
+    ]
+    return np.array(segments, dtype=np.float64).reshape(-1, 4)
+
+
+def intersect_rays(
+    x0: float, y0: float, angles: np.ndarray, segments: np.ndarray, closest=True
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Intersect all rays starting at x0, y0 with all line segments at once
+    (see Ray.calc_intersection).
+
+    :param angles: Angles of the rays.
+    :param segments: Line segments as (N, 4) array (see get_segment_array).
+    :param closest: If true returns the clostest intersect. If false
+                    returns the farthest.
+    :return: Return the x, y coordinates and the param (distance) of the
+             intersect per ray. The param is inf (x, y are nan) if the ray
+             doesn't hit any segment.
+    :rtype: Tuple of arrays
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    # rays in parametric: point + direction * T1
+    dx = np.cos(angles)[:, np.newaxis]
+    dy = np.sin(angles)[:, np.newaxis]
+    # segments in parametric: point + direction * T2
+    segment_x1 = segments[:, 0]
+    segment_y1 = segments[:, 1]
+    segment_dx = segments[:, 2] - segment_x1
+    segment_dy = segments[:, 3] - segment_y1
+
+    # Solve point + direction * T1 = segment point + segment direction * T2
+    # for all pairs of ray and segment. A denominator of zero means that
+    # they are parallel, so no intersect.
+    denominator = segment_dx * dy - segment_dy * dx
+    wx = segment_x1 - x0
+    wy = segment_y1 - y0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        T1 = (wy * segment_dx - wx * segment_dy) / denominator
+        T2 = (dx * wy - dy * wx) / denominator
+
+    # Must be within parametic whatevers for ray / segment
+    hit = (denominator != 0) & (T1 >= 0) & (T2 >= 0) & (T2 <= 1)
+    if closest:
+        params = np.where(hit, T1, np.inf).min(axis=1, initial=np.inf)
+    else:
+        params = np.where(hit, T1, -np.inf).max(axis=1, initial=-np.inf)
+        params[params == -np.inf] = np.inf
+
+    with np.errstate(invalid="ignore"):
+        xs = x0 + dx[:, 0] * params
+        ys = y0 + dy[:, 0] * params
+    missed = np.isinf(params)
+    xs[missed] = np.nan
+    ys[missed] = np.nan
+
+    return xs, ys, params
+
+
 class Block(pg.sprite.Sprite):
 
     """
@@ -19,6 +19,42 @@ SOUND_DIR = ASSETS_DIR + "/sound"
 FPS = 30  # Frame per seconds
 SCREEN_RECT = pg.Rect(0, 0, 1200, 800)
 
+# Map settings
+SPATIAL_GRID_CELL_SIZE = 256  # Cell size (in pixel) of the spatial hash grids
+TILE_STORAGE = "sprites"  # Storage mode of the tiles ("sprites" or "array")
+TILE_CACHE_SIZE = 4096  # Max. number of materialized tiles (storage mode "array")
+CHUNK_SIZE = 512  # Size (in pixel) of the pre-rendered map chunks
+CHUNK_CACHE_BUDGET = 64 * 1024 * 1024  # Memory budget (in byte) of the chunk cache
+
+# Navmesh settings
+NAVMESH_CELL_SIZE = 128  # Cell size (in pixel) of the triangle point location grid
+NAVMESH_AGENT_RADIUS = 16  # Distance (in pixel) of the path corners to the walls
+NAVMESH_CHUNK_SIZE = 256  # Size (in pixel) of the separately triangulated chunks
+NAVMESH_CLUSTER_SIZE = 512  # Size (in pixel) of the clusters of the hierarchical search
+PATH_SERVICE_BUDGET = 0.004  # Time (in seconds) per frame for path searches
+
+# Visibility settings
+VISIBILITY_SECTORS = 32  # Number of angular sectors that are solved separately
+VISIBILITY_QUANTUM = 1  # Viewer movement (in pixel) that reuses the last polygon
+
+# Lighting settings
+LIGHTMAP_SCALE = 4  # Downscale factor of the light buffer to the screen
+LIGHTMAP_AMBIENT = (40, 40, 48)  # Light color of the areas without any light
+LIGHTMAP_BUDGET = 0.004  # Render time (in seconds) of all lights per frame
+LIGHTMAP_MAX_REDUCTION = 2  # Max. number of halvings of the resolution of a light
+LIGHT_TEXTURE_CACHE_SIZE = 64  # Max. number of cached gradient textures
+LIGHT_DIRECTION_STEPS = 64  # Number of cached directions of the cone lights
+FLASHLIGHT_RADIUS = 600  # Range (in pixel) of the flashlight of the player
+FLASHLIGHT_SPREAD = 60  # Opening angle (in degree) of the flashlight of the player
+
+# Asset settings
+ASSET_LOADER_WORKERS = None  # Number of asset loader processes (None = CPU count)
+
+# Sprite settings
+ROTATION_STEP = 2  # Step (in degree) of the cached rotations of the sprites
+ROTATION_CACHE_BUDGET = 64 * 1024 * 1024  # Memory budget (in byte) of the rotations
+ROTATION_CACHE_PREFILL = False  # Fill the rotation cache in a background thread
+
 # Define the colors we will use in RGB format.
 COLORKEY = (255, 0, 255)
 WHITE = (255, 255, 255)
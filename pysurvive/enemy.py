@@ -41,7 +41,8 @@ class Enemy(Animation):
         self.y = _y
         self.angle = math.pi
 
-        self.path = None
+        # Last known triangle of the navmesh (hint for the next lookup).
+        self.triangle = None
 
         # for movement in self.movements:
         #     _images = []
@@ -114,10 +115,19 @@ class Enemy(Animation):
         self.rotate(self.angle)
 
     def move(self) -> None:
-        # Get the path to the player position.
-        self.path = self.game.navmesh.get_astar_path(
-            (self.x, self.y), (self.game.get_player_pos())
+        # Follow the flow field towards the player position. The field is
+        # shared by all enemies and only recomputed if the player entered
+        # another triangle of the navmesh.
+        navmesh = self.game.navmesh
+        navmesh.update_flow_field(self.game.get_player_pos())
+        direction, self.triangle = navmesh.get_flow_direction(
+            (self.x, self.y), self.triangle
         )
+        if direction == (0.0, 0.0):
+            # The player has been reached or can't be reached.
+            self.movement_index = 0
+            return
+        self.angle = math.atan2(direction[1], direction[0])
 
         self.movement_index = 1
         # Get the move vector based in the angle
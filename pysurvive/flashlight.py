@@ -2,35 +2,61 @@
 # coding=utf-8
 import math
 
+import numpy as np
 import pygame as pg
 
-from pysurvive.class_toolchain import Ray
+from pysurvive.class_toolchain import Ray, intersect_rays
 from pysurvive.config import COLORKEY, RED_LIGHT
+from pysurvive.visibility import VisibilityCache
 
 
 class Flashlight:
 
-    rays = []  # type: ignore
+    visibility = []  # type: ignore
 
     def __init__(self, _player, _x0, _y0):
         self.player = _player
         self.x0 = _x0
         self.y0 = _y0
 
+        # Occluder segments on the screen (see _get_segments).
+        self.segments = None
+        self.segments_key = None
+        self.visibility_cache = VisibilityCache()
+
         self.update(_x0, _y0)
 
     def update(self, _x0, _y0):
         self.x0 = _x0
         self.y0 = _y0
 
-        # Update the single rays of the current view
-        self.rays = self._get_sight_rays(self.x0, self.y0)
-        for ray in self.rays:
-            ray.update(self.x0, self.y0)
+        # Update the visibility polygon of the current view (screen). The
+        # last polygon is reused if the player (almost) stands still.
+        self.visibility = self.visibility_cache.get_polygon(
+            (self.x0, self.y0),
+            self._get_segments(),
+            self.player.game.camera.rect,
+            self.player.game.level.occluders.version,
+        )
+
+    def _get_segments(self):
+        """
+        Returns the occluder segments of the level on the screen
+        as (N, 4) array (see OccluderGroup). The segments are only
+        queried again if the screen or the occluders changed.
+        """
+        occluders = self.player.game.level.occluders
+        rect = self.player.game.camera.rect
+        key = (tuple(rect), occluders.version)
+        if key != self.segments_key:
+            self.segments = occluders.get_segments(rect)
+            self.segments_key = key
+
+        return self.segments
 
     def _get_sight_rays(self, _x0, _y0):
         """
-        Returns a list with all rays towards to the unique block points
+        Returns a list with all rays towards to the segment end points
         and within the player vision range based on x0 and y0.
 
         :return rays: List of rays
@@ -44,7 +70,7 @@ class Flashlight:
         # are needed to hit the wall/block(s) behind any given segment corner.
         # unique_angles = [ray1.angle, ray2.angle]
         unique_angles = []
-        for point in self.player.game.get_block_points_on_screen():
+        for point in self._get_segments().reshape(-1, 2).tolist():
             # point = (point[0], point[1])
             # Build the triangle from x0, y0 (player position) and both
             # farthest intersections with the walls.
@@ -61,14 +87,16 @@ class Flashlight:
             unique_angles.append(angle + 0.00001)
 
         # With the resulting angles we can now calculate the intersection
-        # between block and ray.
-        for angle in unique_angles:
+        # between segment and ray (all rays at once).
+        xs, ys, params = intersect_rays(
+            _x0, _y0, np.array(unique_angles), self._get_segments()
+        )
+        for angle, x, y, param in zip(unique_angles, xs, ys, params):
+            if math.isinf(param):
+                continue
             ray = LightRay(_x0, _y0, angle)
-            ray.intersect = ray.get_intersection(
-                self.player.game.block_sprites.sprites()
-            )
-            if ray.intersect:
-                rays.append(ray)
+            ray.intersect = {"x": int(x), "y": int(y), "param": float(param)}
+            rays.append(ray)
 
         # Sort the rays by angle
         rays.sort(key=lambda x: x.angle)
@@ -137,50 +165,17 @@ class Flashlight:
     #     # All the signs must be positive or all negative
     #     return (side_1 < 0.0) == (side_2 < 0.0) == (side_3 < 0.0)
 
-    def _get_sight_polygon(self, _rays):
+    def _get_sight_polygon(self, _visibility):
         """
-        This returns a list with all points represented the view (flashlight).
-
-        In some cases, the start and end point of the polygon must be varied.
-        This becomes necessary when the individual rays of light are in the
-        first as well as 4 quadrants. By modifying the start or end point,
-        the points of the polygon are drawn in the correct order.
+        This returns a list with all points represented the view (flashlight)
+        moved by the offset of the game world.
 
+        :param _visibility: Visibility polygon (see VisibilityCache).
         :return polygon: List of points of the view (flashlight).
         :rtype: List
         """
-        polygon = []
-        # append_origin = False
-        # init_ray = None
-        # ray_prev = None
-        # for i, ray in enumerate(_rays):
-        #     if i == 0:
-        #         init_ray = ray
-        #         polygon.append((ray.intersect['x'], ray.intersect['y']))
-        #     else:
-        #         if abs(ray.angle - ray_prev.angle) > self.light_range:
-        #             polygon.append((self.x0, self.y0))
-        #             append_origin = True
-        #         polygon.append(
-        #             (ray.intersect['x'], ray.intersect['y']))
-
-        #     ray_prev = ray
-
-        # if append_origin:
-        #     polygon.append(
-        #         (init_ray.intersect['x'], init_ray.intersect['y']))
-        # else:
-        #     polygon.append((self.x0, self.y0))
-
-        for ray in _rays:
-            polygon.append(
-                (
-                    ray.intersect["x"] - self.player.game.get_offset()[0],
-                    ray.intersect["y"] - self.player.game.get_offset()[1],
-                )
-            )
-
-        return polygon
+        offset = self.player.game.camera.offset
+        return [(x - offset[0], y - offset[1]) for x, y in _visibility]
 
     def draw(self, screen):
 
@@ -190,7 +185,11 @@ class Flashlight:
         # while angle < (math.pi * 2):
         #     dx = math.cos(angle) * fuzzy_radius
         #     dy = math.sin(angle) * fuzzy_radius
-        #     polygons.append(self._get_sight_rays(self.x0 + dx, self.y0 + dy))
+        #     polygons.append(
+        #         get_visibility_polygon(
+        #             (self.x0 + dx, self.y0 + dy), self._get_segments()
+        #         )
+        #     )
         #     angle += math.pi * 2 / 10
 
         # c = 10
@@ -201,15 +200,15 @@ class Flashlight:
         #         pg.draw.polygon(screen, (c, c, c), p_shadow)
 
         # Draw the sight polygon and the view circle
-        polygon = self._get_sight_polygon(self.rays)
+        polygon = self._get_sight_polygon(self.visibility)
         if len(polygon) > 2:
             pg.draw.polygon(screen, COLORKEY, polygon)
 
-        # for ray in self.rays:
+        # for ray in self._get_sight_rays(self.x0, self.y0):
         #     ray.draw(screen,
         #              self.player.virt_x,
         #              self.player.virt_y,
-        #              self.player.game.get_offset())
+        #              self.player.game.camera.offset)
 
 
 class LightRay(Ray):
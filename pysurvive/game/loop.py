@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 # coding=utf-8
+import math
 import time
 
 import pygame as pg
@@ -12,10 +13,21 @@ from pygame.locals import (
     QUIT,
 )
 
-from pysurvive.config import FPS, GRAY_LIGHT2, MAP_DIR, SCREEN_RECT
+from pysurvive.assets import AssetLoader
+from pysurvive.config import (
+    FLASHLIGHT_RADIUS,
+    FLASHLIGHT_SPREAD,
+    FPS,
+    GRAY_LIGHT2,
+    MAP_DIR,
+    SCREEN_RECT,
+)
 from pysurvive.game.core import Camera
+from pysurvive.lighting import Light, LightMap
 from pysurvive.logger import Logger
 from pysurvive.map.level import Level
+from pysurvive.navmesh.mesh import NavMesh
+from pysurvive.navmesh.service import PathService
 from pysurvive.player.player import PlayerGroup
 from pysurvive.player.viewpoint import Viewpoint
 
@@ -50,11 +62,22 @@ class Game:
         self.interface = pg.sprite.Group()
 
         self.level = Level(f"{MAP_DIR}/map.json")
+        self.navmesh = NavMesh(self.level)
+        self.path_service = PathService(self.navmesh)
         self.viewpoint = Viewpoint(self.interface)
         self.player_sprites = PlayerGroup(
             camera=self.camera,
             viewpoint=self.viewpoint,
         )
+        self.lighting = LightMap()
+        self.flashlight = Light(
+            self.player_sprites.player.x,
+            self.player_sprites.player.y,
+            radius=FLASHLIGHT_RADIUS,
+            spread=math.radians(FLASHLIGHT_SPREAD),
+            priority=1,
+        )
+        self.lighting.add(self.flashlight)
 
     def start(self) -> None:
         """
@@ -86,8 +109,13 @@ class Game:
             #
 
             self.level.update(self.camera)
+            self.path_service.update()
             self.player_sprites.update(dt, self.level)
             self.interface.update()
+            self.flashlight.x = self.player_sprites.player.x
+            self.flashlight.y = self.player_sprites.player.y
+            self.flashlight.direction = self.player_sprites.player.angle
+            self.lighting.update(dt)
 
             #
             # Drawing
@@ -95,6 +123,7 @@ class Game:
 
             self.level.draw(self.window_surface, self.camera)
             self.player_sprites.draw(self.window_surface, self.camera)
+            self.lighting.draw(self.window_surface, self.camera, self.level.occluders)
             self.interface.draw(self.window_surface)
 
             # Go ahead and update the window surface with what we've drawn.
@@ -102,3 +131,7 @@ class Game:
             pg.display.flip()
             # This limits the while loop to a max of FPS times per second.
             self.clock.tick(FPS)
+
+        # Stop the path worker and the worker processes of the asset loader.
+        self.path_service.shutdown()
+        AssetLoader().shutdown()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import pygame as pg
+
+from pysurvive.config import (
+    BLACK,
+    LIGHT_DIRECTION_STEPS,
+    LIGHT_TEXTURE_CACHE_SIZE,
+    LIGHTMAP_AMBIENT,
+    LIGHTMAP_BUDGET,
+    LIGHTMAP_MAX_REDUCTION,
+    LIGHTMAP_SCALE,
+    SCREEN_RECT,
+    WHITE,
+)
+from pysurvive.game.core import Camera
+from pysurvive.map.occluders import OccluderGroup
+from pysurvive.visibility import VisibilityCache
+
+Color = tuple[int, int, int]
+
+
+def get_gradient(
+    size: int,
+    color: Color,
+    direction: Optional[float] = None,
+    spread: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Returns the radial gradient of a light as (size, size, 3) array
+    (indexed by x and y, see pg.surfarray). The light falls off
+    quadratically from the center to the border of the circle.
+
+    Args:
+        size (int): Width and height (in pixel) of the gradient.
+        color (tuple[int, int, int]): The color at the center.
+        direction (float): Direction (radian) of a cone light.
+        spread (float): Opening angle (radian) of a cone light. Without a
+            spread the light is a point light.
+
+    Returns:
+        Gradient (np.ndarray): The gradient as uint8 array.
+    """
+    center = (np.arange(size) + 0.5 - size / 2) / (size / 2)
+    xs, ys = center[:, np.newaxis], center[np.newaxis, :]
+    intensity = np.clip(1 - np.hypot(xs, ys), 0, 1) ** 2
+    if spread is not None and direction is not None:
+        angles = np.arctan2(ys, xs)
+        deviation = np.abs((angles - direction + math.pi) % (2 * math.pi) - math.pi)
+        # Soft edge of the cone, which fades out within ~6 degree.
+        intensity *= np.clip((spread / 2 - deviation) / 0.1 + 0.5, 0, 1)
+
+    return (intensity[..., np.newaxis] * np.asarray(color)).astype(np.uint8)
+
+
+class Light:
+
+    """
+    Point light (e.g. a lamp or a muzzle flash) or cone light (e.g. the
+    flashlight) if a spread is set. Every light keeps its own visibility
+    cache, so a static light never sweeps again and a moving light only
+    sweeps the sectors that changed.
+    """
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        color: Color = WHITE,
+        direction: float = 0.0,
+        spread: Optional[float] = None,
+        priority: int = 0,
+        duration: Optional[float] = None,
+    ) -> None:
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.color = color
+        # Direction and opening angle (radian) of a cone light.
+        self.direction = direction
+        self.spread = spread
+        # Lights with a higher priority keep their resolution longer.
+        self.priority = priority
+        # Remaining lifetime (in seconds) of short-lived lights.
+        self.duration = duration
+        # Number of halvings of the resolution (see LightMap).
+        self.reduction = 0
+        self.visibility = VisibilityCache()
+        # Occluder segments within the region by (region, version).
+        self.segments_key: Optional[tuple] = None
+        self.segments = np.zeros((0, 4))
+
+    def __repr__(self) -> str:
+        return f"Light(x={self.x}, y={self.y}, radius={self.radius})"
+
+    @property
+    def rect(self) -> pg.FRect:
+        """Returns the rect lit by the light."""
+        return pg.FRect(
+            self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2
+        )
+
+    @property
+    def region(self) -> pg.FRect:
+        """
+        Returns the rect snapped to a grid of the size of the radius. The
+        region is the bounds of the visibility polygon and only changes if
+        the light moves into another cell, so the visibility cache can
+        reuse the sectors of the last polygon.
+        """
+        left = math.floor((self.x - self.radius) / self.radius) * self.radius
+        top = math.floor((self.y - self.radius) / self.radius) * self.radius
+        right = math.ceil((self.x + self.radius) / self.radius) * self.radius
+        bottom = math.ceil((self.y + self.radius) / self.radius) * self.radius
+        return pg.FRect(left, top, right - left, bottom - top)
+
+
+class LightMap:
+
+    """
+    Renders any number of lights into a light buffer of a reduced
+    resolution, which is composited with the screen in a single blit.
+
+    Each light is the visibility polygon of the light (the shadow mask)
+    multiplied with a cached radial gradient texture and added to the
+    buffer, which starts with the ambient light. The buffer is scaled to
+    the screen and multiplied with it, so areas without any light get
+    darker.
+
+    If the lights take longer than the budget, the resolution of the
+    least important lights is halved (up to the max. reduction), and
+    raised again once there is enough time left.
+    """
+
+    def __init__(
+        self,
+        size: tuple[int, int] = SCREEN_RECT.size,
+        scale: int = LIGHTMAP_SCALE,
+        ambient: Color = LIGHTMAP_AMBIENT,
+        budget: float = LIGHTMAP_BUDGET,
+        max_reduction: int = LIGHTMAP_MAX_REDUCTION,
+        texture_cache_size: int = LIGHT_TEXTURE_CACHE_SIZE,
+    ) -> None:
+        self.size = size
+        self.scale = scale
+        self.ambient = ambient
+        self.budget = budget
+        self.max_reduction = max_reduction
+        self.texture_cache_size = texture_cache_size
+        self.lights: list[Light] = []
+        self.buffer = pg.Surface((max(1, size[0] // scale), max(1, size[1] // scale)))
+        self.scaled_buffer = pg.Surface(size)
+        # Gradient textures by (size, color, direction step, spread).
+        self.textures: OrderedDict[tuple, pg.surface.Surface] = OrderedDict()
+        # Reused shadow masks by their size.
+        self.masks: dict[int, pg.surface.Surface] = {}
+        # Render time (in seconds) of the last frame.
+        self.elapsed = 0.0
+        # Number of halvings spread over the lights (see _update_reduction).
+        self.pressure = 0
+
+    def __repr__(self) -> str:
+        return f"LightMap(lights={len(self.lights)}, pressure={self.pressure})"
+
+    def add(self, light: Light) -> None:
+        self.lights.append(light)
+
+    def remove(self, light: Light) -> None:
+        self.lights.remove(light)
+
+    def update(self, dt: float) -> None:
+        """Remove the short-lived lights (e.g. muzzle flashes) that expired."""
+        for light in self.lights:
+            if light.duration is not None:
+                light.duration -= dt
+        self.lights = [
+            light
+            for light in self.lights
+            if light.duration is None or light.duration > 0
+        ]
+
+    def get_texture(self, size: int, light: Light) -> pg.surface.Surface:
+        """
+        Returns the gradient texture of the light (of the size in pixel).
+        The direction of a cone light is rounded to one of the cached
+        directions.
+        """
+        step = None
+        if light.spread is not None:
+            step = round(light.direction / (2 * math.pi) * LIGHT_DIRECTION_STEPS)
+            step %= LIGHT_DIRECTION_STEPS
+        key = (size, light.color, step, light.spread)
+        texture = self.textures.get(key)
+        if texture is not None:
+            self.textures.move_to_end(key)
+            return texture
+
+        texture = pg.surfarray.make_surface(
+            get_gradient(
+                size,
+                light.color,
+                None if step is None else step * 2 * math.pi / LIGHT_DIRECTION_STEPS,
+                light.spread,
+            )
+        )
+        self.textures[key] = texture
+        while len(self.textures) > self.texture_cache_size:
+            self.textures.popitem(last=False)
+
+        return texture
+
+    def render(self, rect: pg.FRect, occluders: OccluderGroup) -> pg.surface.Surface:
+        """
+        Render the lights within the rect (e.g. the camera) into the
+        light buffer and returns it.
+        """
+        start = time.perf_counter()
+        self.buffer.fill(self.ambient)
+        lights = [light for light in self.lights if light.rect.colliderect(rect)]
+        for light in lights:
+            self._render_light(light, rect, occluders)
+        self.elapsed = time.perf_counter() - start
+        self._update_reduction(lights, rect)
+
+        return self.buffer
+
+    def draw(
+        self, surface: pg.surface.Surface, camera: Camera, occluders: OccluderGroup
+    ) -> None:
+        """Composite the lights with the surface (e.g. the screen)."""
+        buffer = self.render(camera.rect, occluders)
+        if self.scaled_buffer.get_size() != surface.get_size():
+            self.scaled_buffer = pg.Surface(surface.get_size())
+        pg.transform.smoothscale(buffer, surface.get_size(), self.scaled_buffer)
+        surface.blit(self.scaled_buffer, (0, 0), special_flags=pg.BLEND_RGB_MULT)
+
+    def _render_light(
+        self, light: Light, rect: pg.FRect, occluders: OccluderGroup
+    ) -> None:
+        """Add the masked gradient of the light to the light buffer."""
+        region = light.region
+        segments_key = (tuple(region), occluders.version)
+        if segments_key != light.segments_key:
+            light.segments_key = segments_key
+            light.segments = occluders.get_segments(region)
+        polygon = light.visibility.get_polygon(
+            (light.x, light.y), light.segments, region, occluders.version
+        )
+        full_size = max(2, round(light.radius * 2 / self.scale))
+        size = max(2, full_size >> light.reduction)
+        factor = size / (light.radius * 2)
+        left, top = light.x - light.radius, light.y - light.radius
+
+        mask = self.masks.get(size)
+        if mask is None:
+            mask = self.masks[size] = pg.Surface((size, size))
+        mask.fill(BLACK)
+        if len(polygon) > 2:
+            pg.draw.polygon(
+                mask,
+                WHITE,
+                [((x - left) * factor, (y - top) * factor) for x, y in polygon],
+            )
+        mask.blit(
+            self.get_texture(size, light), (0, 0), special_flags=pg.BLEND_RGB_MULT
+        )
+        if size != full_size:
+            mask = pg.transform.scale(mask, (full_size, full_size))
+        self.buffer.blit(
+            mask,
+            (round((left - rect.x) / self.scale), round((top - rect.y) / self.scale)),
+            special_flags=pg.BLEND_RGB_ADD,
+        )
+
+    def _update_reduction(self, lights: list[Light], rect: pg.FRect) -> None:
+        """
+        Raise the pressure if the lights took longer than the budget and
+        lower it if they took less than half of it. The pressure is spread
+        over the lights, the least important lights are reduced first.
+        """
+        if self.elapsed > self.budget:
+            self.pressure += 1
+        elif self.elapsed < self.budget / 2:
+            self.pressure -= 1
+        count = len(lights)
+        self.pressure = max(0, min(self.pressure, count * self.max_reduction))
+
+        # Least important first: lower priority, then farther from the center.
+        lights = sorted(
+            lights,
+            key=lambda light: (
+                light.priority,
+                -math.hypot(light.x - rect.centerx, light.y - rect.centery),
+            ),
+        )
+        for rank, light in enumerate(lights):
+            light.reduction = max(
+                0, min(self.max_reduction, (self.pressure - rank + count - 1) // count)
+            )
@@ -8,4 +8,7 @@ def main() -> None:
     game.start()
 
 
-main()
+# The guard is required, since the workers of the asset loader are
+# spawned processes that import the main module again.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# coding=utf-8
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pygame as pg
+import pytiled_parser as pytiled
+
+from pysurvive.config import ROOT_PATH
+from pysurvive.logger import Logger
+from pysurvive.utils import file_digest, load_arrays, save_arrays
+
+logger = Logger()
+
+# Has to be increased if the content or layout of the cache changes.
+LEVEL_CACHE_VERSION = 2
+
+# Bit flags of the tile properties.
+FLAG_ENTER = 1
+FLAG_BLOCK = 2
+
+
+class CompiledLevel:
+
+    """
+    Compact representation of a map. The tile layers are stored as a single
+    grid of global tile ids and the bounding rects (relative to the tile)
+    and the properties of each tile are stored in tables indexed by the
+    global tile id.
+    """
+
+    def __init__(
+        self,
+        map_size: tuple[int, int],
+        tile_size: tuple[int, int],
+        tilesets: dict[int, pytiled.Tileset],
+        layers: np.ndarray,
+        bounding_rects: np.ndarray,
+        flags: np.ndarray,
+    ) -> None:
+        # Map width and height in tiles.
+        self.map_size = map_size
+        # Tile width and height in pixel.
+        self.tile_size = tile_size
+        self.tilesets = tilesets
+        # Global tile ids with shape (layers, height, width).
+        self.layers = layers
+        # Bounding rect (x, y, width, height) of each global tile id.
+        self.bounding_rects = bounding_rects
+        # Property flags (FLAG_ENTER, FLAG_BLOCK) of each global tile id.
+        self.flags = flags
+
+    def __repr__(self) -> str:
+        return (
+            f"CompiledLevel(map_size={self.map_size}, tile_size={self.tile_size},"
+            f" layers={len(self.layers)}, tilesets={len(self.tilesets)})"
+        )
+
+
+class LevelCache:
+
+    """
+    Compiles a map file into a CompiledLevel and stores it as a binary
+    file next to the map. The cache is keyed by the modification time and
+    the content hash of the map file and the modification time of the
+    tileset images. On subsequent starts the cache is memory-mapped, so
+    neither the map file has to be parsed nor the bounding rects of the
+    tiles have to be calculated.
+    """
+
+    def __init__(self, map_file: Path) -> None:
+        self.map_file = Path(map_file)
+        self.cache_file = Path(f"{self.map_file}.cache")
+
+    def __repr__(self) -> str:
+        return f"LevelCache({self.cache_file})"
+
+    def load(self) -> Optional[CompiledLevel]:
+        """
+        Returns the compiled level from the cache file.
+        Returns None if there is no valid cache file.
+        """
+        if not self.cache_file.exists():
+            return None
+
+        try:
+            header, arrays = load_arrays(self.cache_file)
+            if not self._is_valid(header):
+                logger.info("Level cache %s is outdated.", self.cache_file)
+                return None
+            if not self._has_valid_arrays(header, arrays):
+                logger.warning("Level cache %s doesn't match the map.", self.cache_file)
+                return None
+            tilesets = {
+                int(ts_id): self._tileset_from_dict(ts_dict)
+                for ts_id, ts_dict in header["tilesets"].items()
+            }
+            compiled = CompiledLevel(
+                map_size=tuple(header["map_size"]),
+                tile_size=tuple(header["tile_size"]),
+                tilesets=tilesets,
+                layers=arrays["layers"],
+                bounding_rects=arrays["bounding_rects"],
+                flags=arrays["flags"],
+            )
+        except (OSError, ValueError, KeyError, TypeError) as message:
+            logger.warning(
+                "Error while loading level cache %s: %s", self.cache_file, message
+            )
+            return None
+
+        logger.info("Loaded level from cache %s.", self.cache_file)
+        return compiled
+
+    def compile(self) -> CompiledLevel:
+        """Parse the map file, compile it and write the cache file."""
+        logger.info("Compiling map file %s.", self.map_file)
+        map_config = pytiled.parse_map(self.map_file)
+
+        layers = []
+        for layer in map_config.layers:
+            # Exlude non TileLayer layers.
+            if not isinstance(layer, pytiled.layer.TileLayer) or not layer.data:
+                continue
+            layers.append(np.array(layer.data, dtype=np.uint32))
+        map_size = (map_config.map_size.width, map_config.map_size.height)
+        if layers:
+            layers_array = np.stack(layers)
+        else:
+            layers_array = np.zeros((0, map_size[1], map_size[0]), dtype=np.uint32)
+
+        tilesets = dict(map_config.tilesets)
+        gid_count = 1 + max(
+            (ts.firstgid + ts.tile_count - 1 for ts in tilesets.values()), default=0
+        )
+        bounding_rects = np.zeros((gid_count, 4), dtype=np.int16)
+        flags = np.zeros(gid_count, dtype=np.uint8)
+        images = {}
+        for ts_config in tilesets.values():
+            image_file = str(ROOT_PATH) + "/" + str(ts_config.image)
+            images[self._get_relative_path(image_file)] = (
+                Path(image_file).stat().st_mtime_ns
+            )
+            self._compile_tileset(ts_config, image_file, bounding_rects, flags)
+
+        compiled = CompiledLevel(
+            map_size=map_size,
+            tile_size=(map_config.tile_size.width, map_config.tile_size.height),
+            tilesets=tilesets,
+            layers=layers_array,
+            bounding_rects=bounding_rects,
+            flags=flags,
+        )
+        self._save(compiled, images)
+
+        return compiled
+
+    def _save(self, compiled: CompiledLevel, images: dict[str, int]) -> None:
+        """Write the compiled level to the cache file."""
+        stat = self.map_file.stat()
+        header = {
+            "version": LEVEL_CACHE_VERSION,
+            "source": {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha1": file_digest(self.map_file),
+            },
+            "images": images,
+            "map_size": list(compiled.map_size),
+            "tile_size": list(compiled.tile_size),
+            "tilesets": {
+                str(ts_id): self._tileset_to_dict(ts_config)
+                for ts_id, ts_config in compiled.tilesets.items()
+            },
+        }
+        try:
+            save_arrays(
+                self.cache_file,
+                header,
+                {
+                    "layers": compiled.layers,
+                    "bounding_rects": compiled.bounding_rects,
+                    "flags": compiled.flags,
+                },
+            )
+        except OSError as message:
+            logger.warning(
+                "Error while writing level cache %s: %s", self.cache_file, message
+            )
+
+    def _is_valid(self, header: dict[str, Any]) -> bool:
+        """Returns True if the cache matches the map file and tileset images."""
+        if header.get("version") != LEVEL_CACHE_VERSION:
+            return False
+
+        source = header["source"]
+        stat = self.map_file.stat()
+        if (source["mtime_ns"], source["size"]) != (stat.st_mtime_ns, stat.st_size):
+            # The map file has been touched, so compare the content.
+            if source["size"] != stat.st_size:
+                return False
+            if source["sha1"] != file_digest(self.map_file):
+                return False
+
+        for image_file, mtime_ns in header["images"].items():
+            if (self.map_file.parent / image_file).stat().st_mtime_ns != mtime_ns:
+                return False
+
+        return True
+
+    @staticmethod
+    def _has_valid_arrays(header: dict[str, Any], arrays: dict[str, Any]) -> bool:
+        """Returns True if the shapes of the arrays match the header."""
+        width, height = header["map_size"]
+        gid_count = 1 + max(
+            (
+                ts_dict["firstgid"] + ts_dict["tile_count"] - 1
+                for ts_dict in header["tilesets"].values()
+            ),
+            default=0,
+        )
+        layers = arrays["layers"]
+        return (
+            layers.ndim == 3
+            and layers.shape[1:] == (height, width)
+            and arrays["bounding_rects"].shape == (gid_count, 4)
+            and arrays["flags"].shape == (gid_count,)
+        )
+
+    def _get_relative_path(self, filename: str) -> str:
+        """Returns the path of the file relative to the map file."""
+        return os.path.relpath(filename, self.map_file.parent)
+
+    @staticmethod
+    def _compile_tileset(
+        ts_config: pytiled.Tileset,
+        image_file: str,
+        bounding_rects: np.ndarray,
+        flags: np.ndarray,
+    ) -> None:
+        """Fill the bounding rects and flags of all tiles of the tileset."""
+        properties = ts_config.properties or {}
+        flag = (FLAG_ENTER if properties.get("enter") else 0) | (
+            FLAG_BLOCK if properties.get("block") else 0
+        )
+        # The image is not converted, so no display is needed.
+        tileset_image = pg.image.load(image_file)
+        tileset_width = tileset_image.get_width()
+        for tile_x in range(0, tileset_width // ts_config.tile_width):
+            gid = ts_config.firstgid + tile_x
+            if gid >= len(flags):
+                break
+            tile_image = tileset_image.subsurface(
+                (
+                    tile_x * ts_config.tile_width,
+                    0,
+                    ts_config.tile_width,
+                    ts_config.tile_height,
+                )
+            )
+            bounding_rects[gid] = tuple(tile_image.get_bounding_rect())
+            flags[gid] = flag
+
+    @staticmethod
+    def _tileset_to_dict(ts_config: pytiled.Tileset) -> dict[str, Any]:
+        """Returns the json serializable subset of the tileset config."""
+        properties = {
+            name: value
+            for name, value in (ts_config.properties or {}).items()
+            if isinstance(value, (bool, int, float, str))
+        }
+        return {
+            "name": ts_config.name,
+            "tile_width": ts_config.tile_width,
+            "tile_height": ts_config.tile_height,
+            "tile_count": ts_config.tile_count,
+            "columns": ts_config.columns,
+            "firstgid": ts_config.firstgid,
+            "image": str(ts_config.image),
+            "properties": properties,
+        }
+
+    @staticmethod
+    def _tileset_from_dict(ts_dict: dict[str, Any]) -> pytiled.Tileset:
+        """Returns the tileset config of the json serializable subset."""
+        return pytiled.Tileset(
+            name=ts_dict["name"],
+            tile_width=ts_dict["tile_width"],
+            tile_height=ts_dict["tile_height"],
+            tile_count=ts_dict["tile_count"],
+            columns=ts_dict["columns"],
+            firstgid=ts_dict["firstgid"],
+            image=Path(ts_dict["image"]),
+            properties=ts_dict["properties"],
+        )
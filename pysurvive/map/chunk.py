@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+from collections import OrderedDict
+from typing import Optional
+
+import pygame as pg
+
+from pysurvive.config import CHUNK_CACHE_BUDGET, CHUNK_SIZE
+from pysurvive.game.core import Camera
+from pysurvive.map.tile import TileGroupManager
+
+
+class ChunkCache:
+
+    """
+    Pre-rendered chunks of the static tile layers.
+
+    The map is split into fixed-size chunks. A chunk is baked (every tile
+    in its area blitted onto a single surface) the first time it is visible
+    and kept in a LRU cache. If the memory of all cached chunks exceeds the
+    budget, the least recently used chunks are dropped and baked again
+    when they become visible again.
+    """
+
+    def __init__(
+        self,
+        tiles: TileGroupManager,
+        bounds: pg.Rect,
+        chunk_size: int = CHUNK_SIZE,
+        budget: int = CHUNK_CACHE_BUDGET,
+    ) -> None:
+        self.tiles = tiles
+        # Area of the map (in pixel) that is covered by chunks.
+        self.bounds = pg.Rect(bounds)
+        self.chunk_size = chunk_size
+        # Memory budget of the cached chunk surfaces in bytes.
+        self.budget = budget
+        self.memory = 0
+        self.chunks: OrderedDict[tuple[int, int], pg.surface.Surface] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return (
+            f"ChunkCache(chunk_size={self.chunk_size},"
+            f" chunks={len(self.chunks)}, memory={self.memory})"
+        )
+
+    def chunk_rect(self, col: int, row: int) -> pg.Rect:
+        """Returns the rect of the chunk (clipped to the map bounds)."""
+        return pg.Rect(
+            col * self.chunk_size,
+            row * self.chunk_size,
+            self.chunk_size,
+            self.chunk_size,
+        ).clip(self.bounds)
+
+    def _bake(self, rect: pg.Rect) -> pg.surface.Surface:
+        """Render every tile in the area of the chunk onto a single surface."""
+        surface = pg.Surface(rect.size, pg.SRCALPHA)
+        # Tiles larger than the chunk or on the chunk borders are clipped.
+        surface.fblits(
+            [
+                (tile.image, (tile.x - rect.x, tile.y - rect.y))
+                for tile in self.tiles.get_tiles(rect)
+            ]
+        )
+        if pg.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+
+        return surface
+
+    def get(self, col: int, row: int) -> Optional[pg.surface.Surface]:
+        """
+        Returns the surface of the chunk and bake it if it is not cached yet.
+        Returns None if the chunk is outside of the map.
+        """
+        key = (col, row)
+        surface = self.chunks.get(key)
+        if surface is not None:
+            self.chunks.move_to_end(key)
+            return surface
+
+        rect = self.chunk_rect(col, row)
+        if not rect.width or not rect.height:
+            return None
+
+        surface = self._bake(rect)
+        self.chunks[key] = surface
+        self.memory += self._size(surface)
+        # Drop the least recently used chunks, but always keep the new one.
+        while self.memory > self.budget and len(self.chunks) > 1:
+            _, dropped = self.chunks.popitem(last=False)
+            self.memory -= self._size(dropped)
+
+        return surface
+
+    def draw(self, surface: pg.surface.Surface, camera: Camera) -> None:
+        """Draw the chunks visible on camera/screen only."""
+        rect = camera.rect
+        col_start = math.floor(rect.left / self.chunk_size)
+        row_start = math.floor(rect.top / self.chunk_size)
+        col_end = math.ceil(rect.right / self.chunk_size)
+        row_end = math.ceil(rect.bottom / self.chunk_size)
+
+        blits = []
+        for row in range(row_start, row_end):
+            for col in range(col_start, col_end):
+                chunk = self.get(col, row)
+                if chunk is None:
+                    continue
+                blits.append(
+                    (
+                        chunk,
+                        (
+                            col * self.chunk_size - camera.x,
+                            row * self.chunk_size - camera.y,
+                        ),
+                    )
+                )
+        surface.fblits(blits)
+
+    def clear(self) -> None:
+        """Drop every cached chunk (e.g. if the tiles have been changed)."""
+        self.chunks.clear()
+        self.memory = 0
+
+    @staticmethod
+    def _size(surface: pg.surface.Surface) -> int:
+        """Returns the memory usage of the surface pixels in bytes."""
+        return surface.get_pitch() * surface.get_height()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pygame as pg
+
+from pysurvive.config import SPATIAL_GRID_CELL_SIZE
+from pysurvive.map.spatial import RectLike, SpatialHashGrid
+
+
+class Collider(pg.sprite.Sprite):
+
+    """
+    Static collision rect. A collider can replace multiple adjacent
+    tiles. Like the tiles it provides a rect and a bounding_rect,
+    so it can be used with the same collision callbacks.
+    """
+
+    def __init__(self, x: float, y: float, width: float, height: float) -> None:
+        super().__init__()
+        self.rect = pg.FRect(x, y, width, height)
+        self.bounding_rect = self.rect
+
+    def __repr__(self) -> str:
+        return (
+            f"Collider({self.rect.x}, {self.rect.y},"
+            f" {self.rect.width}, {self.rect.height})"
+        )
+
+
+class ColliderGroup:
+
+    """
+    Collection of merged collider rects of a tile category (e.g. movement
+    or bullet collision) indexed by a spatial hash grid.
+
+    The collision rects of the tiles are merged per region (grid cell), so
+    a collider never gets much larger than a region and a query still
+    returns only the colliders close to the query rect.
+    """
+
+    def __init__(
+        self, rects: np.ndarray, region_size: int = SPATIAL_GRID_CELL_SIZE
+    ) -> None:
+        self.region_size = region_size
+        self.grid: SpatialHashGrid[Collider] = SpatialHashGrid(region_size)
+
+        regions: dict[tuple[int, int], list[list[float]]] = {}
+        for rect in np.asarray(rects, dtype=np.float64).reshape(-1, 4).tolist():
+            key = (
+                math.floor(rect[0] / region_size),
+                math.floor(rect[1] / region_size),
+            )
+            regions.setdefault(key, []).append(rect)
+
+        for key in sorted(regions):
+            for rect in merge_rects(np.array(regions[key])):
+                collider = Collider(*rect)
+                self.grid.insert(collider, collider.rect)
+
+    def __repr__(self) -> str:
+        return f"ColliderGroup(colliders={len(self)})"
+
+    def __len__(self) -> int:
+        return len(self.grid)
+
+    def __iter__(self) -> Iterator[Collider]:
+        return iter(self.grid)
+
+    def get_colliders(self, rect: RectLike) -> list[Collider]:
+        """Returns a list of colliders that collide with the given rect."""
+        return self.grid.query(rect)
+
+    def get_colliders_on_line(
+        self, start: tuple[float, float], end: tuple[float, float]
+    ) -> list[Collider]:
+        """
+        Returns a list of colliders that are crossed by the line
+        (e.g. the path of a bullet), sorted by the distance to start.
+        """
+        area = pg.FRect(
+            min(start[0], end[0]),
+            min(start[1], end[1]),
+            abs(end[0] - start[0]) + 1,
+            abs(end[1] - start[1]) + 1,
+        )
+        hits = []
+        for collider in self.grid.query(area):
+            clipped = collider.rect.clipline(start, end)
+            if clipped:
+                (x, y), _ = clipped
+                hits.append(((x - start[0]) ** 2 + (y - start[1]) ** 2, collider))
+        hits.sort(key=lambda hit: hit[0])
+
+        return [collider for _, collider in hits]
+
+
+def get_collision_rects(
+    layers: np.ndarray,
+    lookup: np.ndarray,
+    bounding_rects: np.ndarray,
+    tile_size: tuple[int, int],
+) -> np.ndarray:
+    """
+    Returns the absolute bounding rects (x, y, width, height) of every cell
+    of the tile layers whose global tile id is set in the lookup table.
+
+    Args:
+        layers (ndarray): Global tile ids with shape (layers, height, width).
+        lookup (ndarray): Boolean lookup table indexed by the global tile id.
+        bounding_rects (ndarray): Bounding rect relative to the tile
+            indexed by the global tile id.
+        tile_size (tuple[int, int]): The width and height of the map grid.
+
+    Returns:
+        Rects (ndarray): The rects with shape (n, 4).
+    """
+    tile_width, tile_height = tile_size
+    bounding_rects = np.asarray(bounding_rects, dtype=np.float64)
+    rects = [np.zeros((0, 4))]
+    for layer in layers:
+        # Global tile ids outside of the table (e.g. flipped tiles) are ignored.
+        layer = np.where(layer < len(lookup), layer, 0)
+        rows, cols = np.nonzero(lookup[layer])
+        bounds = bounding_rects[layer[rows, cols]]
+        rects.append(
+            np.column_stack(
+                (
+                    cols * tile_width + bounds[:, 0],
+                    rows * tile_height + bounds[:, 1],
+                    bounds[:, 2],
+                    bounds[:, 3],
+                )
+            )
+        )
+    rects_array = np.concatenate(rects)
+
+    # Fully transparent tiles have an empty bounding rect.
+    return rects_array[(rects_array[:, 2] > 0) & (rects_array[:, 3] > 0)]
+
+
+def merge_rects(
+    rects: np.ndarray, max_size: Optional[float] = None
+) -> list[tuple[float, float, float, float]]:
+    """
+    Greedy merging of axis aligned rects into fewer, larger rects.
+    The union of the rects is preserved exactly: first rects with the same
+    y and height are merged if they touch or overlap horizontally, then
+    the resulting rects with the same x and width are merged if they touch
+    or overlap vertically.
+
+    Args:
+        rects (ndarray): Rects (x, y, width, height) with shape (n, 4).
+        max_size (float): Optional max. width and height of a merged rect.
+
+    Returns:
+        Rects (list[tuple]): The merged rects.
+    """
+    rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+    if not len(rects):
+        return []
+    # Remove duplicates (e.g. the same wall on multiple layers).
+    rects = np.unique(rects, axis=0)
+    limit = math.inf if max_size is None else max_size
+
+    # Merge horizontal runs (sorted by y, height and x).
+    order = np.lexsort((rects[:, 0], rects[:, 3], rects[:, 1]))
+    rows: list[list[float]] = []
+    for x, y, w, h in rects[order].tolist():
+        if rows:
+            last = rows[-1]
+            right = max(last[0] + last[2], x + w)
+            if (
+                last[1] == y
+                and last[3] == h
+                and x <= last[0] + last[2]
+                and right - last[0] <= limit
+            ):
+                last[2] = right - last[0]
+                continue
+        rows.append([x, y, w, h])
+
+    # Merge vertical runs (sorted by x, width and y).
+    rows.sort(key=lambda rect: (rect[0], rect[2], rect[1]))
+    merged: list[list[float]] = []
+    for x, y, w, h in rows:
+        if merged:
+            last = merged[-1]
+            bottom = max(last[1] + last[3], y + h)
+            if (
+                last[0] == x
+                and last[2] == w
+                and y <= last[1] + last[3]
+                and bottom - last[1] <= limit
+            ):
+                last[3] = bottom - last[1]
+                continue
+        merged.append([x, y, w, h])
+
+    return [(x, y, w, h) for x, y, w, h in merged]
+
+
+def sweep(rect: RectLike, axis: int, distance: int, colliders: Iterable) -> int:
+    """
+    Swept AABB test along a single axis.
+
+    Returns the (signed) displacement in whole pixels the rect can be moved
+    along the axis without colliding with one of the colliders (objects
+    with a bounding_rect). This is the same result as moving the rect pixel
+    by pixel and stopping before the first collision, but each collider is
+    tested only once. As in the step-wise movement, a rect that still
+    overlaps a collider after the first step is blocked.
+
+    Args:
+        rect (FRect): The bounding rect of the moving object.
+        axis (int): 0 for the x axis, 1 for the y axis.
+        distance (int): The (signed) distance in pixel.
+        colliders (Iterable): The colliders close to the rect.
+
+    Returns:
+        Displacement (int): The allowed (signed) distance in pixel.
+    """
+    steps = abs(int(distance))
+    if not steps:
+        return 0
+
+    if axis == 0:
+        start, end = rect.left, rect.right
+        cross_start, cross_end = rect.top, rect.bottom
+    else:
+        start, end = rect.top, rect.bottom
+        cross_start, cross_end = rect.left, rect.right
+
+    allowed = steps
+    for collider in colliders:
+        other = collider.bounding_rect
+        if not other.width or not other.height:
+            continue
+        if axis == 0:
+            other_start, other_end = other.left, other.right
+            other_cross_start, other_cross_end = other.top, other.bottom
+        else:
+            other_start, other_end = other.top, other.bottom
+            other_cross_start, other_cross_end = other.left, other.right
+        # Colliders besides the path are never hit.
+        if other_cross_end <= cross_start or other_cross_start >= cross_end:
+            continue
+
+        # The rect moved by d pixel overlaps the collider if gap < d < extent.
+        if distance > 0:
+            gap = other_start - end
+            extent = other_end - start
+        else:
+            gap = start - other_end
+            extent = end - other_start
+        first_hit = max(1, math.floor(gap) + 1)
+        if first_hit < extent:
+            allowed = min(allowed, first_hit - 1)
+            if not allowed:
+                break
+
+    return allowed if distance > 0 else -allowed
+
+
+def move_and_slide(
+    rect: RectLike, dx: int, dy: int, colliders: Iterable
+) -> tuple[int, int]:
+    """
+    Returns the displacement (in whole pixels) of the rect considering the
+    colliders. The x axis is resolved first and the y axis from the new
+    position, so the rect slides along the colliders when moving diagonal.
+    """
+    colliders = list(colliders)
+    dx = sweep(rect, 0, dx, colliders)
+    dy = sweep(rect.move(dx, 0), 1, dy, colliders)
+
+    return dx, dy
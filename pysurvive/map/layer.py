@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import pygame as pg
+
+from pysurvive.config import DEBUG_SPRITE, GREEN, TILE_CACHE_SIZE, YELLOW
+from pysurvive.game.core import Camera
+from pysurvive.map.spatial import RectLike
+from pysurvive.map.tile import Tile, TileGroup
+
+
+class TileType:
+
+    """
+    Flyweight of a global tile id. Contains the data that is shared
+    by every cell of the tile layers with this tile id.
+    """
+
+    __slots__ = (
+        "image",
+        "bounding_rect",
+        "enter",
+        "block",
+    )
+
+    def __init__(
+        self,
+        image: pg.surface.Surface,
+        bounding_rect: pg.FRect,
+        enter: bool = False,
+        block: bool = False,
+    ) -> None:
+        self.image = image
+        # Bounding rect relative to the tile position.
+        self.bounding_rect = bounding_rect
+        self.enter = enter
+        self.block = block
+
+    def __repr__(self) -> str:
+        return f"TileType(enter={self.enter}, block={self.block})"
+
+    @classmethod
+    def from_tile(cls, tile: Tile) -> "TileType":
+        """Returns the flyweight of a tile (e.g. from the tile table)."""
+        return cls(
+            image=tile.image,
+            bounding_rect=tile.relative_bounding_rect,
+            enter=tile.enter,
+            block=tile.block,
+        )
+
+    def create(self, x: float, y: float) -> Tile:
+        """Materialize a tile object at the given position."""
+        return Tile(
+            image=self.image,
+            x=x,
+            y=y,
+            enter=self.enter,
+            block=self.block,
+            bounding_rect=self.bounding_rect,
+        )
+
+
+class TileLayerManager:
+
+    """
+    Array backed alternative to the TileGroupManager.
+
+    The tile layers are kept as a grid of global tile ids with shape
+    (layers, height, width) and a table of TileType objects indexed by
+    the global tile id. Tile objects are only materialized for the cells
+    that are queried (e.g. visible on the screen) and kept in a small LRU
+    cache. So the memory and the load time scale with the number of
+    distinct tiles and not with the number of cells.
+    """
+
+    def __init__(
+        self,
+        layers: np.ndarray,
+        tile_types: list[Optional[TileType]],
+        tile_size: tuple[int, int],
+        cache_size: int = TILE_CACHE_SIZE,
+    ) -> None:
+        self.layers = layers
+        self.tile_types = tile_types
+        self.tile_width, self.tile_height = tile_size
+
+        # Lookup tables of the tile categories indexed by the global tile id.
+        self.lookup_all = np.array([t is not None for t in tile_types], dtype=bool)
+        self.lookup_movement_collision = np.array(
+            [t is not None and not t.enter for t in tile_types], dtype=bool
+        )
+        self.lookup_bullet_collision = np.array(
+            [t is not None and t.block for t in tile_types], dtype=bool
+        )
+
+        # Tiles can be larger than the map grid, so a query has to consider
+        # cells on the left/top of the query rect as well.
+        max_width = max((t.image.get_width() for t in tile_types if t), default=0)
+        max_height = max((t.image.get_height() for t in tile_types if t), default=0)
+        self.overhang_x = max(0, math.ceil(max_width / self.tile_width) - 1)
+        self.overhang_y = max(0, math.ceil(max_height / self.tile_height) - 1)
+
+        # Materialized tile objects by (layer, row, column).
+        self.cache_size = cache_size
+        self.tiles: OrderedDict[tuple[int, int, int], Tile] = OrderedDict()
+
+        # Variable collection of tiles.
+        self.tiles_on_screen = TileGroup()
+        self.tiles_close_to_player = TileGroup()
+        self.tiles_movement_collision_on_screen = TileGroup()
+
+    def __repr__(self) -> str:
+        return (
+            f"TileLayerManager(layers={self.layers.shape},"
+            f" tile_types={len(self.tile_types)}, tiles={len(self.tiles)})"
+        )
+
+    def update(self, camera: Camera) -> None:
+        """Update the tile groups."""
+        rect = camera.rect
+        # Update tiles on camera/screen.
+        self.tiles_on_screen.empty()
+        self.tiles_on_screen.add(self.get_tiles(rect))
+
+        # Update tiles on screen that are relevant for collision detection.
+        self.tiles_movement_collision_on_screen.empty()
+        self.tiles_movement_collision_on_screen.add(
+            self.get_movement_collision_tiles(rect)
+        )
+
+        self.tiles_on_screen.update(camera)  # Update all tiles on the camera/screen.
+
+    def draw(self, surface: pg.surface.Surface, camera: Camera) -> None:
+        """Draw tiles visible on camera/screen only."""
+        self.tiles_on_screen.draw(surface, camera)
+        self.draw_debug(surface, camera)
+
+    def draw_debug(self, surface: pg.surface.Surface, camera: Camera) -> None:
+        """Draw the bounding rects of the tiles visible on camera/screen."""
+        if DEBUG_SPRITE:
+            # Drawing bounding_rect (border) for debugging.
+            for sprite in self.tiles_movement_collision_on_screen:
+                offset = sprite.rect.topleft - camera.offset
+                sprite.debug_draw(surface, offset, GREEN, True)
+            for sprite in self.tiles_close_to_player:
+                offset = sprite.rect.topleft - camera.offset
+                sprite.debug_draw(surface, offset, YELLOW, True)
+
+    def _query(self, rect: RectLike, lookup: np.ndarray) -> list[Tile]:
+        """
+        Returns the (materialized) tile objects of the cells whose global
+        tile id is set in the lookup table and that collide with the rect.
+        The tiles are ordered like the layers (layer, row, column).
+        """
+        _, height, width = self.layers.shape
+        col_start = max(0, math.floor(rect.left / self.tile_width) - self.overhang_x)
+        row_start = max(0, math.floor(rect.top / self.tile_height) - self.overhang_y)
+        col_end = min(width, math.ceil(rect.right / self.tile_width))
+        row_end = min(height, math.ceil(rect.bottom / self.tile_height))
+        if col_start >= col_end or row_start >= row_end or not len(lookup):
+            return []
+
+        window = self.layers[:, row_start:row_end, col_start:col_end]
+        # Global tile ids outside of the table (e.g. flipped tiles) are ignored.
+        window = np.where(window < len(lookup), window, 0)
+        layer_indices, rows, cols = np.nonzero(lookup[window])
+
+        tiles = []
+        for layer_index, row, col in zip(
+            layer_indices.tolist(),
+            (rows + row_start).tolist(),
+            (cols + col_start).tolist(),
+        ):
+            tile = self._materialize(layer_index, row, col)
+            if tile.rect.colliderect(rect):
+                tiles.append(tile)
+
+        return tiles
+
+    def _materialize(self, layer_index: int, row: int, col: int) -> Tile:
+        """Returns the tile object of the cell and create it if necessary."""
+        key = (layer_index, row, col)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            return tile
+
+        tile_type = self.tile_types[int(self.layers[key])]
+        tile = tile_type.create(col * self.tile_width, row * self.tile_height)
+        self.tiles[key] = tile
+        if len(self.tiles) > self.cache_size:
+            self.tiles.popitem(last=False)
+
+        return tile
+
+    def get_tiles(self, rect: RectLike) -> list[Tile]:
+        """Returns a list of tile objects that collide with the given rect."""
+        return self._query(rect, self.lookup_all)
+
+    def get_movement_collision_tiles(self, rect: RectLike) -> list[Tile]:
+        """Returns a list of tile objects that collide with the given rect
+        and are relevant for movement collision detection."""
+        return self._query(rect, self.lookup_movement_collision)
+
+    def get_bullet_collision_tiles(self, rect: RectLike) -> list[Tile]:
+        """Returns a list of tile objects that collide with the given rect
+        and are relevant for bullet collision detection."""
+        return self._query(rect, self.lookup_bullet_collision)
@@ -1,16 +1,22 @@
 #!/usr/bin/env python
 # coding=utf-8
-import copy
 import sys
 from os.path import exists as file_exists
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
+import numpy as np
 import pygame as pg
-import pytiled_parser as pytiled
 
+from pysurvive.assets import AssetLoader
+from pysurvive.config import ROOT_PATH, TILE_STORAGE
 from pysurvive.game.core import Camera
 from pysurvive.logger import Logger
+from pysurvive.map.cache import LevelCache
+from pysurvive.map.chunk import ChunkCache
+from pysurvive.map.colliders import ColliderGroup, get_collision_rects
+from pysurvive.map.layer import TileLayerManager, TileType
+from pysurvive.map.occluders import OccluderGroup
 from pysurvive.map.tile import TileGroupManager
 from pysurvive.map.tileset import Tileset
 
@@ -27,79 +33,178 @@ class Level:
     In addition, the respective tile objects are divided
     into further groups for differentiation according to
     the respective properties (block, enter, close to player).
+
+    With the storage mode "array" the tile layers are kept as a grid of
+    tile ids instead and tile objects are only created on demand
+    (see TileLayerManager).
     """
 
-    def __init__(self, _map_file: str) -> None:
+    def __init__(self, _map_file: str, storage: str = TILE_STORAGE) -> None:
         logger.info("Loading map from file %s.", _map_file)
         if not file_exists(_map_file):
             logger.error("Map file %s does not exists.", _map_file)
             sys.exit(1)
 
-        # Load map config.
+        # Load the compiled map from the cache. On the first run (or if the
+        # map file has been changed) the map file is parsed and compiled.
         self.map_file = Path(_map_file)
-        self.map_config = pytiled.parse_map(self.map_file)
-
+        self.cache = LevelCache(self.map_file)
+        compiled = self.cache.load()
+        if compiled is None:
+            compiled = self.cache.compile()
+        self.map_size = compiled.map_size
+        self.tile_size = compiled.tile_size
+        self.layers = compiled.layers
+
+        # Decode the tileset images in parallel.
+        AssetLoader().load_images(
+            str(ROOT_PATH) + "/" + str(ts_config.image)
+            for ts_config in compiled.tilesets.values()
+        )
         # Load tilesets.
-        self.tiles = TileGroupManager()
         self.tilesets = {}
-        for ts_id, ts_config in self.map_config.tilesets.items():
-            tileset = Tileset(ts_config)
+        for ts_id, ts_config in compiled.tilesets.items():
+            tileset = Tileset(ts_config, compiled.bounding_rects)
             self.tilesets[ts_id] = tileset
-
-        self._initialize()
+        self._build_gid_table(len(compiled.flags))
+
+        self.tiles: Union[TileGroupManager, TileLayerManager]
+        if storage == "array":
+            self.tiles = TileLayerManager(self.layers, self.tile_types, self.tile_size)
+        else:
+            self.tiles = TileGroupManager()
+            self._initialize()
+        self._build_colliders()
+
+        # The tile layers never change, so they are drawn from pre-rendered chunks.
+        self.chunks = ChunkCache(
+            self.tiles, pg.Rect(0, 0, self.map_width, self.map_height)
+        )
+
+    def _build_gid_table(self, gid_count: int) -> None:
+        """
+        Build the dense lookup tables indexed by the global tile id once
+        after the tilesets are loaded:
+            * gid_tilesets: The tileset of the tile id.
+            * gid_tile_indices: The index of the tile in the tile table
+              of the tileset (-1 if the tile id is not used).
+            * tile_types: The prebuilt tile template (flyweight) of the
+              tile id (None if the tile is missing in the tile table).
+        """
+        for tileset in self.tilesets.values():
+            gid_count = max(gid_count, tileset.last_gid + 1)
+
+        self.gid_tilesets: list[Optional[Tileset]] = [None] * gid_count
+        self.gid_tile_indices = np.full(gid_count, -1, dtype=np.int32)
+        self.tile_types: list[Optional[TileType]] = [None] * gid_count
+        for tileset in self.tilesets.values():
+            for gid in range(tileset.first_gid, tileset.last_gid + 1):
+                # The first tileset wins if the ranges overlap.
+                if self.gid_tilesets[gid] is not None:
+                    continue
+                tile_index = tileset.get_tile_index(gid)
+                self.gid_tilesets[gid] = tileset
+                self.gid_tile_indices[gid] = tile_index
+                if tile_index < len(tileset.tile_table):
+                    self.tile_types[gid] = TileType.from_tile(
+                        tileset.tile_table[tile_index]
+                    )
 
     def _initialize(self) -> None:
         """Initialize each layer of the tile map."""
-        for layer in self.map_config.layers:
-            # Exlude non TileLayer layers.
-            if not isinstance(layer, pytiled.layer.TileLayer):
-                continue
-
-            for y, row in enumerate(layer.data):
-                for x, tile_id in enumerate(row):
-                    tileset = self._get_tileset(tile_id)
-                    if not tileset:
-                        continue
-
-                    tile_index = tileset.get_tile_index(tile_id)
-                    try:
-                        tile = copy.deepcopy(tileset.get_tile(tile_id))
-                        tile.x = x * self.map_config.tile_size.width
-                        tile.y = y * self.map_config.tile_size.height
-                        self.tiles.add(tile)  # Add a copy of tile from tileset.
-                    except IndexError:
-                        logger.error(
-                            "Error while accessing tile (%s) of tileset %r.",
-                            tile_index,
-                            tileset,
-                        )
-                        sys.exit(1)
+        tile_width, tile_height = self.tile_size
+        gid_count = len(self.tile_types)
+        has_tileset = self.gid_tile_indices >= 0
+        for layer in self.layers:
+            # Tile ids outside of the table (without a tileset) are ignored.
+            layer = np.where(layer < gid_count, layer, 0)
+            # Process the cells with a tile only (in row-major order).
+            rows, cols = np.nonzero(has_tileset[layer])
+            for tile_id, y, x in zip(
+                layer[rows, cols].tolist(), rows.tolist(), cols.tolist()
+            ):
+                tile_type = self.tile_types[tile_id]
+                if tile_type is None:
+                    logger.error(
+                        "Error while accessing tile (%s) of tileset %r.",
+                        self.gid_tile_indices[tile_id],
+                        self.gid_tilesets[tile_id],
+                    )
+                    sys.exit(1)
+
+                # Add a copy of tile from tileset.
+                self.tiles.add(tile_type.create(x * tile_width, y * tile_height))
+
+        # Build the spatial index once all tiles are known.
+        self.tiles.build_index()
+
+    def _build_colliders(self) -> None:
+        """
+        Merge the bounding rects of adjacent collision tiles into a compact
+        set of colliders (per region of the spatial index):
+            * movement_colliders: Tiles that can't be entered.
+            * bullet_colliders: Tiles that block bullets.
+        The outline of the tiles that block bullets is used as occluders
+        (segments that block the view).
+        """
+        bounding_rects = np.array(
+            [
+                tuple(t.bounding_rect) if t is not None else (0, 0, 0, 0)
+                for t in self.tile_types
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 4)
+        lookup_movement_collision = np.array(
+            [t is not None and not t.enter for t in self.tile_types], dtype=bool
+        )
+        lookup_bullet_collision = np.array(
+            [t is not None and t.block for t in self.tile_types], dtype=bool
+        )
+        self.movement_colliders = ColliderGroup(
+            get_collision_rects(
+                self.layers, lookup_movement_collision, bounding_rects, self.tile_size
+            )
+        )
+        bullet_rects = get_collision_rects(
+            self.layers, lookup_bullet_collision, bounding_rects, self.tile_size
+        )
+        self.bullet_colliders = ColliderGroup(bullet_rects)
+        self.occluders = OccluderGroup(
+            bullet_rects, (0, 0, self.map_width, self.map_height)
+        )
+        logger.info(
+            "Merged collision tiles into %s movement and %s bullet colliders"
+            " (%s occluder segments).",
+            len(self.movement_colliders),
+            len(self.bullet_colliders),
+            len(self.occluders),
+        )
 
     def _get_tileset(self, tile_id: int) -> Optional[Tileset]:
         """
         Identify the tileset based on the tile id specified
         in the map file.
         """
-        for _, tileset in self.tilesets.items():
-            if tile_id >= tileset.first_gid and tile_id <= tileset.last_gid:
-                return tileset
+        if 0 <= tile_id < len(self.gid_tilesets):
+            return self.gid_tilesets[tile_id]
 
         return None
 
     @property
     def map_width(self) -> float:
         """Returns the map width (tile x * tile size)."""
-        return self.map_config.map_size.width * self.map_config.tile_size.width
+        return self.map_size[0] * self.tile_size[0]
 
     @property
     def map_height(self) -> float:
         """Returns the map height (tile y * tile size)."""
-        return self.map_config.map_size.height * self.map_config.tile_size.height
+        return self.map_size[1] * self.tile_size[1]
 
     def update(self, camera: Camera):
         """Call the update method of tile group manager."""
         self.tiles.update(camera)
 
     def draw(self, surface: pg.surface.Surface, camera: Camera) -> None:
-        """Call the draw method of tile group manager."""
-        self.tiles.draw(surface, camera)
+        """Draw the pre-rendered chunks visible on camera/screen."""
+        self.chunks.draw(surface, camera)
+        self.tiles.draw_debug(surface, camera)
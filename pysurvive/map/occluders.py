@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# coding=utf-8
+from typing import Iterator
+
+import numpy as np
+import pygame as pg
+
+from pysurvive.config import SPATIAL_GRID_CELL_SIZE
+from pysurvive.map.spatial import RectLike, SpatialHashGrid
+from pysurvive.navmesh.builder import get_outline, get_walkable_grid
+
+
+class OccluderGroup:
+
+    """
+    Line segments that block the view (e.g. for the visibility polygon),
+    indexed by a spatial hash grid.
+
+    The segments are the outline of the union of the collision rects
+    within the bounds. Collinear edges of adjacent tiles are merged into
+    a single segment and the edges between two wall tiles are dropped, so
+    only the true edges of the walls are left. The segments touch each
+    other at their endpoints only. The sides of the bounds are part of
+    the outline where no wall is at the border.
+    """
+
+    def __init__(
+        self,
+        rects: np.ndarray,
+        bounds: tuple[float, float, float, float],
+        region_size: int = SPATIAL_GRID_CELL_SIZE,
+    ) -> None:
+        self.bounds = bounds
+        self.grid: SpatialHashGrid[int] = SpatialHashGrid(region_size)
+        # Incremented whenever the segments change (see update).
+        self.version = 0
+        self._build(rects)
+
+    def _build(self, rects: np.ndarray) -> None:
+        """Build the outline of the rects and index the segments."""
+        xs, ys, walkable = get_walkable_grid(self.bounds, rects)
+        self.segments = np.array(
+            [(*p1, *p2) for p1, p2 in get_outline(xs, ys, walkable)],
+            dtype=np.float64,
+        ).reshape(-1, 4)
+        self.grid.clear()
+        for index, (x1, y1, x2, y2) in enumerate(self.segments.tolist()):
+            self.grid.insert(
+                index,
+                pg.FRect(min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1)),
+            )
+
+    def __repr__(self) -> str:
+        return f"OccluderGroup(segments={len(self)})"
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def __iter__(self) -> Iterator[tuple[float, float, float, float]]:
+        return iter(map(tuple, self.segments.tolist()))
+
+    def update(self, rects: np.ndarray) -> None:
+        """
+        Rebuild the segments from the changed collision rects
+        (e.g. a door has been opened).
+        """
+        self._build(rects)
+        self.version += 1
+
+    def get_segments(self, rect: RectLike) -> np.ndarray:
+        """
+        Returns the segments (x1, y1, x2, y2) within the rect as (n, 4)
+        array. The segments are clipped to the rect (the segments are
+        axis aligned, so clipping the coordinates is sufficient).
+        """
+        left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+        segments = self.segments[self.grid.query_indices(rect)]
+        clipped = np.column_stack(
+            (
+                np.clip(segments[:, 0], left, right),
+                np.clip(segments[:, 1], top, bottom),
+                np.clip(segments[:, 2], left, right),
+                np.clip(segments[:, 3], top, bottom),
+            )
+        )
+        # Segments outside of the rect are collapsed to a point (or moved
+        # onto the border of the rect).
+        inside = (
+            (np.minimum(segments[:, 0], segments[:, 2]) <= right)
+            & (np.maximum(segments[:, 0], segments[:, 2]) >= left)
+            & (np.minimum(segments[:, 1], segments[:, 3]) <= bottom)
+            & (np.maximum(segments[:, 1], segments[:, 3]) >= top)
+            & ((clipped[:, 0] != clipped[:, 2]) | (clipped[:, 1] != clipped[:, 3]))
+        )
+
+        return clipped[inside]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+from typing import Generic, Iterator, TypeVar, Union
+
+import pygame as pg
+
+T = TypeVar("T")
+
+RectLike = Union[pg.Rect, pg.FRect]
+
+
+class SpatialHashGrid(Generic[T]):
+
+    """
+    Uniform grid (spatial hash) over axis aligned rects.
+
+    Every item is registered in each cell its rect overlaps. A rect query
+    only visits the cells covered by the query rect, so the cost scales
+    with the number of items in that area and not with the total number
+    of items. Query results keep the insertion order of the items, which
+    is important for the draw order of the tile layers.
+    """
+
+    def __init__(self, cell_size: int = 256) -> None:
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        self.items: list[T] = []
+        self.rects: list[pg.FRect] = []
+        # Indices of the removed items (see remove).
+        self.removed: set[int] = set()
+
+    def __repr__(self) -> str:
+        return f"SpatialHashGrid(cell_size={self.cell_size}, items={len(self)})"
+
+    def __len__(self) -> int:
+        return len(self.items) - len(self.removed)
+
+    def __iter__(self) -> Iterator[T]:
+        removed = self.removed
+        return (item for index, item in enumerate(self.items) if index not in removed)
+
+    def _cell_range(self, rect: RectLike) -> tuple[int, int, int, int]:
+        """Returns the first and last cell (column, row) covered by the rect."""
+        col_start = math.floor(rect.left / self.cell_size)
+        row_start = math.floor(rect.top / self.cell_size)
+        # The right and bottom border are exclusive (see colliderect).
+        col_end = max(col_start, math.ceil(rect.right / self.cell_size) - 1)
+        row_end = max(row_start, math.ceil(rect.bottom / self.cell_size) - 1)
+
+        return col_start, row_start, col_end, row_end
+
+    def insert(self, item: T, rect: RectLike) -> int:
+        """
+        Register the item in every cell the rect overlaps.
+        Returns the index of the item.
+        """
+        index = len(self.items)
+        self.items.append(item)
+        self.rects.append(pg.FRect(rect))
+
+        col_start, row_start, col_end, row_end = self._cell_range(rect)
+        cells = self.cells
+        if col_start == col_end and row_start == row_end:
+            # Fast path for items within a single cell (e.g. most tiles).
+            cells.setdefault((col_start, row_start), []).append(index)
+            return index
+
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                cells.setdefault((col, row), []).append(index)
+
+        return index
+
+    def remove(self, index: int) -> None:
+        """
+        Unregister the item with the index (see insert) from its cells.
+        The indices of the other items are kept.
+        """
+        if index in self.removed:
+            return
+        self.removed.add(index)
+        col_start, row_start, col_end, row_end = self._cell_range(self.rects[index])
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                cell = self.cells.get((col, row))
+                if cell is not None and index in cell:
+                    # Replace the list, so a concurrent query is not affected.
+                    self.cells[(col, row)] = [i for i in cell if i != index]
+
+    def query_indices(self, rect: RectLike) -> list[int]:
+        """
+        Returns the (sorted) indices of all items in the cells covered by
+        the rect. The items are not tested against the rect itself.
+        """
+        col_start, row_start, col_end, row_end = self._cell_range(rect)
+        cells = self.cells
+        indices: set[int] = set()
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                cell = cells.get((col, row))
+                if cell:
+                    indices.update(cell)
+
+        return sorted(indices)
+
+    def query(self, rect: RectLike) -> list[T]:
+        """Returns all items whose rect collides with the given rect."""
+        items = self.items
+        rects = self.rects
+        return [
+            items[index]
+            for index in self.query_indices(rect)
+            if rects[index].colliderect(rect)
+        ]
+
+    def clear(self) -> None:
+        """Remove all items from the grid."""
+        self.cells.clear()
+        self.items.clear()
+        self.rects.clear()
+        self.removed.clear()
@@ -1,10 +1,18 @@
 #!/usr/bin/env python
 # coding=utf-8
+from typing import Optional
 
 import pygame as pg
 
-from pysurvive.config import DEBUG_SPRITE, GREEN, RED, YELLOW
+from pysurvive.config import (
+    DEBUG_SPRITE,
+    GREEN,
+    RED,
+    SPATIAL_GRID_CELL_SIZE,
+    YELLOW,
+)
 from pysurvive.game.core import Camera
+from pysurvive.map.spatial import RectLike, SpatialHashGrid
 
 
 class Tile(pg.sprite.Sprite):
@@ -30,15 +38,22 @@ class Tile(pg.sprite.Sprite):
         y: float = 0,
         enter: bool = False,
         block: bool = False,
+        bounding_rect: Optional[pg.FRect] = None,
     ) -> None:
         super().__init__()
         self.image = image
 
         self.rect = self.image.get_frect()
-        self.bounding_rect = pg.FRect(self.image.get_bounding_rect())
+        # The bounding rect (relative to the tile) can be passed if it is
+        # already known to avoid the expensive get_bounding_rect() call.
+        if bounding_rect is None:
+            bounding_rect = self.image.get_bounding_rect()
+        self.bounding_rect = pg.FRect(bounding_rect)
         # The initial x, y of the bounding_rect are the offsets for the bounding rect.
         self.bounding_rect_offset_x = self.bounding_rect.x
         self.bounding_rect_offset_y = self.bounding_rect.y
+        self.x = x
+        self.y = y
 
         # Tile properties.
         self.enter = enter
@@ -55,6 +70,7 @@ class Tile(pg.sprite.Sprite):
             y=self.y,
             enter=self.enter,
             block=self.block,
+            bounding_rect=self.relative_bounding_rect,
         )
 
     @property
@@ -75,6 +91,16 @@ class Tile(pg.sprite.Sprite):
         self.rect.y = _y
         self.bounding_rect.y = self.y + self.bounding_rect_offset_y
 
+    @property
+    def relative_bounding_rect(self) -> pg.FRect:
+        """Returns the bounding rect relative to the tile position."""
+        return pg.FRect(
+            self.bounding_rect_offset_x,
+            self.bounding_rect_offset_y,
+            self.bounding_rect.width,
+            self.bounding_rect.height,
+        )
+
     @property
     def width(self) -> float:
         return self.rect.width
@@ -113,7 +139,7 @@ class TileGroup(pg.sprite.Group):
 
 
 class TileGroupManager:
-    def __init__(self):
+    def __init__(self, cell_size: int = SPATIAL_GRID_CELL_SIZE):
         # Fix collection of tiles.
         self.tiles_all = TileGroup()
         self.tiles_movement_collision = TileGroup()
@@ -123,32 +149,40 @@ class TileGroupManager:
         self.tiles_close_to_player = TileGroup()
         self.tiles_movement_collision_on_screen = TileGroup()
 
+        # Spatial index of the fix collection of tiles (see build_index).
+        self.cell_size = cell_size
+        self.grid_all: SpatialHashGrid[Tile] = SpatialHashGrid(cell_size)
+        self.grid_movement_collision: SpatialHashGrid[Tile] = SpatialHashGrid(cell_size)
+        self.grid_bullet_collision: SpatialHashGrid[Tile] = SpatialHashGrid(cell_size)
+
     def update(self, camera: Camera) -> None:
         """Update the tile groups."""
+        rect = camera.rect
         # Update tiles on camera/screen.
         self.tiles_on_screen.empty()
-        self.tiles_on_screen.add(
-            pg.sprite.spritecollide(camera, self.tiles_all, False),
-        )
+        self.tiles_on_screen.add(self.get_tiles(rect))
 
         # Update tiles on screen that are relevant for collision detection.
         self.tiles_movement_collision_on_screen.empty()
-        for sprite in self.tiles_movement_collision.sprites():
-            if sprite in self.tiles_on_screen.sprites():
-                self.tiles_movement_collision_on_screen.add(sprite)
+        self.tiles_movement_collision_on_screen.add(
+            self.get_movement_collision_tiles(rect)
+        )
 
         # Update tiles close to camera.
         # self.tiles_close_to_player.empty()
         # self.tiles_close_to_player.add(
-        #     camera.near_area_rect.collideobjectsall(self.tiles_on_screen.sprites())
+        #     self.get_tiles(camera.near_area_rect)
         # )
 
-        self.tiles_all.update(camera)  # Update all tiles on the camera/screen.
+        self.tiles_on_screen.update(camera)  # Update all tiles on the camera/screen.
 
     def draw(self, surface: pg.surface.Surface, camera: Camera) -> None:
         """Draw tiles visible on camera/screen only."""
         self.tiles_on_screen.draw(surface, camera)
+        self.draw_debug(surface, camera)
 
+    def draw_debug(self, surface: pg.surface.Surface, camera: Camera) -> None:
+        """Draw the bounding rects of the tiles visible on camera/screen."""
         if DEBUG_SPRITE:
             # Drawing bounding_rect (border) for debugging.
             for sprite in self.tiles_movement_collision_on_screen:
@@ -166,11 +200,30 @@ class TileGroupManager:
         if tile.block:
             self.tiles_bullet_collision.add(tile)
 
-    # def close(self, rect: pg.Rect) -> list[Tile]:
-    #     """Returns a list of tile objects that collide with the given rect."""
-    #     return rect.collideobjectsall(self.tiles_on_screen.sprites())
-    #
-    # def closes_sprites_movement_collision(self, rect: pg.Rect) -> list[Tile]:
-    #     """Returns a list of tile objects that collide with the given rect
-    #     and are relevant for movement collision detection."""
-    #     return rect.collideobjectsall(self.close_sprites(rect))
+    def build_index(self) -> None:
+        """
+        (Re)build the spatial hash grids of the fix collection of tiles.
+        Has to be called once after all tiles are added.
+        """
+        for grid, group in (
+            (self.grid_all, self.tiles_all),
+            (self.grid_movement_collision, self.tiles_movement_collision),
+            (self.grid_bullet_collision, self.tiles_bullet_collision),
+        ):
+            grid.clear()
+            for tile in group.sprites():
+                grid.insert(tile, tile.rect)
+
+    def get_tiles(self, rect: RectLike) -> list[Tile]:
+        """Returns a list of tile objects that collide with the given rect."""
+        return self.grid_all.query(rect)
+
+    def get_movement_collision_tiles(self, rect: RectLike) -> list[Tile]:
+        """Returns a list of tile objects that collide with the given rect
+        and are relevant for movement collision detection."""
+        return self.grid_movement_collision.query(rect)
+
+    def get_bullet_collision_tiles(self, rect: RectLike) -> list[Tile]:
+        """Returns a list of tile objects that collide with the given rect
+        and are relevant for bullet collision detection."""
+        return self.grid_bullet_collision.query(rect)
@@ -1,13 +1,16 @@
 #!/usr/bin/env python
 # coding=utf-8
-from typing import Any
+import sys
+from typing import Any, Optional
 
+import numpy as np
+import pygame as pg
 import pytiled_parser as pytiled
 
+from pysurvive.assets import AssetLoader
 from pysurvive.config import ROOT_PATH
 from pysurvive.logger import Logger
 from pysurvive.map.tile import Tile
-from pysurvive.utils import load_image
 
 logger = Logger()
 
@@ -16,8 +19,15 @@ class Tileset:
 
     """Represents and load a tileset from filesystem."""
 
-    def __init__(self, _config: pytiled.tileset.Tileset) -> None:
+    def __init__(
+        self,
+        _config: pytiled.tileset.Tileset,
+        bounding_rects: Optional[np.ndarray] = None,
+    ) -> None:
         self.config = _config
+        # Precomputed bounding rects (e.g. from the level cache)
+        # indexed by the global tile id.
+        self.bounding_rects = bounding_rects
         self.tile_table: list[Tile] = self._load()
 
     def __str__(self) -> str:
@@ -33,8 +43,25 @@ class Tileset:
         The tileset consists of several tiles arranged in a row.
         """
         logger.info("Loading tileset from file %s.", self.tileset_file)
-        tileset_image, _ = load_image(self.tileset_file, alpha=True)
+        try:
+            # The image is decoded by the asset loader (or prefetched by the level).
+            tileset_image = AssetLoader().load_image(self.tileset_file).result()
+        except (pg.error, OSError) as message:
+            logger.error("Error while loading image %s: %s", self.tileset_file, message)
+            sys.exit(1)
+        tileset_image = tileset_image.convert_alpha()
         tileset_width, _ = tileset_image.get_size()
+        bounding_rects = self.bounding_rects
+        if bounding_rects is not None and (
+            bounding_rects.ndim != 2
+            or bounding_rects.shape[1] != 4
+            or len(bounding_rects) <= self.last_gid
+        ):
+            logger.warning(
+                "Bounding rects of tileset %s don't match, computing them again.",
+                self.name,
+            )
+            bounding_rects = self.bounding_rects = None
         tile_table: list[Tile] = []
         for tile_x in range(0, tileset_width // self.tile_width):
             rect = (
@@ -46,10 +73,18 @@ class Tileset:
             # Subsurface doesn’t create copies in memory.
             tile_image = tileset_image.subsurface(rect)
 
+            # Tiles beyond the tile count of the tileset have no precomputed
+            # bounding rect, so the tile computes it.
+            bounding_rect = None
+            gid = self.first_gid + tile_x
+            if bounding_rects is not None and gid < len(bounding_rects):
+                bounding_rect = pg.FRect(bounding_rects[gid].tolist())
+
             tile = Tile(
                 image=tile_image,
                 enter=self.get_property("enter"),
                 block=self.get_property("block"),
+                bounding_rect=bounding_rect,
             )
             tile_table.append(tile)
 
@@ -104,12 +139,7 @@ class Tileset:
 
     def get_property(self, name: str) -> Any:
         """Returns the property value from `name`."""
-        for prop_name, prop_value in self.properties.items():
-            try:
-                if prop_name == name:
-                    return prop_value
-            except AttributeError:
-                return None
+        return self.properties.get(name)
 
     def get_tile_index(self, tile_id: int) -> int:
         """Returns the tile index of the tile_table by id."""
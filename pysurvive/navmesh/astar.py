@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding=utf-8
+import heapq
+import itertools
+import math
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from pysurvive.navmesh.mesh import Node, Triangle
+
+Point = tuple[float, float]
+
+
+def distance(p1: Point, p2: Point) -> float:
+    """Returns the euclidean distance between two points."""
+    return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
+
+
+def find_path(
+    start: Point, end: Point, start_triangle: "Triangle", end_triangle: "Triangle"
+) -> list[Point]:
+    """
+    A* search over the nodes (centers of the shared sides) of the navmesh.
+
+    Args:
+        start (tuple[float, float]): The start point.
+        end (tuple[float, float]): The end point.
+        start_triangle (Triangle): The triangle of the start point.
+        end_triangle (Triangle): The triangle of the end point.
+
+    Returns:
+        Path (list[tuple[float, float]]): The points from start to end
+            or an empty list if there is no path.
+    """
+    nodes = find_nodes(start, end, start_triangle, end_triangle)
+    if nodes is None:
+        return []
+
+    return [start] + [node.position for node in nodes] + [end]
+
+
+def find_nodes(
+    start: Point, end: Point, start_triangle: "Triangle", end_triangle: "Triangle"
+) -> Optional[list["Node"]]:
+    """
+    A* search over the nodes (centers of the shared sides) of the navmesh.
+
+    The start point is connected to the nodes of the start triangle and
+    the nodes of the end triangle are connected to the end point. The costs
+    are the euclidean distances between the points, the heuristic is the
+    straight-line distance to the end point. The state of the search is
+    kept per query, so the nodes of the navmesh are never modified.
+
+    Returns:
+        Nodes (list[Node]): The nodes (portals) from start to end or None
+            if there is no path. The list is empty if both points are
+            located on the same triangle.
+    """
+    # Both point are located on the same triangle
+    if start_triangle is end_triangle:
+        return []
+
+    end_nodes = set(end_triangle.nodes)
+    costs: dict["Node", float] = {}
+    parents: dict["Node", Optional["Node"]] = {}
+    # Entries (f, tie breaker, node). The counter keeps the order stable
+    # and avoids comparing the nodes.
+    open_heap: list[tuple[float, int, "Node"]] = []
+    counter = itertools.count()
+    for node in start_triangle.nodes:
+        cost = distance(start, node.position)
+        if cost < costs.get(node, math.inf):
+            costs[node] = cost
+            parents[node] = None
+            heapq.heappush(
+                open_heap, (cost + distance(node.position, end), next(counter), node)
+            )
+
+    closed: set["Node"] = set()
+    best_node = None
+    best_cost = math.inf
+    while open_heap:
+        f, _, node = heapq.heappop(open_heap)
+        # The heuristic is consistent, so no better path can be found.
+        if f >= best_cost:
+            break
+        # Outdated entry of a node that has already been expanded.
+        if node in closed:
+            continue
+        closed.add(node)
+
+        cost = costs[node]
+        if node in end_nodes:
+            total = cost + distance(node.position, end)
+            if total < best_cost:
+                best_cost = total
+                best_node = node
+
+        for neighbor in node.neighbors:
+            if neighbor in closed:
+                continue
+            neighbor_cost = cost + distance(node.position, neighbor.position)
+            if neighbor_cost < costs.get(neighbor, math.inf):
+                costs[neighbor] = neighbor_cost
+                parents[neighbor] = node
+                heapq.heappush(
+                    open_heap,
+                    (
+                        neighbor_cost + distance(neighbor.position, end),
+                        next(counter),
+                        neighbor,
+                    ),
+                )
+
+    if best_node is None:
+        return None
+
+    nodes = []
+    current: Optional["Node"] = best_node
+    while current is not None:
+        nodes.append(current)
+        current = parents[current]
+
+    return nodes[::-1]
@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+import triangle as tr
+
+if TYPE_CHECKING:
+    from pysurvive.map.level import Level
+
+Point = tuple[float, float]
+
+# Has to be increased if the triangulation or the adjacency changes.
+NAVMESH_BUILDER_VERSION = 2
+
+
+def clip_rects(
+    bounds: tuple[float, float, float, float], rects: np.ndarray
+) -> np.ndarray:
+    """
+    Returns the rects (x, y, width, height) clipped to the bounds as
+    corners (x0, y0, x1, y1). Rects outside of the bounds are removed.
+    """
+    left, top, width, height = bounds
+    rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+    corners = np.column_stack(
+        (
+            np.clip(rects[:, 0], left, left + width),
+            np.clip(rects[:, 1], top, top + height),
+            np.clip(rects[:, 0] + rects[:, 2], left, left + width),
+            np.clip(rects[:, 1] + rects[:, 3], top, top + height),
+        )
+    )
+
+    return corners[(corners[:, 2] > corners[:, 0]) & (corners[:, 3] > corners[:, 1])]
+
+
+def get_walkable_grid(
+    bounds: tuple[float, float, float, float], rects: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Rasterize the walkable area (the bounds without the rects) on a grid
+    whose lines are the (unique) edges of the rects and the bounds
+    (coordinate compression). So the grid is only as fine as needed to
+    represent the union of the rects exactly.
+
+    Args:
+        bounds (tuple): The walkable area (x, y, width, height).
+        rects (ndarray): The blocked rects (x, y, width, height) with
+            shape (n, 4).
+
+    Returns:
+        xs, ys, walkable (tuple[ndarray, ndarray, ndarray]): The grid lines
+            and the walkable cells with shape (len(ys) - 1, len(xs) - 1).
+    """
+    left, top, width, height = bounds
+    x0, y0, x1, y1 = clip_rects(bounds, rects).T
+    xs = np.unique(np.concatenate(([left, left + width], x0, x1)))
+    ys = np.unique(np.concatenate(([top, top + height], y0, y1)))
+
+    # Count the rects covering each cell with a 2d difference array.
+    coverage = np.zeros((len(ys), len(xs)), dtype=np.int32)
+    col0 = np.searchsorted(xs, x0)
+    col1 = np.searchsorted(xs, x1)
+    row0 = np.searchsorted(ys, y0)
+    row1 = np.searchsorted(ys, y1)
+    np.add.at(coverage, (row0, col0), 1)
+    np.add.at(coverage, (row0, col1), -1)
+    np.add.at(coverage, (row1, col0), -1)
+    np.add.at(coverage, (row1, col1), 1)
+    coverage = coverage.cumsum(axis=0).cumsum(axis=1)
+
+    return xs, ys, coverage[:-1, :-1] == 0
+
+
+def get_outline(
+    xs: np.ndarray, ys: np.ndarray, walkable: np.ndarray
+) -> list[tuple[Point, Point]]:
+    """
+    Returns the outline (segments) of the walkable cells. Collinear
+    boundary edges are merged into a single segment, except at a vertex
+    where the outline crosses itself (diagonal walkable cells).
+    """
+    rows, cols = walkable.shape
+    padded = np.zeros((rows + 2, cols + 2), dtype=bool)
+    padded[1:-1, 1:-1] = walkable
+
+    # Boundary edges on the horizontal lines (rows + 1, cols) and
+    # on the vertical lines (rows, cols + 1).
+    horizontal = padded[:-1, 1:-1] != padded[1:, 1:-1]
+    vertical = padded[1:-1, :-1] != padded[1:-1, 1:]
+
+    # Vertices (rows + 1, cols + 1) touched by a vertical/horizontal edge.
+    touched_vertical = np.zeros((rows + 1, cols + 1), dtype=bool)
+    touched_vertical[:-1] |= vertical
+    touched_vertical[1:] |= vertical
+    touched_horizontal = np.zeros((rows + 1, cols + 1), dtype=bool)
+    touched_horizontal[:, :-1] |= horizontal
+    touched_horizontal[:, 1:] |= horizontal
+
+    segments = []
+    for edges, touched, transpose in (
+        (horizontal, touched_vertical, False),
+        (vertical.T, touched_horizontal.T, True),
+    ):
+        # An edge continues the previous edge of the line,
+        # unless another edge meets the vertex between them.
+        previous = np.zeros_like(edges)
+        previous[:, 1:] = edges[:, :-1]
+        following = np.zeros_like(edges)
+        following[:, :-1] = edges[:, 1:]
+        starts = edges & ~(previous & ~touched[:, :-1])
+        ends = edges & ~(following & ~touched[:, 1:])
+        line_xs, line_ys = (ys, xs) if transpose else (xs, ys)
+        for (line, start), (_, end) in zip(
+            np.argwhere(starts).tolist(), np.argwhere(ends).tolist()
+        ):
+            p1 = (float(line_xs[start]), float(line_ys[line]))
+            p2 = (float(line_xs[end + 1]), float(line_ys[line]))
+            if transpose:
+                p1, p2 = p1[::-1], p2[::-1]
+            segments.append((p1, p2))
+
+    return segments
+
+
+def split_border(
+    bounds: tuple[float, float, float, float],
+    rects: np.ndarray,
+    segments: list[tuple[Point, Point]],
+) -> list[tuple[Point, Point]]:
+    """
+    Split the segments on the border of the bounds at the corners of all
+    rects that touch the border line (from inside or outside). The walkable
+    area of adjacent bounds is split at the same points, so there are no
+    T-junctions between their triangulations.
+    """
+    left, top, width, height = bounds
+    right, bottom = left + width, top + height
+    rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+    x0, y0 = rects[:, 0], rects[:, 1]
+    x1, y1 = x0 + rects[:, 2], y0 + rects[:, 3]
+    # Split points on each border line (axis of the line and its position).
+    breaks = {}
+    for axis, line, touching, coords in (
+        (0, left, (x0 <= left) & (x1 >= left), (y0, y1)),
+        (0, right, (x0 <= right) & (x1 >= right), (y0, y1)),
+        (1, top, (y0 <= top) & (y1 >= top), (x0, x1)),
+        (1, bottom, (y0 <= bottom) & (y1 >= bottom), (x0, x1)),
+    ):
+        breaks[axis, line] = np.unique(
+            np.concatenate((coords[0][touching], coords[1][touching]))
+        ).tolist()
+
+    result = []
+    for p1, p2 in segments:
+        # Vertical segments are on a line with a fixed x (axis 0).
+        axis = 0 if p1[0] == p2[0] else 1
+        points = breaks.get((axis, p1[axis]))
+        if not points:
+            result.append((p1, p2))
+            continue
+        start, end = sorted((p1[1 - axis], p2[1 - axis]))
+        coords = [start] + [c for c in points if start < c < end] + [end]
+        for c1, c2 in zip(coords, coords[1:]):
+            if axis == 0:
+                result.append(((p1[0], c1), (p1[0], c2)))
+            else:
+                result.append(((c1, p1[1]), (c2, p1[1])))
+
+    return result
+
+
+def get_chunk(point: Point, chunk_size: int) -> tuple[int, int]:
+    """Returns the chunk (column, row) of the point."""
+    return int(point[0] // chunk_size), int(point[1] // chunk_size)
+
+
+def get_chunk_bounds(
+    bounds: tuple[float, float, float, float],
+    chunk: tuple[int, int],
+    chunk_size: int,
+) -> tuple[float, float, float, float]:
+    """Returns the bounds of the chunk (clipped to the bounds)."""
+    left, top, width, height = bounds
+    x0 = max(left, chunk[0] * chunk_size)
+    y0 = max(top, chunk[1] * chunk_size)
+    x1 = min(left + width, (chunk[0] + 1) * chunk_size)
+    y1 = min(top + height, (chunk[1] + 1) * chunk_size)
+
+    return x0, y0, max(0, x1 - x0), max(0, y1 - y0)
+
+
+def triangulate_chunks(
+    bounds: tuple[float, float, float, float], rects: np.ndarray, chunk_size: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Triangulate the walkable area (the bounds without the rects) chunk by
+    chunk. Every triangle is located in a single chunk, so a chunk can be
+    triangulated again later on without touching the other chunks. The
+    vertices shared by adjacent chunks are merged.
+
+    Returns:
+        vertices, triangles (tuple[ndarray, ndarray]): See triangulate.
+    """
+    left, top, width, height = bounds
+    vertices: list[Point] = []
+    vertex_indices: dict[Point, int] = {}
+    triangles = []
+    for row in range(int(top // chunk_size), math.ceil((top + height) / chunk_size)):
+        for col in range(
+            int(left // chunk_size), math.ceil((left + width) / chunk_size)
+        ):
+            chunk_bounds = get_chunk_bounds(bounds, (col, row), chunk_size)
+            chunk_vertices, chunk_triangles = triangulate(chunk_bounds, rects)
+            indices = []
+            for point in map(tuple, chunk_vertices.tolist()):
+                index = vertex_indices.get(point)
+                if index is None:
+                    index = vertex_indices[point] = len(vertices)
+                    vertices.append(point)
+                indices.append(index)
+            if len(chunk_triangles):
+                triangles.append(np.asarray(indices)[chunk_triangles])
+
+    if not triangles:
+        return np.zeros((0, 2)), np.zeros((0, 3), dtype=np.int32)
+
+    return (
+        np.array(vertices, dtype=np.float64),
+        np.concatenate(triangles).astype(np.int32),
+    )
+
+
+def triangulate(
+    bounds: tuple[float, float, float, float], rects: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Triangulate the walkable area (the bounds without the rects). The
+    sides on the border of the bounds are split at the rects touching the
+    border (see split_border), so the triangulations of adjacent bounds
+    share their vertices.
+
+    Returns:
+        vertices, triangles (tuple[ndarray, ndarray]): The vertices with
+            shape (n, 2) and the vertex indices of the triangles with
+            shape (m, 3).
+    """
+    xs, ys, walkable = get_walkable_grid(bounds, rects)
+    vertices: list[Point] = []
+    vertex_indices: dict[Point, int] = {}
+    segments = []
+    for p1, p2 in split_border(bounds, rects, get_outline(xs, ys, walkable)):
+        indices = []
+        for point in (p1, p2):
+            index = vertex_indices.get(point)
+            if index is None:
+                index = vertex_indices[point] = len(vertices)
+                vertices.append(point)
+            indices.append(index)
+        segments.append(indices)
+
+    if len(vertices) < 3:
+        return np.zeros((0, 2)), np.zeros((0, 3), dtype=np.int32)
+
+    # A hole point in the center of each blocked rect. The triangles of
+    # concavities (blocked area on the border) are removed by triangle itself.
+    holes = [
+        ((x0 + x1) / 2, (y0 + y1) / 2)
+        for x0, y0, x1, y1 in clip_rects(bounds, rects).tolist()
+    ]
+    config = {"vertices": vertices, "segments": segments}
+    if len(holes):
+        config["holes"] = holes
+    # Without quality constraints (no additional vertices), so the
+    # number of triangles is minimal.
+    result = tr.triangulate(config, "p")
+    if "triangles" not in result:
+        return np.zeros((0, 2)), np.zeros((0, 3), dtype=np.int32)
+
+    return result["vertices"], result["triangles"]
+
+
+def get_adjacency(triangles: np.ndarray) -> np.ndarray:
+    """
+    Returns the neighbor of each triangle across each of its sides with
+    shape (m, 3). The side i is the side from vertex i to vertex i + 1.
+    Sides without a neighbor (outline of the walkable area) are -1.
+    """
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    count = len(triangles)
+    adjacency = np.full((count, 3), -1, dtype=np.int32)
+    if not count:
+        return adjacency
+
+    # Key of each side (sorted pair of vertex indices).
+    first = triangles
+    second = np.roll(triangles, -1, axis=1)
+    keys = (
+        np.minimum(first, second) * (int(triangles.max()) + 1)
+        + np.maximum(first, second)
+    ).ravel()
+    order = np.argsort(keys, kind="stable")
+    # Two consecutive sides with the same key are shared by two triangles.
+    shared = np.flatnonzero(keys[order[1:]] == keys[order[:-1]])
+    side_1 = order[shared]
+    side_2 = order[shared + 1]
+    adjacency.ravel()[side_1] = side_2 // 3
+    adjacency.ravel()[side_2] = side_1 // 3
+
+    return adjacency
+
+
+def get_collider_rects(level: "Level") -> np.ndarray:
+    """Returns the rects of the movement colliders of the level."""
+    return np.array(
+        [tuple(collider.rect) for collider in level.movement_colliders],
+        dtype=np.float64,
+    ).reshape(-1, 4)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding=utf-8
+import hashlib
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from pysurvive.logger import Logger
+from pysurvive.navmesh.builder import NAVMESH_BUILDER_VERSION
+from pysurvive.utils import file_digest, load_arrays, save_arrays
+
+logger = Logger()
+
+
+def rects_digest(rects: np.ndarray) -> str:
+    """Returns the sha1 hex digest of the collider rects."""
+    return hashlib.sha1(
+        np.ascontiguousarray(rects, dtype=np.float64).tobytes()
+    ).hexdigest()
+
+
+class NavMeshCache:
+
+    """
+    Stores the triangulation of a map (vertices, triangles and adjacency)
+    as a binary file next to the map. The cache is keyed by the content
+    hash of the map file, the builder version, the chunk size and the hash
+    of the collider rects (these depend on the tileset images as well). On
+    subsequent starts the arrays are memory-mapped, so the walkable area
+    does not have to be triangulated again.
+    """
+
+    def __init__(self, map_file: Path, chunk_size: int) -> None:
+        self.map_file = Path(map_file)
+        # Size of the triangulated chunks (see triangulate_chunks).
+        self.chunk_size = chunk_size
+        self.cache_file = Path(f"{self.map_file}.navmesh")
+
+    def __repr__(self) -> str:
+        return f"NavMeshCache({self.cache_file})"
+
+    def load(
+        self, rects: np.ndarray
+    ) -> Optional[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Returns the vertices, triangles and adjacency from the cache file.
+        Returns None if there is no valid cache file for the collider rects.
+        """
+        if not self.cache_file.exists():
+            return None
+
+        try:
+            header, arrays = load_arrays(self.cache_file)
+            if not self._is_valid(header, rects):
+                logger.info("Navmesh cache %s is outdated.", self.cache_file)
+                return None
+            vertices = arrays["vertices"]
+            triangles = arrays["triangles"]
+            adjacency = arrays["adjacency"]
+            if triangles.shape != adjacency.shape or (
+                triangles.size and triangles.max() >= len(vertices)
+            ):
+                raise ValueError("inconsistent arrays")
+        except (OSError, ValueError, KeyError, TypeError) as message:
+            logger.warning(
+                "Error while loading navmesh cache %s: %s", self.cache_file, message
+            )
+            return None
+
+        logger.info("Loaded navmesh from cache %s.", self.cache_file)
+        return vertices, triangles, adjacency
+
+    def save(
+        self,
+        rects: np.ndarray,
+        vertices: np.ndarray,
+        triangles: np.ndarray,
+        adjacency: np.ndarray,
+    ) -> None:
+        """Write the triangulation to the cache file."""
+        stat = self.map_file.stat()
+        header = {
+            "version": NAVMESH_BUILDER_VERSION,
+            "source": {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha1": file_digest(self.map_file),
+            },
+            "colliders": rects_digest(rects),
+            "chunk_size": self.chunk_size,
+        }
+        try:
+            save_arrays(
+                self.cache_file,
+                header,
+                {
+                    "vertices": np.asarray(vertices, dtype=np.float64).reshape(-1, 2),
+                    "triangles": np.asarray(triangles, dtype=np.int32).reshape(-1, 3),
+                    "adjacency": np.asarray(adjacency, dtype=np.int32).reshape(-1, 3),
+                },
+            )
+        except OSError as message:
+            logger.warning(
+                "Error while writing navmesh cache %s: %s", self.cache_file, message
+            )
+
+    def _is_valid(self, header: dict[str, Any], rects: np.ndarray) -> bool:
+        """Returns True if the cache matches the map file and collider rects."""
+        if header.get("version") != NAVMESH_BUILDER_VERSION:
+            return False
+        if header["chunk_size"] != self.chunk_size:
+            return False
+
+        source = header["source"]
+        stat = self.map_file.stat()
+        if (source["mtime_ns"], source["size"]) != (stat.st_mtime_ns, stat.st_size):
+            # The map file has been touched, so compare the content.
+            if source["size"] != stat.st_size:
+                return False
+            if source["sha1"] != file_digest(self.map_file):
+                return False
+
+        return header["colliders"] == rects_digest(rects)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding=utf-8
+import heapq
+import itertools
+import math
+from typing import TYPE_CHECKING, Optional
+
+from pysurvive.navmesh.astar import distance
+
+if TYPE_CHECKING:
+    from pysurvive.navmesh.mesh import Node, Triangle
+
+Point = tuple[float, float]
+
+
+class FlowField:
+
+    """
+    Flow field towards a single target (e.g. the player) for many agents.
+
+    A single Dijkstra search from the triangle of the target over the
+    nodes (centers of the shared sides) of the navmesh yields the distance
+    of each node to the target. For each triangle the node with the
+    shortest remaining distance is stored as the next portal, so the
+    steering direction of an agent is a lookup by its triangle.
+
+    The field is only recomputed if the target enters another triangle.
+    Within the triangle of the target the agents head straight to the
+    target.
+    """
+
+    def __init__(self, mesh: list["Triangle"]) -> None:
+        self.mesh = mesh
+        self.target: Optional[Point] = None
+        self.target_triangle: Optional["Triangle"] = None
+        # Next node and remaining distance (from the center) per triangle index.
+        self.next_nodes: list[Optional["Node"]] = [None] * len(mesh)
+        self.distances: list[float] = [math.inf] * len(mesh)
+
+    def __repr__(self) -> str:
+        return f"FlowField(triangles={len(self.mesh)}, target={self.target})"
+
+    def update(self, target: Point, target_triangle: "Triangle") -> bool:
+        """
+        Set the target. Returns True if the field has been recomputed
+        (the target entered another triangle).
+        """
+        self.target = target
+        if target_triangle is self.target_triangle:
+            return False
+
+        self.target_triangle = target_triangle
+        self._compute(target, target_triangle)
+        return True
+
+    def _compute(self, target: Point, target_triangle: "Triangle") -> None:
+        """Dijkstra search from the target over all nodes of the navmesh."""
+        costs: dict["Node", float] = {}
+        open_heap: list[tuple[float, int, "Node"]] = []
+        counter = itertools.count()
+        for node in target_triangle.nodes:
+            cost = distance(target, node.position)
+            if cost < costs.get(node, math.inf):
+                costs[node] = cost
+                heapq.heappush(open_heap, (cost, next(counter), node))
+
+        closed: set["Node"] = set()
+        while open_heap:
+            cost, _, node = heapq.heappop(open_heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            for neighbor in node.neighbors:
+                if neighbor in closed:
+                    continue
+                neighbor_cost = cost + distance(node.position, neighbor.position)
+                if neighbor_cost < costs.get(neighbor, math.inf):
+                    costs[neighbor] = neighbor_cost
+                    heapq.heappush(open_heap, (neighbor_cost, next(counter), neighbor))
+
+        for triangle in self.mesh:
+            next_node = None
+            best_cost = math.inf
+            if triangle is target_triangle:
+                best_cost = distance(triangle.center, target)
+            else:
+                for node in triangle.nodes:
+                    cost = costs.get(node, math.inf) + distance(
+                        triangle.center, node.position
+                    )
+                    if cost < best_cost:
+                        next_node = node
+                        best_cost = cost
+            self.next_nodes[triangle.index] = next_node
+            self.distances[triangle.index] = best_cost
+
+    def get_direction(self, point: Point, triangle: "Triangle") -> Point:
+        """
+        Returns the (normalized) steering direction of an agent at the
+        point in the triangle. The direction is (0, 0) if the target can't
+        be reached or has been reached.
+        """
+        if triangle is self.target_triangle:
+            waypoint = self.target
+        else:
+            next_node = self.next_nodes[triangle.index]
+            if next_node is None:
+                return (0.0, 0.0)
+            waypoint = next_node.position
+
+        dx = waypoint[0] - point[0]
+        dy = waypoint[1] - point[1]
+        length = math.hypot(dx, dy)
+        if length == 0:
+            return (0.0, 0.0)
+
+        return (dx / length, dy / length)
+
+    def get_distance(self, triangle: "Triangle") -> float:
+        """
+        Returns the distance from the center of the triangle to the
+        target (along the nodes) or inf if the target can't be reached.
+        """
+        return self.distances[triangle.index]
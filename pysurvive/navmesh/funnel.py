@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pysurvive.navmesh.mesh import Node, Triangle
+
+Point = tuple[float, float]
+Portal = tuple[Point, Point]
+
+
+def cross(origin: Point, p1: Point, p2: Point) -> float:
+    """
+    Returns the cross product of the vectors origin -> p1 and origin -> p2.
+    It is positive if p2 is counterclockwise of p1 (seen from the origin).
+    """
+    return (p1[0] - origin[0]) * (p2[1] - origin[1]) - (p1[1] - origin[1]) * (
+        p2[0] - origin[0]
+    )
+
+
+def get_portals(start_triangle: "Triangle", nodes: list["Node"]) -> list[Portal]:
+    """
+    Returns the portals (shared sides) of the nodes as (left, right) pairs
+    seen in the walking direction. The direction of a portal is given by
+    the vertex of the previous triangle that is not on the portal.
+    """
+    portals = []
+    triangle = start_triangle
+    for node in nodes:
+        p1, p2 = node.side
+        opposite = next(p for p in triangle.triangle if p != p1 and p != p2)
+        portals.append((p1, p2) if cross(opposite, p2, p1) > 0 else (p2, p1))
+        triangle = (
+            node.triangles[1] if node.triangles[0] is triangle else node.triangles[0]
+        )
+
+    return portals
+
+
+def shrink_portals(portals: list[Portal], radius: float) -> list[Portal]:
+    """
+    Move both ends of each portal by the radius towards its center, so
+    the corners of the path keep the radius to the corners of the walls.
+    Portals that are narrower than the agent are collapsed to their center.
+    """
+    if radius <= 0:
+        return portals
+
+    shrinked = []
+    for left, right in portals:
+        length = math.hypot(right[0] - left[0], right[1] - left[1])
+        if length <= 2 * radius:
+            center = ((left[0] + right[0]) / 2, (left[1] + right[1]) / 2)
+            shrinked.append((center, center))
+            continue
+        dx = (right[0] - left[0]) * radius / length
+        dy = (right[1] - left[1]) * radius / length
+        shrinked.append(((left[0] + dx, left[1] + dy), (right[0] - dx, right[1] - dy)))
+
+    return shrinked
+
+
+def string_pull(start: Point, end: Point, portals: list[Portal]) -> list[Point]:
+    """
+    Simple stupid funnel algorithm. The funnel (apex, left and right side)
+    is narrowed portal by portal. If a side of the funnel crosses over the
+    other side, the other side is a corner of the path and the new apex.
+
+    Args:
+        start (tuple[float, float]): The start point.
+        end (tuple[float, float]): The end point.
+        portals (list[tuple[Point, Point]]): The (left, right) portals
+            between start and end (see get_portals).
+
+    Returns:
+        Path (list[tuple[float, float]]): The start point, the corners
+            and the end point.
+    """
+    portals = portals + [(end, end)]
+    path = [start]
+    apex = left = right = start
+    apex_index = left_index = right_index = -1
+    i = 0
+    while i < len(portals):
+        new_left, new_right = portals[i]
+
+        # Narrow the right side of the funnel.
+        if cross(apex, right, new_right) >= 0:
+            if apex == right or cross(apex, left, new_right) < 0:
+                right, right_index = new_right, i
+            else:
+                # The right side crosses over the left side.
+                if path[-1] != left:
+                    path.append(left)
+                apex, apex_index = left, left_index
+                right, right_index = apex, apex_index
+                i = apex_index + 1
+                continue
+
+        # Narrow the left side of the funnel.
+        if cross(apex, left, new_left) <= 0:
+            if apex == left or cross(apex, right, new_left) > 0:
+                left, left_index = new_left, i
+            else:
+                # The left side crosses over the right side.
+                if path[-1] != right:
+                    path.append(right)
+                apex, apex_index = right, right_index
+                left, left_index = apex, apex_index
+                i = apex_index + 1
+                continue
+
+        i += 1
+
+    if path[-1] != end:
+        path.append(end)
+
+    return path
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# coding=utf-8
+import heapq
+import itertools
+import math
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from pysurvive.config import NAVMESH_CLUSTER_SIZE
+from pysurvive.navmesh.astar import distance
+
+if TYPE_CHECKING:
+    from pysurvive.navmesh.mesh import Node, Triangle
+
+Point = tuple[float, float]
+Cluster = tuple[int, int]
+
+
+class ClusterGraph:
+
+    """
+    Hierarchical abstraction of the navmesh (HPA*).
+
+    The triangles are grouped into clusters by a grid of fixed-size
+    regions (by the center of the triangle). The nodes on the sides
+    between two clusters are the entrances. The distances between the
+    entrances of each cluster (within the cluster) are precomputed, so
+    they build a small abstract graph.
+
+    A long query searches the abstract graph only. The start and the end
+    point are connected to the entrances of their clusters by a search
+    within these clusters. Only the first segment (start to the first
+    entrance) is refined to the nodes of the navmesh, the agent replans
+    when it reaches the entrance. So the cost of a query grows with the
+    number of clusters, not with the number of triangles.
+    """
+
+    def __init__(
+        self, mesh: list["Triangle"], cluster_size: int = NAVMESH_CLUSTER_SIZE
+    ) -> None:
+        self.cluster_size = cluster_size
+        # Triangles of each cluster.
+        self.members: dict[Cluster, list["Triangle"]] = {}
+        for triangle in mesh:
+            self.members.setdefault(self.get_cluster(triangle.center), []).append(
+                triangle
+            )
+        # Entrances of each cluster.
+        self.entrances: dict[Cluster, set["Node"]] = {}
+        # Edges (entrance -> costs by entrance) of the abstract graph
+        # within each cluster.
+        self.edges: dict[Cluster, dict["Node", dict["Node", float]]] = {}
+        for cluster in self.members:
+            self._build_cluster(cluster)
+
+    def __repr__(self) -> str:
+        return (
+            f"ClusterGraph(clusters={len(self.members)},"
+            f" entrances={sum(len(e) for e in self.entrances.values())})"
+        )
+
+    def get_cluster(self, point: Point) -> Cluster:
+        """Returns the cluster (region of the grid) of the point."""
+        return (
+            int(point[0] // self.cluster_size),
+            int(point[1] // self.cluster_size),
+        )
+
+    def _build_cluster(self, cluster: Cluster) -> None:
+        """Find the entrances of the cluster and connect them."""
+        entrances = set()
+        for triangle in self.members.get(cluster, []):
+            for node in triangle.nodes:
+                if any(self.get_cluster(t.center) != cluster for t in node.triangles):
+                    entrances.add(node)
+
+        edges: dict["Node", dict["Node", float]] = {}
+        for entrance in entrances:
+            costs, _ = self._search(cluster, {entrance: 0.0})
+            edges[entrance] = {
+                other: costs[other]
+                for other in entrances
+                if other is not entrance and other in costs
+            }
+        self.entrances[cluster] = entrances
+        self.edges[cluster] = edges
+
+    def update(
+        self,
+        removed: list["Triangle"],
+        added: list["Triangle"],
+        changed: list["Triangle"],
+    ) -> None:
+        """
+        Replace the removed by the added triangles (see NavMesh.update_region)
+        and connect the entrances of the affected clusters again. The
+        changed triangles are the surrounding triangles whose nodes changed.
+        """
+        removed_ids = {id(triangle) for triangle in removed}
+        affected = {
+            self.get_cluster(triangle.center)
+            for triangle in itertools.chain(removed, added, changed)
+        }
+        for cluster in affected:
+            self.members[cluster] = [
+                t for t in self.members.get(cluster, []) if id(t) not in removed_ids
+            ]
+        for triangle in added:
+            self.members[self.get_cluster(triangle.center)].append(triangle)
+        for cluster in affected:
+            self._build_cluster(cluster)
+
+    def _get_edges(self, entrance: "Node") -> Iterator[tuple["Node", float]]:
+        """Returns the edges of the entrance in all of its clusters."""
+        for cluster in {self.get_cluster(t.center) for t in entrance.triangles}:
+            yield from self.edges.get(cluster, {}).get(entrance, {}).items()
+
+    def _search(
+        self, cluster: Cluster, seeds: dict["Node", float]
+    ) -> tuple[dict["Node", float], dict["Node", Optional["Node"]]]:
+        """
+        Dijkstra search from the seeds (nodes with initial costs) over the
+        nodes of the triangles of the cluster. Returns the costs and the
+        parents of the reached nodes.
+        """
+        costs = dict(seeds)
+        parents: dict["Node", Optional["Node"]] = dict.fromkeys(seeds)
+        counter = itertools.count()
+        open_heap = [(cost, next(counter), node) for node, cost in seeds.items()]
+        heapq.heapify(open_heap)
+        closed: set["Node"] = set()
+        while open_heap:
+            cost, _, node = heapq.heappop(open_heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            for triangle in node.triangles:
+                if self.get_cluster(triangle.center) != cluster:
+                    continue
+                for neighbor in triangle.nodes:
+                    if neighbor in closed:
+                        continue
+                    neighbor_cost = cost + distance(node.position, neighbor.position)
+                    if neighbor_cost < costs.get(neighbor, math.inf):
+                        costs[neighbor] = neighbor_cost
+                        parents[neighbor] = node
+                        heapq.heappush(
+                            open_heap, (neighbor_cost, next(counter), neighbor)
+                        )
+
+        return costs, parents
+
+    def find_path(
+        self,
+        start: Point,
+        end: Point,
+        start_triangle: "Triangle",
+        end_triangle: "Triangle",
+    ) -> Optional[list[Point]]:
+        """
+        Search the abstract graph from start to end.
+
+        Returns:
+            Path (list[tuple[float, float]]): The start point, the nodes of
+                the first segment, the following entrances and the end point
+                or an empty list if there is no path. None if both points
+                are located in the same cluster (no abstract path).
+        """
+        start_cluster = self.get_cluster(start_triangle.center)
+        end_cluster = self.get_cluster(end_triangle.center)
+        if start_cluster == end_cluster:
+            return None
+
+        # Connect the start and the end point to the entrances of their clusters.
+        start_costs, start_parents = self._search(
+            start_cluster,
+            {node: distance(start, node.position) for node in start_triangle.nodes},
+        )
+        end_costs, _ = self._search(
+            end_cluster,
+            {node: distance(end, node.position) for node in end_triangle.nodes},
+        )
+        end_entrances = self.entrances.get(end_cluster, set())
+
+        costs: dict["Node", float] = {}
+        parents: dict["Node", Optional["Node"]] = {}
+        counter = itertools.count()
+        open_heap: list[tuple[float, int, "Node"]] = []
+        for entrance in self.entrances.get(start_cluster, set()):
+            cost = start_costs.get(entrance, math.inf)
+            if cost < math.inf:
+                costs[entrance] = cost
+                parents[entrance] = None
+                heapq.heappush(
+                    open_heap,
+                    (cost + distance(entrance.position, end), next(counter), entrance),
+                )
+
+        closed: set["Node"] = set()
+        best_entrance = None
+        best_cost = math.inf
+        while open_heap:
+            f, _, entrance = heapq.heappop(open_heap)
+            if f >= best_cost:
+                break
+            if entrance in closed:
+                continue
+            closed.add(entrance)
+
+            cost = costs[entrance]
+            if entrance in end_entrances:
+                total = cost + end_costs.get(entrance, math.inf)
+                if total < best_cost:
+                    best_cost = total
+                    best_entrance = entrance
+
+            for neighbor, edge_cost in self._get_edges(entrance):
+                if neighbor in closed:
+                    continue
+                neighbor_cost = cost + edge_cost
+                if neighbor_cost < costs.get(neighbor, math.inf):
+                    costs[neighbor] = neighbor_cost
+                    parents[neighbor] = entrance
+                    heapq.heappush(
+                        open_heap,
+                        (
+                            neighbor_cost + distance(neighbor.position, end),
+                            next(counter),
+                            neighbor,
+                        ),
+                    )
+
+        if best_entrance is None:
+            return []
+
+        entrances = []
+        current: Optional["Node"] = best_entrance
+        while current is not None:
+            entrances.append(current)
+            current = parents[current]
+        entrances.reverse()
+
+        # Refine the first segment (start to the first entrance).
+        first_segment = []
+        node: Optional["Node"] = start_parents[entrances[0]]
+        while node is not None:
+            first_segment.append(node)
+            node = start_parents[node]
+        first_segment.reverse()
+
+        return (
+            [start]
+            + [node.position for node in first_segment]
+            + [entrance.position for entrance in entrances]
+            + [end]
+        )
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# coding=utf-8
+from typing import TYPE_CHECKING, Optional
+
+import pygame as pg
+
+from pysurvive.config import NAVMESH_CELL_SIZE
+from pysurvive.map.spatial import SpatialHashGrid
+
+if TYPE_CHECKING:
+    from pysurvive.navmesh.mesh import Triangle
+
+Point = tuple[float, float]
+
+
+class TriangleLocator:
+
+    """
+    Point location index of the navmesh triangles.
+
+    A query first walks from a hint (e.g. the last known triangle of an
+    agent) towards the point. Agents move only a short distance between
+    two frames, so the point is usually located in the hint itself or in
+    one of its neighbors. Otherwise the triangles whose bounding box
+    covers the cell of the point are tested (bucket grid).
+    """
+
+    def __init__(
+        self,
+        mesh: list["Triangle"],
+        cell_size: int = NAVMESH_CELL_SIZE,
+        max_walk: int = 8,
+    ) -> None:
+        self.max_walk = max_walk
+        # The current mesh to check the hints (see locate).
+        self.mesh = mesh
+        self.grid: SpatialHashGrid["Triangle"] = SpatialHashGrid(cell_size)
+        # Index in the grid by the id of the triangle (see remove).
+        self.indices: dict[int, int] = {}
+        self.insert(mesh)
+
+    def __repr__(self) -> str:
+        return f"TriangleLocator(triangles={len(self.grid)})"
+
+    def insert(self, triangles: list["Triangle"]) -> None:
+        """Add the triangles to the index."""
+        for triangle in triangles:
+            xs = [point[0] for point in triangle.triangle]
+            ys = [point[1] for point in triangle.triangle]
+            self.indices[id(triangle)] = self.grid.insert(
+                triangle,
+                pg.FRect(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)),
+            )
+
+    def remove(self, triangles: list["Triangle"]) -> None:
+        """Remove the triangles (e.g. of an updated region) from the index."""
+        for triangle in triangles:
+            index = self.indices.pop(id(triangle), None)
+            if index is not None:
+                self.grid.remove(index)
+
+    def locate(
+        self, point: Point, hint: Optional["Triangle"] = None
+    ) -> Optional["Triangle"]:
+        """
+        Returns the triangle in which the point is located or None
+        if the point is outside of the navmesh. Hints that are not part
+        of the mesh anymore (e.g. removed by an updated region) are ignored.
+        """
+        if hint is not None and self._is_alive(hint):
+            triangle = self._walk(point, hint)
+            if triangle is not None:
+                return triangle
+
+        items = self.grid.items
+        for index in self.grid.query_indices(pg.FRect(point[0], point[1], 0, 0)):
+            if items[index].is_point_in_triangle(point):
+                return items[index]
+
+        return None
+
+    def _is_alive(self, triangle: "Triangle") -> bool:
+        """Returns True if the triangle is still part of the mesh."""
+        index = triangle.index
+        return (
+            index is not None
+            and index < len(self.mesh)
+            and self.mesh[index] is triangle
+        )
+
+    def _walk(self, point: Point, triangle: "Triangle") -> Optional["Triangle"]:
+        """
+        Walk from the triangle to the neighbor across the side that
+        separates the triangle from the point until the point is located.
+        Returns None if the walk leaves the navmesh or takes too long.
+        """
+        for _ in range(self.max_walk):
+            if triangle.is_point_in_triangle(point):
+                return triangle
+            side = triangle.get_side_facing(point)
+            if side is None:
+                return None
+            triangle = triangle.get_neighbor(side)
+            if triangle is None:
+                return None
+
+        return None
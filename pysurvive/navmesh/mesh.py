@@ -0,0 +1,712 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+import time
+
+import numpy as np
+import pygame as pg
+
+from pysurvive.config import NAVMESH_AGENT_RADIUS, NAVMESH_CHUNK_SIZE
+from pysurvive.logger import Logger
+from pysurvive.navmesh.astar import find_nodes, find_path
+from pysurvive.navmesh.builder import (
+    get_adjacency,
+    get_chunk,
+    get_chunk_bounds,
+    get_collider_rects,
+    triangulate,
+    triangulate_chunks,
+)
+from pysurvive.navmesh.cache import NavMeshCache
+from pysurvive.navmesh.flowfield import FlowField
+from pysurvive.navmesh.funnel import get_portals, shrink_portals, string_pull
+from pysurvive.navmesh.hierarchy import ClusterGraph
+from pysurvive.navmesh.locator import TriangleLocator
+
+logger = Logger()
+
+
+class NavMesh:
+
+    """
+    This NavMesh class creates a navmesh (division of the
+    walkable areas of game world into triangles).
+    Based on this navmesh the AI can find paths through the
+    game world to the destination (e.g. player).
+    """
+
+    mesh = []  # type: ignore
+
+    def __init__(self, _level, chunk_size=NAVMESH_CHUNK_SIZE):
+        self.level = _level
+        self.bounds = (0, 0, self.level.map_width, self.level.map_height)
+        self.chunk_size = chunk_size
+        # Rects of the collision tiles and of the blocked regions.
+        self.collider_rects = get_collider_rects(self.level)
+        self.blocked_regions = []
+        self.mesh = self._init_navmesh()
+        # Triangles by chunk (see update_region).
+        self.chunks = {}
+        for triangle in self.mesh:
+            self.chunks.setdefault(self._get_chunk(triangle), []).append(triangle)
+        self.locator = TriangleLocator(self.mesh)
+        # Shared flow field towards the player (see update_flow_field).
+        self.flow_field = FlowField(self.mesh)
+        # Abstract graph of the clusters for long queries (see clusters).
+        self._clusters = None
+        # Number of changes and the changed regions (see is_path_affected).
+        self.revision = 0
+        self.changes = []
+
+    @property
+    def clusters(self):
+        """
+        The abstract graph of the clusters. It is built on the first
+        hierarchical query, so the startup is not delayed without.
+        """
+        if self._clusters is None:
+            self._clusters = ClusterGraph(self.mesh)
+        return self._clusters
+
+    def _init_navmesh(self):
+        """
+        Triangulate the walkable area of the level chunk by chunk. The
+        walkable area is the map without the (merged) movement collision
+        tiles. The triangulation is loaded from the cache file of the map
+        if it is still valid.
+        """
+        start_time = time.perf_counter()
+        rects = self.collider_rects
+        cache = NavMeshCache(self.level.map_file, self.chunk_size)
+        arrays = cache.load(rects)
+        if arrays is None:
+            vertices, triangles = triangulate_chunks(
+                self.bounds, rects, self.chunk_size
+            )
+            adjacency = get_adjacency(triangles)
+            cache.save(rects, vertices, triangles, adjacency)
+        else:
+            vertices, triangles, adjacency = arrays
+        mesh = build_mesh(vertices.tolist(), triangles.tolist(), adjacency)
+        logger.info(
+            "Built navmesh with %s triangles in %.3f s.",
+            len(mesh),
+            time.perf_counter() - start_time,
+        )
+
+        return mesh
+
+    def _get_chunk(self, triangle):
+        """Returns the chunk of the triangle (by its center)."""
+        return get_chunk(triangle.center, self.chunk_size)
+
+    def block_region(self, rect):
+        """
+        Mark the region (x, y, width, height) as blocked (e.g. a closed
+        door or a barricade). Only the chunks of the region are
+        triangulated again (see update_region).
+        """
+        rect = tuple(rect)
+        self.blocked_regions.append(rect)
+        self.update_region(rect)
+
+    def unblock_region(self, rect):
+        """
+        Remove a region that has been blocked (see block_region), e.g.
+        when a door is opened.
+        """
+        rect = tuple(rect)
+        if rect not in self.blocked_regions:
+            logger.warning("Region %s is not blocked.", rect)
+            return
+        self.blocked_regions.remove(rect)
+        self.update_region(rect)
+
+    def update_region(self, rect):
+        """
+        Triangulate the chunks touched by the region again and patch the
+        adjacency to the triangles of the surrounding chunks. The chunks
+        on the border of the region are affected as well, since their
+        sides are split at the corners of the region (see split_border).
+
+        The flow field is recomputed on the next update and the clusters
+        of the region are connected again. Paths can be checked with
+        is_path_affected.
+        """
+        start_time = time.perf_counter()
+        x, y, width, height = rect
+        chunk_start = get_chunk((x, y), self.chunk_size)
+        chunk_end = get_chunk((x + width, y + height), self.chunk_size)
+        affected = [
+            (col, row)
+            for row in range(chunk_start[1] - 1, chunk_end[1] + 2)
+            for col in range(chunk_start[0] - 1, chunk_end[0] + 2)
+            if self._is_touching(rect, (col, row))
+        ]
+
+        # Remove the triangles of the chunks and detach them from the
+        # triangles of the surrounding chunks. The lists are replaced and
+        # never modified in place, so a search of the path service keeps
+        # a consistent view.
+        removed_triangles = [
+            triangle for chunk in affected for triangle in self.chunks.pop(chunk, [])
+        ]
+        removed = {id(triangle) for triangle in removed_triangles}
+        outside = {}
+        for triangle in removed_triangles:
+            for neighbor in triangle.neighbors:
+                if id(neighbor) not in removed:
+                    outside[id(neighbor)] = neighbor
+        for triangle in outside.values():
+            triangle.neighbors = [n for n in triangle.neighbors if id(n) not in removed]
+            triangle.nodes = [
+                node
+                for node in triangle.nodes
+                if not any(id(t) in removed for t in node.triangles)
+            ]
+
+        # Triangulate the chunks again.
+        rects = np.concatenate(
+            (
+                self.collider_rects,
+                np.array(self.blocked_regions, dtype=np.float64).reshape(-1, 4),
+            )
+        )
+        added = []
+        for chunk in affected:
+            vertices, triangles = triangulate(
+                get_chunk_bounds(self.bounds, chunk, self.chunk_size), rects
+            )
+            chunk_mesh = build_mesh(vertices.tolist(), triangles.tolist())
+            if chunk_mesh:
+                self.chunks[chunk] = chunk_mesh
+            added.extend(chunk_mesh)
+
+        # Connect the new triangles with each other (across the chunks) and
+        # with the triangles of the surrounding chunks.
+        open_sides = {}
+        for triangle in added + list(outside.values()):
+            for side in triangle.get_open_sides():
+                key = (min(side), max(side))
+                other = open_sides.pop(key, None)
+                if other is None:
+                    open_sides[key] = triangle
+                    continue
+                node = Node(
+                    triangle, ((key[0][0] + key[1][0]) / 2, (key[0][1] + key[1][1]) / 2)
+                )
+                node.side = key
+                node.triangles = [other, triangle]
+                for a, b in ((triangle, other), (other, triangle)):
+                    a.neighbors = a.neighbors + [b]
+                    a.nodes = a.nodes + [node]
+        for triangle in added + list(outside.values()):
+            for node in triangle.nodes:
+                node.neighbors = [
+                    other
+                    for t in node.triangles
+                    for other in t.nodes
+                    if other is not node
+                ]
+
+        self.mesh = self._replace_triangles(removed_triangles, added)
+        self.locator.remove(removed_triangles)
+        self.locator.insert(added)
+        self.locator.mesh = self.mesh
+        self.flow_field = FlowField(self.mesh)
+        if self._clusters is not None:
+            self._clusters.update(removed_triangles, added, list(outside.values()))
+        self.revision += 1
+        self.changes.append((self.revision, rect))
+        logger.debug(
+            "Updated %s chunks of the navmesh in %.4f s.",
+            len(affected),
+            time.perf_counter() - start_time,
+        )
+
+    def _replace_triangles(self, removed, added):
+        """
+        Returns a copy of the mesh with the removed triangles replaced by
+        the added triangles. The new triangles take the indices of the
+        removed ones and the gaps are filled with the last triangles, so
+        only the indices of the changed triangles are updated.
+        """
+        mesh = list(self.mesh)
+        free = sorted(triangle.index for triangle in removed)
+        for triangle in added:
+            if free:
+                triangle.index = free.pop()
+                mesh[triangle.index] = triangle
+            else:
+                triangle.index = len(mesh)
+                mesh.append(triangle)
+        # Fill the remaining gaps (from the end, so a moved triangle is
+        # never a removed one).
+        for index in reversed(free):
+            last = mesh.pop()
+            if index < len(mesh):
+                mesh[index] = last
+                last.index = index
+        # Mark the removed triangles as dead, so cached hints (e.g. the last
+        # triangle of an enemy) are not used anymore (see TriangleLocator).
+        for triangle in removed:
+            triangle.index = None
+            triangle.neighbors = []
+            triangle.nodes = []
+
+        return mesh
+
+    def _is_touching(self, rect, chunk):
+        """Returns True if the (closed) region touches the (closed) chunk."""
+        x, y, width, height = rect
+        cx, cy, cwidth, cheight = get_chunk_bounds(self.bounds, chunk, self.chunk_size)
+        if cwidth <= 0 or cheight <= 0:
+            return False
+        return (
+            x <= cx + cwidth
+            and cx <= x + width
+            and y <= cy + cheight
+            and cy <= y + height
+        )
+
+    def is_path_affected(self, path, revision):
+        """
+        Returns True if a region that has been changed after the revision
+        (e.g. when the path was searched) crosses the path.
+        """
+        for change_revision, (x, y, width, height) in reversed(self.changes):
+            if change_revision <= revision:
+                break
+            region = pg.FRect(x, y, width, height)
+            for p1, p2 in zip(path, path[1:]):
+                if region.clipline(p1, p2):
+                    return True
+
+        return False
+
+    def get_triangle(self, point, hint=None):
+        """
+        Returns the triagle (navmesh section) in which
+        the point is located. The hint (e.g. the last known
+        triangle of an agent) speeds up the lookup.
+        """
+
+        return self.locator.locate(point, hint)
+
+    def get_astar_path(self, start, end, start_hint=None, end_hint=None):
+        """
+        Returns a list of tuples as a path from the given start
+        to the given end point.
+        """
+
+        # Find the triangles of start and end position.
+        start_tri = self.get_triangle(start, start_hint)
+        end_tri = self.get_triangle(end, end_hint)
+
+        # One or both points are outside all triangles
+        if not start_tri or not end_tri:
+            logger.warning("Start and/or end point are outside of triangle.")
+            return []
+
+        return find_path(start, end, start_tri, end_tri)
+
+    def get_hierarchical_path(self, start, end, start_hint=None, end_hint=None):
+        """
+        Returns a path from the given start to the given end point based
+        on the abstract graph of the clusters (see ClusterGraph). Only the
+        first segment of the path is refined, the following points are the
+        entrances of the clusters on the way. Queries within a single
+        cluster are searched on the navmesh directly (see get_astar_path).
+        """
+
+        # Find the triangles of start and end position.
+        start_tri = self.get_triangle(start, start_hint)
+        end_tri = self.get_triangle(end, end_hint)
+
+        # One or both points are outside all triangles
+        if not start_tri or not end_tri:
+            logger.warning("Start and/or end point are outside of triangle.")
+            return []
+
+        path = self.clusters.find_path(start, end, start_tri, end_tri)
+        if path is None:
+            return find_path(start, end, start_tri, end_tri)
+
+        return path
+
+    def get_path(
+        self,
+        start,
+        end,
+        radius=NAVMESH_AGENT_RADIUS,
+        start_hint=None,
+        end_hint=None,
+    ):
+        """
+        Returns the smoothed path (start point, corners and end point)
+        from the given start to the given end point. The corners keep
+        the radius (of the agent) to the corners of the walls.
+        """
+
+        # Find the triangles of start and end position.
+        start_tri = self.get_triangle(start, start_hint)
+        end_tri = self.get_triangle(end, end_hint)
+
+        # One or both points are outside all triangles
+        if not start_tri or not end_tri:
+            logger.warning("Start and/or end point are outside of triangle.")
+            return []
+
+        # Most short paths are a direct line.
+        if self.is_walkable_line(start, end, radius, start_tri):
+            return [start, end]
+
+        nodes = find_nodes(start, end, start_tri, end_tri)
+        if nodes is None:
+            return []
+
+        return string_pull(
+            start, end, shrink_portals(get_portals(start_tri, nodes), radius)
+        )
+
+    def update_flow_field(self, target, hint=None):
+        """
+        Set the target (e.g. the player position) of the flow field.
+        The field is only recomputed if the target entered another
+        triangle. Returns the triangle of the target.
+        """
+
+        triangle = self.get_triangle(target, hint or self.flow_field.target_triangle)
+        if triangle is not None:
+            self.flow_field.update(target, triangle)
+
+        return triangle
+
+    def get_flow_direction(self, point, hint=None):
+        """
+        Returns the (normalized) steering direction along the flow field
+        at the given point and the triangle of the point.
+        """
+
+        triangle = self.get_triangle(point, hint)
+        if triangle is None:
+            return (0.0, 0.0), None
+
+        return self.flow_field.get_direction(point, triangle), triangle
+
+    def is_walkable_line(self, start, end, radius=0.0, start_hint=None):
+        """
+        Returns True if the direct line from start to end doesn't leave
+        the navmesh. The line is walked triangle by triangle through the
+        shared sides, so the costs depend on the length of the line only.
+        With a radius the line has to keep this distance to the walls
+        (sides without neighbor) of the triangles along the line.
+        """
+
+        triangle = self.get_triangle(start, start_hint)
+        if triangle is None:
+            return False
+
+        for _ in range(len(self.mesh)):
+            if radius > 0 and not self._has_clearance(triangle, start, end, radius):
+                return False
+            if triangle.is_point_in_triangle(end):
+                return True
+            side = triangle.get_side_crossed(start, end)
+            if side is None:
+                return False
+            triangle = triangle.get_neighbor(side)
+            if triangle is None:
+                return False
+
+        return False
+
+    @staticmethod
+    def _has_clearance(triangle, start, end, radius):
+        """
+        Returns True if the walls of the triangle keep a distance of the
+        radius to the line from start to end.
+        """
+        for i in range(3):
+            side = (triangle.triangle[i], triangle.triangle[(i + 1) % 3])
+            if triangle.get_neighbor(side) is not None:
+                continue
+            if segment_distance(start, end, side[0], side[1]) < radius:
+                return False
+
+        return True
+
+
+def segment_distance(p1, p2, q1, q2):
+    """Returns the distance between the segments p1 -> p2 and q1 -> q2."""
+
+    def point_distance(point, a, b):
+        dx = b[0] - a[0]
+        dy = b[1] - a[1]
+        length = dx * dx + dy * dy
+        t = 0.0
+        if length > 0:
+            t = ((point[0] - a[0]) * dx + (point[1] - a[1]) * dy) / length
+            t = min(max(t, 0.0), 1.0)
+        return math.hypot(a[0] + t * dx - point[0], a[1] + t * dy - point[1])
+
+    def orientation(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    # Intersecting segments.
+    if (
+        orientation(p1, p2, q1) * orientation(p1, p2, q2) < 0
+        and orientation(q1, q2, p1) * orientation(q1, q2, p2) < 0
+    ):
+        return 0.0
+
+    return min(
+        point_distance(p1, q1, q2),
+        point_distance(p2, q1, q2),
+        point_distance(q1, p1, p2),
+        point_distance(q2, p1, p2),
+    )
+
+
+def build_mesh(vertices, triangles, adjacency=None):
+    """
+    Create the triangle and node objects based on the triangulation
+    (list of vertices and list of vertex indices of each triangle).
+
+    Two triangles are neighbors if they share a side. The neighbor of
+    each side is taken from the adjacency (see get_adjacency), so the
+    construction is linear in the number of triangles. A node is created
+    on the center of each shared side only, the sides adjacent to an
+    obstacle have no node.
+    """
+
+    if adjacency is None:
+        adjacency = get_adjacency(triangles)
+    if not isinstance(adjacency, list):
+        adjacency = adjacency.tolist()
+
+    mesh = []
+    # Create triangle objects based on the triangulation.
+    for triangle in triangles:
+        polygon = []
+        for index in triangle:
+            point = vertices[index]
+            polygon.append((point[0], point[1]))
+        tri = Triangle(polygon)
+        tri.index = len(mesh)
+        mesh.append(tri)
+
+    # Find the neighbors and create the node of each shared side.
+    nodes = {}
+    for i, (tri, neighbors) in enumerate(zip(mesh, adjacency)):
+        for side, j in enumerate(neighbors):
+            if j < 0:
+                continue
+            tri.neighbors.append(mesh[j])
+            key = (min(i, j), max(i, j))
+            node = nodes.get(key)
+            if node is None:
+                p1 = tri.triangle[side]
+                p2 = tri.triangle[(side + 1) % 3]
+                node = Node(tri, ((p1[0] + p2[0]) / 2, (p1[1] + p2[1]) / 2))
+                node.side = (p1, p2)
+                node.triangles = [mesh[key[0]], mesh[key[1]]]
+                nodes[key] = node
+            tri.nodes.append(node)
+
+    # Connect each node with the other nodes of its triangles.
+    for tri in mesh:
+        for node in tri.nodes:
+            for neighbor in tri.nodes:
+                if neighbor is not node:
+                    node.neighbors.append(neighbor)
+
+    return mesh
+
+
+class Node:
+
+    """
+    Wrapper class for nodes.
+
+    A node is located on the center of a side that is shared
+    by two triangles. Based on this class, the total route can
+    be determined later on. The state of a search (costs, parents)
+    is not stored on the node (see find_path).
+    """
+
+    def __init__(self, _triangle, _position=None):
+        # Reference to its parents triangle.
+        self.triangle = _triangle
+        # Node position.
+        self.position = _position
+        # The shared side (portal) on which the node is located.
+        self.side = None
+        # Triangles that share the node.
+        self.triangles = []
+        # Nodes that can be reached directly (same triangle).
+        self.neighbors = []
+
+    def __repr__(self):
+        return f"Node({self.position})"
+
+    def __eq__(self, other):
+        return self.position == other.position
+
+    def __hash__(self):
+        return hash(self.position)
+
+
+class Triangle:
+
+    """
+    A triangle class for A* pathfinding.
+
+    This class represented a triangle. The node point of this is
+    the center of the triangle. Furthermore each triangle
+    contains a list with the corresponding adjacent.
+
+    Mutliple triangles and its nodes (center) build the route later.
+    """
+
+    def __init__(self, _triangle):
+        # List of points of this node / triangle
+        self.triangle = _triangle
+        # Center point of this triangle
+        self.center = self._get_center()
+        # Index of the triangle in the navmesh.
+        self.index = None
+
+        # Nodes on the sides shared with the adjacent triangles.
+        self.nodes = []
+
+        # List of adjacent trianles
+        self.neighbors = []
+
+    def __eq__(self, other):
+        return self.center == other.center
+
+    def _get_center(self):
+        """
+        Get the center point of the triangle.
+        """
+
+        # ox = (ax + bx + cx) / 3
+        # oy = (ay + by + cy) / 3
+        ox = 0
+        oy = 0
+        for p in self.triangle:
+            ox += p[0]
+            oy += p[1]
+
+        return (ox // 3, oy // 3)
+
+    def get_open_sides(self):
+        """
+        Returns the sides (tuples of two points) of the triangle without
+        an adjacent triangle.
+        """
+        sides = []
+        for i in range(3):
+            side = (self.triangle[i], self.triangle[(i + 1) % 3])
+            if self.get_neighbor(side) is None:
+                sides.append(side)
+
+        return sides
+
+    def get_side_facing(self, point):
+        """
+        Returns the side (tuple of two points) of the triangle that
+        separates the triangle from the point. If the point is beyond
+        multiple sides the side with the largest distance is returned.
+        Returns None if the point is not beyond any side.
+        """
+        side = None
+        max_distance = 0.0
+        for i in range(3):
+            a = self.triangle[i]
+            b = self.triangle[(i + 1) % 3]
+            c = self.triangle[(i + 2) % 3]
+            # Compare the side of the point with the side of the opposite vertex.
+            cross_point = (b[0] - a[0]) * (point[1] - a[1]) - (b[1] - a[1]) * (
+                point[0] - a[0]
+            )
+            cross_vertex = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+            if cross_point * cross_vertex < 0:
+                _distance = abs(cross_point) / math.hypot(b[0] - a[0], b[1] - a[1])
+                if _distance > max_distance:
+                    max_distance = _distance
+                    side = (a, b)
+
+        return side
+
+    def get_neighbor(self, side):
+        """
+        Returns the adjacent triangle that shares the side (tuple of two
+        points) or None if the side is adjacent to an obstacle.
+        """
+        for neighbor in self.neighbors:
+            if side[0] in neighbor.triangle and side[1] in neighbor.triangle:
+                return neighbor
+
+        return None
+
+    def get_side_crossed(self, start, end):
+        """
+        Returns the side (tuple of two points) of the triangle through
+        which the line from start to end leaves the triangle.
+        Returns None if the end point is not beyond any side.
+        """
+        for i in range(3):
+            a = self.triangle[i]
+            b = self.triangle[(i + 1) % 3]
+            c = self.triangle[(i + 2) % 3]
+            cross_end = (b[0] - a[0]) * (end[1] - a[1]) - (b[1] - a[1]) * (
+                end[0] - a[0]
+            )
+            cross_vertex = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+            if cross_end * cross_vertex >= 0:
+                continue
+            # The end point is beyond the side, check that the line
+            # passes between both points of the side.
+            cross_a = (end[0] - start[0]) * (a[1] - start[1]) - (end[1] - start[1]) * (
+                a[0] - start[0]
+            )
+            cross_b = (end[0] - start[0]) * (b[1] - start[1]) - (end[1] - start[1]) * (
+                b[0] - start[0]
+            )
+            if cross_a * cross_b <= 0:
+                return (a, b)
+
+        return None
+
+    def is_point_in_triangle(self, point):
+        """
+        Returns True if the point is inside the triangle and returns False
+        if it falls outside.
+
+        :param point: is a tuple with two elements containing the
+                      x, y coordinates respectively.
+        :param triangle: is a tuple with three elements each element
+                         consisting of a tuple of x, y coordinates.
+
+        It works like this:
+        Walk clockwise or counterclockwise around the triangle and
+        project the point onto the segment we are crossing by using
+        the dot product. Finally, check that the vector created is
+        on the same side for each of the triangle's segments.
+        """
+        # Unpack arguments
+        x, y = point
+        ax, ay = self.triangle[0]
+        bx, by = self.triangle[1]
+        cx, cy = self.triangle[2]
+        # Segment A to B
+        side_1 = (x - bx) * (ay - by) - (ax - bx) * (y - by)
+        # Segment B to C
+        side_2 = (x - cx) * (by - cy) - (bx - cx) * (y - cy)
+        # Segment C to A
+        side_3 = (x - ax) * (cy - ay) - (cx - ax) * (y - ay)
+
+        # All the signs must be positive or all negative
+        return (side_1 < 0.0) == (side_2 < 0.0) == (side_3 < 0.0)
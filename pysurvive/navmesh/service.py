@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# coding=utf-8
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Optional
+
+from pysurvive.config import NAVMESH_AGENT_RADIUS, PATH_SERVICE_BUDGET
+from pysurvive.logger import Logger
+
+if TYPE_CHECKING:
+    from pysurvive.navmesh.mesh import NavMesh, Triangle
+
+logger = Logger()
+
+Point = tuple[float, float]
+
+
+class PathService:
+
+    """
+    Asynchronous path queries on a navmesh.
+
+    Agents submit requests and get a future, the paths are searched by a
+    worker thread and are available on a later frame. The navmesh is
+    never modified by a query (the state of a search is kept per query),
+    so the worker reads the same mesh as the game without a copy.
+
+    Identical requests (same start, end and radius) are coalesced into a
+    single search and share the future. The worker only searches for a
+    limited time (budget) per frame (see update), so the frame time stays
+    flat no matter how many agents replan. A single search is never
+    interrupted, so the budget may be exceeded by the last search.
+    """
+
+    def __init__(self, navmesh: "NavMesh", budget: float = PATH_SERVICE_BUDGET):
+        self.navmesh = navmesh
+        # Time (in seconds) per frame the worker may search.
+        self.budget = budget
+        self.queue: deque = deque()
+        # Futures of the queued requests by key.
+        self.pending: dict[tuple, Future] = {}
+        self.lock = threading.Lock()
+        self.frame = threading.Event()
+        self.running = False
+        self.worker: Optional[threading.Thread] = None
+
+    def __repr__(self) -> str:
+        return f"PathService(budget={self.budget}, pending={len(self.pending)})"
+
+    def request(
+        self,
+        start: Point,
+        end: Point,
+        radius: float = NAVMESH_AGENT_RADIUS,
+        start_hint: Optional["Triangle"] = None,
+    ) -> Future:
+        """
+        Request the path from start to end (see NavMesh.get_path).
+        Returns a future of the path.
+        """
+        key = (
+            (round(start[0]), round(start[1])),
+            (round(end[0]), round(end[1])),
+            radius,
+        )
+        with self.lock:
+            future = self.pending.get(key)
+            if future is None:
+                future = Future()
+                self.pending[key] = future
+                self.queue.append((key, start, end, radius, start_hint, future))
+
+        return future
+
+    def update(self) -> None:
+        """
+        Let the worker search for the duration of the budget.
+        Has to be called once per frame.
+        """
+        if self.worker is None:
+            self.running = True
+            self.worker = threading.Thread(target=self._work, daemon=True)
+            self.worker.start()
+        self.frame.set()
+
+    def shutdown(self) -> None:
+        """Stop the worker and cancel the queued requests."""
+        self.running = False
+        self.frame.set()
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+        with self.lock:
+            for *_, future in self.queue:
+                future.cancel()
+            self.queue.clear()
+            self.pending.clear()
+
+    def _work(self) -> None:
+        """Search the queued requests until the budget of the frame is spent."""
+        while self.running:
+            self.frame.wait()
+            self.frame.clear()
+            deadline = time.perf_counter() + self.budget
+            while self.running and time.perf_counter() < deadline:
+                with self.lock:
+                    if not self.queue:
+                        break
+                    key, start, end, radius, start_hint, future = self.queue.popleft()
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(
+                            self.navmesh.get_path(start, end, radius, start_hint)
+                        )
+                    except Exception as error:
+                        logger.warning("Error while searching a path: %s", error)
+                        future.set_exception(error)
+                with self.lock:
+                    self.pending.pop(key, None)
@@ -1,15 +1,15 @@
 #!/usr/bin/env python
 # coding=utf-8
-import multiprocessing
 from typing import Optional
 
 import pygame as pg
 
+from pysurvive.assets import AssetLoader
+from pysurvive.config import ROTATION_CACHE_PREFILL
 from pysurvive.player.misc import (
     AnimatedSprite,
     LowerBodyState,
     RotatableImage,
-    Spritesheet,
 )
 
 
@@ -24,11 +24,14 @@ class PlayerFeets(AnimatedSprite):
         spritesheet_paths = []
         for movement in LowerBodyState:
             spritesheet_paths.append(f"player/default/feets/{movement.name.lower()}")
-        with multiprocessing.Pool() as pool:
-            self.sprites = pool.map(Spritesheet, spritesheet_paths)
-        for spritesheet in self.sprites:
-            for image in spritesheet:
-                image.deserialize()
+        self.sprites = [
+            future.result()
+            for future in AssetLoader().load_spritesheets(spritesheet_paths)
+        ]
+        if ROTATION_CACHE_PREFILL:
+            RotatableImage.cache.prefill(
+                image for spritesheet in self.sprites for image in spritesheet
+            )
 
         # Ensure to set rect first. Otherwise rect is None in image setter.
         self.rect = self.sprite.image.get_frect()
@@ -1,18 +1,31 @@
 #!/usr/bin/env python
 # coding=utf-8
 import math
+import mmap
 import os
+import sys
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
 from enum import Enum, unique
-from typing import Generator, Union
+from typing import Any, Generator, Iterable, Optional, Union
 
 import pygame as pg
 
-from pysurvive.config import FPS, IMAGE_DIR
+from pysurvive.config import (
+    FPS,
+    IMAGE_DIR,
+    ROTATION_CACHE_BUDGET,
+    ROTATION_STEP,
+)
 from pysurvive.logger import Logger
-from pysurvive.utils import load_image
 
 logger = Logger()
 
+# Directory of the memory-mapped frame buffers (shared memory if available).
+FRAME_BUFFER_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
 
 @unique
 class DefaultState(Enum):
@@ -45,39 +58,212 @@ class WeaponsState(Enum):
     SHOTGUN = 3
 
 
+class RotationCache:
+
+    """
+    LRU cache of rotated images shared by all rotatable images.
+    An entry contains the rotated surface and its bounding rect, so
+    once an angle is cached a rotation is a dictionary lookup only.
+    The least recently used entries are dropped if the memory of the
+    cached surfaces exceeds the budget.
+
+    The entries are keyed by the id of the image and the angle, the cache
+    never keeps a reference to the image itself. The entries of an image
+    are dropped as soon as the image is freed.
+    """
+
+    def __init__(self, budget: int = ROTATION_CACHE_BUDGET) -> None:
+        self.budget = budget
+        self.memory = 0
+        self.entries: OrderedDict[
+            tuple[int, int], tuple[pg.surface.Surface, pg.Rect]
+        ] = OrderedDict()
+        # Cached angles by the id of the image (see _release).
+        self.degrees: dict[int, set[int]] = {}
+        # The cache can be filled by a background thread. Reentrant, since
+        # a freed image can be released while the lock is held.
+        self.lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return f"RotationCache(entries={len(self)}, memory={self.memory})"
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(
+        self, image: "RotatableImage", degree: int
+    ) -> Optional[tuple[pg.surface.Surface, pg.Rect]]:
+        """Returns the cached entry or None."""
+        key = (id(image), degree)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(
+        self,
+        image: "RotatableImage",
+        degree: int,
+        entry: tuple[pg.surface.Surface, pg.Rect],
+    ) -> None:
+        """Add an entry and drop the least recently used ones if necessary."""
+        with self.lock:
+            if not self._insert(image, degree, entry):
+                return
+            # Keep at least the new entry.
+            while self.memory > self.budget and len(self.entries) > 1:
+                self._pop(next(iter(self.entries)))
+
+    def add(
+        self,
+        image: "RotatableImage",
+        degree: int,
+        entry: tuple[pg.surface.Surface, pg.Rect],
+    ) -> bool:
+        """
+        Add an entry only if it fits into the budget without dropping
+        other entries. Returns False if the budget is exhausted.
+        """
+        with self.lock:
+            if self.memory + self._size(entry[0]) > self.budget:
+                return False
+            self._insert(image, degree, entry)
+            return True
+
+    def prefill(
+        self, images: Iterable["RotatableImage"], step: int = ROTATION_STEP
+    ) -> threading.Thread:
+        """
+        Fill the cache with every rotation of the images in a background
+        thread. Stops as soon as the budget is exhausted, so the prefill
+        never evicts entries. The thread only reads the original images,
+        the rotated surfaces are not used before they are in the cache.
+        """
+        images = list(images)
+
+        def _prefill() -> None:
+            for image in images:
+                for degree in range(0, 360, step):
+                    with self.lock:
+                        if (id(image), degree) in self.entries:
+                            continue
+                    rotated = pg.transform.rotate(image.image, degree)
+                    if not self.add(
+                        image, degree, (rotated, rotated.get_bounding_rect())
+                    ):
+                        return
+
+        thread = threading.Thread(target=_prefill, daemon=True)
+        thread.start()
+
+        return thread
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self.lock:
+            self.entries.clear()
+            for degrees in self.degrees.values():
+                degrees.clear()
+            self.memory = 0
+
+    def _insert(
+        self,
+        image: "RotatableImage",
+        degree: int,
+        entry: tuple[pg.surface.Surface, pg.Rect],
+    ) -> bool:
+        """Insert the entry (with the lock held). Returns False if cached."""
+        image_id = id(image)
+        if (image_id, degree) in self.entries:
+            return False
+        self.entries[(image_id, degree)] = entry
+        self.memory += self._size(entry[0])
+        degrees = self.degrees.get(image_id)
+        if degrees is None:
+            degrees = self.degrees[image_id] = set()
+            # The id is unique as long as the image exists.
+            weakref.finalize(image, self._release, image_id)
+        degrees.add(degree)
+        return True
+
+    def _pop(self, key: tuple[int, int]) -> None:
+        """Drop the entry (with the lock held)."""
+        image, _ = self.entries.pop(key)
+        self.memory -= self._size(image)
+        image_id, degree = key
+        # The (empty) set is kept until the image is freed, so the
+        # finalizer is registered only once per image.
+        self.degrees[image_id].discard(degree)
+
+    def _release(self, image_id: int) -> None:
+        """Drop all entries of the freed image."""
+        with self.lock:
+            for degree in self.degrees.pop(image_id, ()):
+                image, _ = self.entries.pop((image_id, degree))
+                self.memory -= self._size(image)
+
+    @staticmethod
+    def _size(image: pg.surface.Surface) -> int:
+        """Returns the memory (in byte) of a surface."""
+        return image.get_width() * image.get_height() * image.get_bytesize()
+
+
 class RotatableImage:
 
     """Represents a single image of a spritesheet."""
 
     __slots__ = (
         "image",
-        "image_buffer",
         "rect",
+        # The rotation cache drops the entries of freed images.
+        "__weakref__",
     )
 
+    # Rotations of the images (shared by all instances).
+    cache = RotationCache()
+
     def __init__(self, image: pg.surface.Surface) -> None:
-        self.image = self._scale(image)
-        self.image_buffer = None
+        self.image = image
         self.rect = self.image.get_rect()
-        self.serialize()  # Serialize after pre-processing.
-
-    def serialize(self) -> None:
-        """Serializer for multiprocessing purpose."""
-        self.image_buffer = pg.image.tostring(self.image, "RGBA")
-        del self.image
-
-    def deserialize(self) -> None:
-        """Deserializer for multiprocessing purpose."""
-        self.image = pg.image.frombuffer(self.image_buffer, self.rect.size, "RGBA")
-        del self.image_buffer
 
     def rotate(self, radian: float) -> pg.surface.Surface:
         """Rotate the surface based on the original one."""
-        degree = RotatableImage.angle_to_degree(radian)
-        image = pg.transform.rotate(self.image, degree)
+        image, _ = self.rotate_with_bounding_rect(radian)
 
         return image
 
+    def rotate_with_bounding_rect(
+        self, radian: float
+    ) -> tuple[pg.surface.Surface, pg.Rect]:
+        """
+        Rotate the surface based on the original one. Returns the rotated
+        surface and its bounding rect. The angle is quantized to the step
+        of the rotation cache.
+        """
+        degree = RotatableImage.quantize(RotatableImage.angle_to_degree(radian))
+
+        return self.rotated(degree)
+
+    def rotated(self, degree: int) -> tuple[pg.surface.Surface, pg.Rect]:
+        """
+        Returns the surface rotated by degree and its bounding rect
+        from the cache. Rotate the surface if it is not cached yet.
+        The bounding rect is shared, so it must not be modified.
+        """
+        entry = RotatableImage.cache.get(self, degree)
+        if entry is None:
+            image = pg.transform.rotate(self.image, degree)
+            entry = (image, image.get_bounding_rect())
+            RotatableImage.cache.put(self, degree, entry)
+
+        return entry
+
+    @staticmethod
+    def quantize(degree: int, step: int = ROTATION_STEP) -> int:
+        """Quantize the angle (degree) to the step (within 0 and 360)."""
+        return (degree // step) * step % 360
+
     @staticmethod
     def angle_to_radian(degree: int) -> float:
         """Angle from degree to radian.
@@ -90,18 +276,6 @@ class RotatableImage:
         Negative angle amounts will rotate clockwise."""
         return int(-1 * radian * 180 / math.pi)
 
-    @staticmethod
-    def _scale(image: pg.surface.Surface, scale: int = 2) -> pg.surface.Surface:
-        """Scaling image down."""
-        # pg.transform.scale
-        return pg.transform.smoothscale(
-            image,
-            (
-                image.get_rect().width // scale,
-                image.get_rect().height // scale,
-            ),
-        )
-
 
 class AnimatedSprite(pg.sprite.Sprite):
 
@@ -171,14 +345,25 @@ class Spritesheet:
         "sprite_size",
         "spritesheet_path",
         "sprites",
+        "frame_size",
+        "frame_count",
+        "frame_buffer_file",
+        "frame_buffer",
     )
 
     spritesheet_name = "spritesheet.png"
+    # The sprites are scaled down by this factor.
+    scale = 2
 
     def __init__(self, spritesheet_path: str, sprite_size: int = 512) -> None:
         self.sprite_size = sprite_size
         self.spritesheet_path = f"{IMAGE_DIR}/{spritesheet_path}"
         self.sprites: list[RotatableImage] = []
+        self.frame_size = (sprite_size // self.scale, sprite_size // self.scale)
+        self.frame_count = 0
+        # Memory-mapped file that contains the pixel data of the frames.
+        self.frame_buffer_file: Optional[str] = None
+        self.frame_buffer: Optional[mmap.mmap] = None
         self._load_sprites()
 
     def __repr__(self) -> str:
@@ -194,30 +379,119 @@ class Spritesheet:
     def __getitem__(self, frame: int) -> RotatableImage:
         return self.sprites[frame]
 
+    def __getstate__(self) -> dict[str, Any]:
+        """Only the description of the frame buffer is passed between
+        processes, the pixel data itself is never copied."""
+        return {
+            "sprite_size": self.sprite_size,
+            "spritesheet_path": self.spritesheet_path,
+            "frame_size": self.frame_size,
+            "frame_count": self.frame_count,
+            "frame_buffer_file": self.frame_buffer_file,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.sprites = []
+        self.frame_buffer = None
+
+    @property
+    def frame_bytes(self) -> int:
+        """Returns the size (in byte) of a single frame."""
+        return self.frame_size[0] * self.frame_size[1] * 4
+
     def _load_sprites(self) -> None:
         """Preloading sprites from the spritesheet."""
         if not os.path.isdir(self.spritesheet_path):
             logger.warning("Directory %s doesnt exists.", self.spritesheet_path)
             return
         logger.info("Loading spritesheet from path %s.", self.spritesheet_path)
-        self.sprites = self._split_spritesheet(
-            f"{self.spritesheet_path}/{self.spritesheet_name}"
+        self._split_spritesheet(f"{self.spritesheet_path}/{self.spritesheet_name}")
+
+    def _split_spritesheet(self, spritesheet_file: str) -> None:
+        """
+        Cut the individual sprites from the spritesheet and scale them
+        directly into a memory-mapped frame buffer (RGBA, one frame after
+        another) in shared memory. The frames are available after attach()
+        is called, which can be done in another process (e.g. after loading
+        by the asset loader).
+        """
+        try:
+            spritesheet = pg.image.load(spritesheet_file)
+        except (pg.error, FileNotFoundError) as message:
+            logger.error("Error while loading image %s: %s", spritesheet_file, message)
+            sys.exit(1)
+        # Convert to the RGBA layout of the frame buffer. Unlike
+        # convert_alpha() this doesn't need a display.
+        spritesheet = spritesheet.convert(
+            pg.image.frombuffer(bytearray(4), (1, 1), "RGBA")
         )
-
-    def _split_spritesheet(self, spritesheet_file: str) -> list[RotatableImage]:
-        """Cut the individual sprites from the spritesheet."""
-        spritesheet, _ = load_image(spritesheet_file, alpha=True)
         spritesheet_width, _ = spritesheet.get_size()
-        sprites: list[RotatableImage] = []
-        for sprite_x in range(0, spritesheet_width // self.sprite_size):
-            rect = (
-                sprite_x * self.sprite_size,
-                0,
-                self.sprite_size,
-                self.sprite_size,
-            )
-            # Subsurface doesn’t create copies in memory.
-            sprite = spritesheet.subsurface(rect)
-            sprites.append(RotatableImage(sprite))
-
-        return sprites
+        self.frame_count = spritesheet_width // self.sprite_size
+        if not self.frame_count:
+            return
+
+        fd, self.frame_buffer_file = tempfile.mkstemp(
+            prefix="pysurvive-", dir=FRAME_BUFFER_DIR
+        )
+        try:
+            try:
+                os.ftruncate(fd, self.frame_count * self.frame_bytes)
+                frame_buffer = mmap.mmap(fd, self.frame_count * self.frame_bytes)
+            finally:
+                os.close(fd)
+            with frame_buffer, memoryview(frame_buffer) as frames:
+                for sprite_x in range(0, self.frame_count):
+                    rect = (
+                        sprite_x * self.sprite_size,
+                        0,
+                        self.sprite_size,
+                        self.sprite_size,
+                    )
+                    # Subsurface doesn’t create copies in memory.
+                    sprite = spritesheet.subsurface(rect)
+                    start = sprite_x * self.frame_bytes
+                    end = start + self.frame_bytes
+                    with frames[start:end] as buffer:
+                        frame = pg.image.frombuffer(buffer, self.frame_size, "RGBA")
+                        pg.transform.smoothscale(sprite, self.frame_size, frame)
+                        del frame
+        except BaseException:
+            # Nobody attaches the frame buffer, so don't leave it behind.
+            self.discard()
+            raise
+
+    def discard(self) -> None:
+        """
+        Remove the file of a frame buffer that is never attached (e.g. the
+        request has been dropped by the asset loader).
+        """
+        if self.frame_buffer_file is None or self.frame_buffer is not None:
+            return
+
+        try:
+            os.unlink(self.frame_buffer_file)
+        except FileNotFoundError:
+            pass
+        self.frame_buffer_file = None
+
+    def attach(self) -> None:
+        """
+        Map the frames of the frame buffer as surfaces (without copying
+        the pixel data). The file of the frame buffer is removed afterwards,
+        the memory itself is released with the last surface.
+        """
+        if self.frame_buffer_file is None or self.frame_buffer is not None:
+            return
+
+        with open(self.frame_buffer_file, "r+b") as file:
+            self.frame_buffer = mmap.mmap(file.fileno(), 0)
+        os.unlink(self.frame_buffer_file)
+        frames = memoryview(self.frame_buffer)
+        self.sprites = []
+        for frame in range(0, self.frame_count):
+            start = frame * self.frame_bytes
+            end = start + self.frame_bytes
+            image = pg.image.frombuffer(frames[start:end], self.frame_size, "RGBA")
+            self.sprites.append(RotatableImage(image))
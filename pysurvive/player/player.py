@@ -1,18 +1,19 @@
 #!/usr/bin/env python
 # coding=utf-8
 import math
-import multiprocessing
 from typing import Optional
 
 import pygame as pg
 
-from pysurvive.config import DEBUG_SPRITE, RED
+from pysurvive.assets import AssetLoader
+from pysurvive.config import DEBUG_SPRITE, RED, ROTATION_CACHE_PREFILL
 from pysurvive.game.core import Camera
+from pysurvive.map.colliders import move_and_slide
 from pysurvive.map.level import Level
 from pysurvive.player.feets import PlayerFeets
 from pysurvive.player.misc import (
     AnimatedSprite,
-    Spritesheet,
+    RotatableImage,
     UpperBodyState,
     WeaponsState,
 )
@@ -71,11 +72,14 @@ class Player(AnimatedSprite):
                 spritesheet_paths.append(
                     f"player/default/weapons/{weapon.name.lower()}/{movement.name.lower()}"
                 )
-        with multiprocessing.Pool() as pool:
-            self.sprites = pool.map(Spritesheet, spritesheet_paths)
-        for spritesheet in self.sprites:
-            for image in spritesheet:
-                image.deserialize()
+        self.sprites = [
+            future.result()
+            for future in AssetLoader().load_spritesheets(spritesheet_paths)
+        ]
+        if ROTATION_CACHE_PREFILL:
+            RotatableImage.cache.prefill(
+                image for spritesheet in self.sprites for image in spritesheet
+            )
 
         # Ensure to set rect first. Otherwise rect is None in image setter.
         self.rect = self.sprite.image.get_frect(center=(x, y))
@@ -120,11 +124,16 @@ class Player(AnimatedSprite):
     @image.setter
     def image(self, _image: Optional[pg.surface.Surface]) -> None:
         """Overwrite setter of pg.sprite.Sprite to always center the rect."""
-        _rect = _image.get_frect()
+        self._set_image(_image, pg.FRect(_image.get_bounding_rect()))
+
+    def _set_image(self, image: pg.surface.Surface, bounding_rect: pg.FRect) -> None:
+        """Set the image with an already known bounding rect (relative to
+        the image), e.g. from the rotation cache."""
+        _rect = image.get_frect()
         _rect.center = (self.x, self.y)
-        self.__image = _image
+        self.__image = image
         self.rect = _rect
-        self.bounding_rect = pg.FRect(_image.get_bounding_rect())
+        self.bounding_rect = bounding_rect
 
     @property
     def bounding_rect(self) -> Optional[pg.FRect]:
@@ -167,17 +176,26 @@ class Player(AnimatedSprite):
         # Process input.
         self.input()
 
+        # Only the colliders within reach of the player are relevant.
+        colliders = level.movement_colliders.get_colliders(self.reach(dt))
         # Move player considerung the collision.
-        tiles = level.tiles.tiles_movement_collision_on_screen.sprites()
-        self.move(dt, tiles)
+        self.move(dt, colliders)
         # Rotate player considerung the collision.
-        self.rotate(self.angle, tiles)
+        self.rotate(self.angle, colliders)
 
         # Move camera base on the player position.
         self.camera.update(target=self)
 
         self.animate()
 
+    def reach(self, dt: float) -> pg.FRect:
+        """Returns the rect that covers the movement (speed) and the rotation
+        of the current frame around the player."""
+        # The bounding rect of any rotation is within the half diagonal.
+        radius = math.hypot(self.rect.width, self.rect.height) / 2
+        radius += self.speed * dt + 1
+        return pg.FRect(self.x - radius, self.y - radius, 2 * radius, 2 * radius)
+
     def move(self, dt: float, group: pg.sprite.Group) -> None:
         speedx = self.speed
         speedy = self.speed
@@ -187,29 +205,32 @@ class Player(AnimatedSprite):
             speedx = abs(math.cos(math.pi / 4)) * self.speed
             speedy = abs(math.sin(math.pi / 4)) * self.speed
 
-        x_orig = self.x
-        for dx in range(1, round(speedx * dt) + 1):
-            x_prev = self.x
-            self.x = x_orig + dx * self.direction.x
-            if bool(pg.sprite.spritecollide(self, group, False, self.is_collided)):
-                self.x = x_prev
-                break
-
-        y_orig = self.y
-        for dy in range(1, round(speedy * dt) + 1):
-            y_prev = self.y
-            self.y = y_orig + dy * self.direction.y
-            if bool(pg.sprite.spritecollide(self, group, False, self.is_collided)):
-                self.y = y_prev
-                break
+        # Resolve the movement against the colliders in one pass per axis.
+        dx, dy = move_and_slide(
+            self.bounding_rect,
+            round(speedx * dt) * int(self.direction.x),
+            round(speedy * dt) * int(self.direction.y),
+            group,
+        )
+        if dx:
+            self.x = self.x + dx
+        if dy:
+            self.y = self.y + dy
 
     def rotate(self, angle: float, group: pg.sprite.Group) -> None:
         """Try to rotate. If collide the image (rect, bounding_rect) will be reset."""
         image_orig = self.image
+        bounding_rect_orig = pg.FRect(
+            self.bounding_rect_offset_x,
+            self.bounding_rect_offset_y,
+            self.bounding_rect.width,
+            self.bounding_rect.height,
+        )
         # Try to rotate, if collide reset.
-        self.image = self.sprite.rotate(angle)
+        image, bounding_rect = self.sprite.rotate_with_bounding_rect(angle)
+        self._set_image(image, pg.FRect(bounding_rect))
         if bool(pg.sprite.spritecollide(self, group, False, self.is_collided)):
-            self.image = image_orig
+            self._set_image(image_orig, bounding_rect_orig)
         else:
             # Rotate player feets omly if there is no collision.
             self.feets.rotate(angle)
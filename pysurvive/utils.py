@@ -1,8 +1,13 @@
 #!/usr/bin/env python
 # coding=utf-8
+import hashlib
+import json
+import struct
 import sys
-from typing import Union
+from pathlib import Path
+from typing import Any, Union
 
+import numpy as np
 import pygame as pg
 from pygame.locals import RLEACCEL
 
@@ -72,3 +77,114 @@ def load_sound(filename: str) -> Union[pg.mixer.Sound, NoneSound]:
         sys.exit(1)
 
     return sound
+
+
+# Magic bytes and alignment (in bytes) of the binary array files.
+ARRAY_FILE_MAGIC = b"PYSURV\x00\x01"
+ARRAY_FILE_ALIGN = 64
+
+
+def _align(size: int) -> int:
+    """Round up the size to the next multiple of ARRAY_FILE_ALIGN."""
+    return -(-size // ARRAY_FILE_ALIGN) * ARRAY_FILE_ALIGN
+
+
+def file_digest(filename: Union[str, Path]) -> str:
+    """
+    Returns the sha1 hex digest of the file content.
+
+    Args:
+        filename (str): The filename including the path.
+
+    Returns:
+        Digest (str): The hex digest of the file content.
+    """
+    digest = hashlib.sha1()
+    with open(filename, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def save_arrays(
+    filename: Union[str, Path], header: dict[str, Any], arrays: dict[str, np.ndarray]
+) -> None:
+    """
+    Save a json header and multiple numpy arrays to a single binary file.
+    The arrays are stored raw and aligned, so they can be memory-mapped
+    by load_arrays() without any copy.
+
+    Args:
+        filename (str): The filename including the path.
+        header (dict): Json serializable meta data.
+        arrays (dict[str, ndarray]): The arrays to store by name.
+    """
+    # Copy the dict, the arrays of the caller are not replaced.
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset += _align(array.nbytes)
+
+    meta = json.dumps({"header": header, "arrays": layout}).encode("utf-8")
+    prefix = len(ARRAY_FILE_MAGIC) + 4 + len(meta)
+    data_start = _align(prefix)
+
+    # Write to a temporary file first to never leave a half written file.
+    tmp_filename = Path(f"{filename}.tmp")
+    with open(tmp_filename, "wb") as file:
+        file.write(ARRAY_FILE_MAGIC)
+        file.write(struct.pack("<I", len(meta)))
+        file.write(meta)
+        file.write(b"\x00" * (data_start - prefix))
+        for name, array in arrays.items():
+            file.seek(data_start + layout[name]["offset"])
+            file.write(array.tobytes())
+        # Pad the file, so trailing empty arrays are within the file too.
+        file.truncate(data_start + offset)
+    tmp_filename.replace(filename)
+
+
+def load_arrays(
+    filename: Union[str, Path],
+) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+    """
+    Load a file written by save_arrays(). The arrays are read-only views
+    of a memory-mapped file.
+
+    Args:
+        filename (str): The filename including the path.
+
+    Returns:
+        Header, Arrays (tuple[dict, dict[str, ndarray]]): The json header and
+            the arrays by name.
+
+    Raises:
+        ValueError: If the file is not a valid array file.
+    """
+    with open(filename, "rb") as file:
+        if file.read(len(ARRAY_FILE_MAGIC)) != ARRAY_FILE_MAGIC:
+            raise ValueError(f"{filename} is not a valid array file.")
+        (meta_size,) = struct.unpack("<I", file.read(4))
+        meta = json.loads(file.read(meta_size).decode("utf-8"))
+
+    prefix = len(ARRAY_FILE_MAGIC) + 4 + meta_size
+    data_start = _align(prefix)
+    buffer = np.memmap(filename, dtype=np.uint8, mode="r")
+    arrays = {}
+    for name, layout in meta["arrays"].items():
+        dtype = np.dtype(layout["dtype"])
+        shape = tuple(layout["shape"])
+        start = data_start + layout["offset"]
+        end = start + int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        if end > buffer.size:
+            raise ValueError(f"{filename} is truncated.")
+        arrays[name] = buffer[start:end].view(dtype).reshape(shape)
+
+    return meta["header"], arrays
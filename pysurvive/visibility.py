@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+# coding=utf-8
+import functools
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+import pygame as pg
+
+from pysurvive.config import VISIBILITY_QUANTUM, VISIBILITY_SECTORS
+
+Point = tuple[float, float]
+Segment = Sequence[float]
+# Angular range (segment index, start angle, end angle, start endpoint,
+# end endpoint) of a segment. The endpoint 2 is the split at the angle pi.
+Interval = tuple[int, float, float, int, int]
+# Corner of the polygon on the segment (or the origin if -1) along the
+# ray through the endpoint of the event (see get_event_code).
+Corner = tuple[int, int]
+
+
+def get_angular_intervals(origin: Point, segments: Sequence[Segment]) -> list[Interval]:
+    """
+    Returns the angular ranges (-pi to pi, counterclockwise) the segments
+    cover seen from the origin. Segments crossing the angle pi are split
+    into two ranges. Segments collinear with the origin cover no range
+    and are skipped.
+    """
+    return [
+        (int(index), start, end, int(start_endpoint), int(end_endpoint))
+        for index, start, end, start_endpoint, end_endpoint in get_interval_array(
+            origin, segments
+        ).tolist()
+    ]
+
+
+def get_interval_array(origin: Point, segments: Sequence[Segment]) -> np.ndarray:
+    """Returns the angular ranges as (n, 5) array (see get_angular_intervals)."""
+    ox, oy = origin
+    x1, y1, x2, y2 = np.asarray(segments, dtype=np.float64).reshape(-1, 4).T
+    orientation = (x1 - ox) * (y2 - oy) - (y1 - oy) * (x2 - ox)
+    # The range starts at the first endpoint if the second one is
+    # counterclockwise of it.
+    angle1 = np.arctan2(y1 - oy, x1 - ox)
+    angle2 = np.arctan2(y2 - oy, x2 - ox)
+    flipped = orientation < 0
+    start = np.where(flipped, angle2, angle1)
+    end = np.where(flipped, angle1, angle2)
+    first = flipped.astype(np.int64)
+    last = 1 - first
+    # Endpoints on the angle pi belong to the side of the segment.
+    start[start == math.pi] = -math.pi
+    end[end == -math.pi] = math.pi
+
+    index = np.flatnonzero(orientation != 0)
+    split = index[end[index] < start[index]]
+    pieces = np.concatenate(
+        (
+            np.column_stack(
+                (
+                    index,
+                    np.zeros_like(index),
+                    start[index],
+                    np.where(end[index] < start[index], math.pi, end[index]),
+                    first[index],
+                    np.where(end[index] < start[index], 2, last[index]),
+                )
+            ),
+            np.column_stack(
+                (
+                    split,
+                    np.ones_like(split),
+                    np.full(len(split), -math.pi),
+                    end[split],
+                    np.full(len(split), 2),
+                    last[split],
+                )
+            ),
+        )
+    )
+    # Keep the order of the segments (and the pieces).
+    pieces = pieces[np.lexsort((pieces[:, 1], pieces[:, 0]))]
+
+    return np.delete(pieces, 1, axis=1)
+
+
+def get_event_code(segment, endpoint, is_start):
+    """
+    Returns a unique code of the start (1) or end (0) of an angular range
+    at the endpoint (0, 1 or 2 for the split at the angle pi) of the
+    segment. Works with arrays too.
+    """
+    return (segment * 3 + endpoint) * 2 + is_start
+
+
+def get_ray_distance(origin: Point, angle: float, segment: Segment) -> float:
+    """
+    Returns the distance from the origin to the segment along the ray
+    with the angle (inf if the ray is parallel to the segment).
+    """
+    x1, y1, x2, y2 = segment
+    dx = math.cos(angle)
+    dy = math.sin(angle)
+    segment_dx = x2 - x1
+    segment_dy = y2 - y1
+    denominator = dx * segment_dy - dy * segment_dx
+    if denominator == 0:
+        return math.inf
+
+    return ((x1 - origin[0]) * segment_dy - (y1 - origin[1]) * segment_dx) / denominator
+
+
+def get_visibility_polygon(
+    origin: Point,
+    segments: Sequence[Segment],
+    bounds: Optional[pg.Rect] = None,
+) -> list[Point]:
+    """
+    Returns the visibility polygon of the origin without any cache
+    (see VisibilityCache.get_polygon).
+    """
+    return VisibilityCache(sectors=1).get_polygon(origin, segments, bounds)
+
+
+class VisibilityCache:
+
+    """
+    Angular sweep around the viewer to find the visibility polygon, with
+    a cache for a (slowly) moving viewer.
+
+    The endpoints of the segments are sorted by their angle. The sweep
+    keeps the segments at the current angle (active segments) ordered by
+    their distance to the viewer, so the visible segment is always the
+    first one. The order of two active segments doesn't change during the
+    sweep, as long as the segments don't cross each other. A corner of the
+    polygon is added whenever the visible segment changes. The cost is
+    O(n log n) comparisons for n segments.
+
+    The full circle is divided into sectors which are swept separately.
+    The corners of a sector only depend on the segments active at the
+    start of the sector and the order of the endpoints within the sector
+    (including the side of each segment the viewer is on). If the viewer
+    moves, only the sectors where this order changed are swept again, the
+    corners of the others are just moved along their rays. If the viewer
+    moves less than the quantum, the last polygon is returned as is.
+    """
+
+    def __init__(
+        self, sectors: int = VISIBILITY_SECTORS, quantum: float = VISIBILITY_QUANTUM
+    ) -> None:
+        self.sectors = sectors
+        self.quantum = quantum
+        self.width = 2 * math.pi / sectors
+        # Key (quantized origin, version, bounds) of the last polygon.
+        self.key: Optional[tuple] = None
+        self.polygon: list[Point] = []
+        # Order (key) and corners of each sector of the last polygon.
+        self.sector_keys: list[Optional[tuple]] = [None] * sectors
+        # Corners (event code, segment) as (n, 2) array per sector.
+        self.sector_corners = [np.zeros((0, 2), dtype=np.int64)] * sectors
+        # Number of sectors swept by the last call of get_polygon.
+        self.swept = 0
+
+    def __repr__(self) -> str:
+        return f"VisibilityCache(sectors={self.sectors}, quantum={self.quantum})"
+
+    def get_polygon(
+        self,
+        origin: Point,
+        segments: Sequence[Segment],
+        bounds: Optional[pg.Rect] = None,
+        version: Optional[int] = None,
+    ) -> list[Point]:
+        """
+        Returns the visibility polygon of the origin.
+
+        Args:
+            origin (tuple[float, float]): The position of the viewer.
+            segments (Sequence): Line segments (x1, y1, x2, y2) that block
+                the view (e.g. a (N, 4) array). The segments must not cross
+                each other (touching endpoints are fine).
+            bounds (pg.Rect): Optional bounds of the view (e.g. the screen),
+                the sides are added as segments. Without bounds the segments
+                must enclose the origin.
+            version (int): Version of the segments (e.g. of the occluders).
+                The cache is only used if the version and the bounds are
+                the same as before. Without a version nothing is reused.
+
+        Returns:
+            Polygon (list[tuple[float, float]]): The corners of the visibility
+                polygon ordered by their angle (counterclockwise).
+        """
+        key = (
+            round(origin[0] / self.quantum),
+            round(origin[1] / self.quantum),
+            version,
+            None if bounds is None else tuple(bounds),
+        )
+        if version is not None and key == self.key:
+            return self.polygon
+        if self.key is None or version is None or key[2:] != self.key[2:]:
+            self.sector_keys = [None] * self.sectors
+
+        segment_array = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        if bounds is not None:
+            left, top, right, bottom = (
+                bounds.left,
+                bounds.top,
+                bounds.right,
+                bounds.bottom,
+            )
+            segment_array = np.vstack(
+                (
+                    segment_array,
+                    [
+                        (left, top, right, top),
+                        (right, top, right, bottom),
+                        (right, bottom, left, bottom),
+                        (left, bottom, left, top),
+                    ],
+                )
+            )
+
+        intervals = get_interval_array(origin, segment_array)
+        interval_segments = intervals[:, 0].astype(np.int64)
+        # Events (angle, type, interval) sorted by the angle, the ends (0)
+        # before the starts (1) of the same angle.
+        count = len(intervals)
+        event_angles = np.concatenate((intervals[:, 1], intervals[:, 2]))
+        event_types = np.repeat([1, 0], count)
+        event_intervals = np.tile(np.arange(count), 2)
+        order = np.lexsort((event_intervals, event_types, event_angles))
+        event_angles = event_angles[order]
+        event_types = event_types[order]
+        event_intervals = event_intervals[order]
+        event_codes = get_event_code(
+            interval_segments[event_intervals],
+            np.where(
+                event_types == 1,
+                intervals[event_intervals, 3],
+                intervals[event_intervals, 4],
+            ).astype(np.int64),
+            event_types,
+        )
+
+        # Events and intervals active at the start of each sector (the
+        # ends at the start angle are events of the sector).
+        sector_starts = -math.pi + np.arange(self.sectors) * self.width
+        firsts = np.searchsorted(event_angles, sector_starts).tolist() + [
+            len(event_angles)
+        ]
+        sectors, active_intervals = np.nonzero(
+            (intervals[:, 1] < sector_starts[:, np.newaxis])
+            & (intervals[:, 2] >= sector_starts[:, np.newaxis])
+        )
+        active_firsts = np.searchsorted(sectors, np.arange(self.sectors + 1)).tolist()
+        active_codes = get_event_code(
+            interval_segments[active_intervals],
+            intervals[active_intervals, 3].astype(np.int64),
+            1,
+        )
+
+        segment_list = segment_array.tolist()
+        interval_list = list(zip(interval_segments.tolist(), intervals[:, 2].tolist()))
+
+        def is_closer(a: int, b: int, angle: float) -> bool:
+            """Returns True if the interval a is in front of the interval b."""
+            segment_a = segment_list[interval_list[a][0]]
+            segment_b = segment_list[interval_list[b][0]]
+            distance_a = get_ray_distance(origin, angle, segment_a)
+            distance_b = get_ray_distance(origin, angle, segment_b)
+            if not math.isclose(distance_a, distance_b, rel_tol=1e-9, abs_tol=1e-9):
+                return distance_a < distance_b
+            # Both segments share the point at the angle (e.g. the corner of
+            # a wall), so compare them within the range they both cover.
+            angle = (angle + min(interval_list[a][1], interval_list[b][1])) / 2
+            return get_ray_distance(origin, angle, segment_a) < get_ray_distance(
+                origin, angle, segment_b
+            )
+
+        self.swept = 0
+        for sector in range(self.sectors):
+            first, last = firsts[sector], firsts[sector + 1]
+            active_first = active_firsts[sector]
+            active_last = active_firsts[sector + 1]
+            sector_key = (
+                active_codes[active_first:active_last].tobytes(),
+                event_codes[first:last].tobytes(),
+            )
+            if sector_key == self.sector_keys[sector]:
+                continue
+
+            sector_start = sector_starts[sector]
+
+            def compare(a: int, b: int) -> int:
+                if is_closer(a, b, sector_start):
+                    return -1
+                return 1 if is_closer(b, a, sector_start) else 0
+
+            active = sorted(
+                active_intervals[active_first:active_last].tolist(),
+                key=functools.cmp_to_key(compare),
+            )
+            events = list(
+                zip(
+                    event_angles[first:last].tolist(),
+                    event_types[first:last].tolist(),
+                    event_intervals[first:last].tolist(),
+                    event_codes[first:last].tolist(),
+                )
+            )
+            self.sector_keys[sector] = sector_key
+            self.sector_corners[sector] = np.array(
+                self._sweep(events, interval_list, active, is_closer), dtype=np.int64
+            ).reshape(-1, 2)
+            self.swept += 1
+
+        # Angle of each event (by the code).
+        angles = np.zeros(get_event_code(len(segment_array), 0, 0))
+        angles[event_codes] = event_angles
+
+        self.key = key
+        self.polygon = self._get_corner_points(origin, segment_array, angles)
+        return self.polygon
+
+    @staticmethod
+    def _sweep(events, intervals, active, is_closer) -> list[Corner]:
+        """
+        Sweep over the events (angle, type, interval, code) of a sector with
+        the (ordered) active intervals at the start of the sector. Returns
+        the corners of the sector.
+        """
+        corners: list[Corner] = []
+        i = 0
+        while i < len(events):
+            angle, _, _, code = events[i]
+            visible = active[0] if active else None
+            while i < len(events) and events[i][0] == angle:
+                _, is_start, interval, _ = events[i]
+                if is_start:
+                    # Binary search of the position by the distance.
+                    low, high = 0, len(active)
+                    while low < high:
+                        middle = (low + high) // 2
+                        if is_closer(active[middle], interval, angle):
+                            low = middle + 1
+                        else:
+                            high = middle
+                    active.insert(low, interval)
+                else:
+                    active.remove(interval)
+                i += 1
+
+            new_visible = active[0] if active else None
+            if new_visible != visible:
+                if visible is not None:
+                    corners.append((code, intervals[visible][0]))
+                # Without a visible segment (gap) the polygon is closed at the
+                # origin. The sweep continues at -pi after the angle pi.
+                if new_visible is not None:
+                    corners.append((code, intervals[new_visible][0]))
+                elif angle < math.pi:
+                    corners.append((code, -1))
+
+        return corners
+
+    def _get_corner_points(
+        self,
+        origin: Point,
+        segments: np.ndarray,
+        angles: np.ndarray,
+    ) -> list[Point]:
+        """Returns the points of the corners of all sectors."""
+        codes, segment_index = np.concatenate(self.sector_corners).T
+        if not len(codes):
+            return []
+        angle = angles[codes]
+        x1, y1, x2, y2 = segments[segment_index].T
+        dx = np.cos(angle)
+        dy = np.sin(angle)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distance = ((x1 - origin[0]) * (y2 - y1) - (y1 - origin[1]) * (x2 - x1)) / (
+                dx * (y2 - y1) - dy * (x2 - x1)
+            )
+        # Corners at the origin (gaps) have no segment.
+        distance[segment_index < 0] = 0
+        points = np.column_stack((origin[0] + dx * distance, origin[1] + dy * distance))
+
+        # Remove duplicates, the first and the last corner are the same
+        # (angle -pi and pi).
+        previous = np.roll(points, 1, axis=0)
+        points = points[np.any(np.abs(points - previous) > 1e-6, axis=1)]
+        if len(points) <= 3:
+            return [tuple(point) for point in points.tolist()]
+
+        # Remove the corners on a side between their neighbors, e.g. the
+        # start of the sweep at the angle -pi or the change between two
+        # collinear segments.
+        to_previous = points - np.roll(points, 1, axis=0)
+        to_next = np.roll(points, -1, axis=0) - points
+        cross = to_previous[:, 0] * to_next[:, 1] - to_previous[:, 1] * to_next[:, 0]
+        dot = (to_previous * to_next).sum(axis=1)
+        scale = np.hypot(*to_previous.T) * np.hypot(*to_next.T)
+        points = points[(np.abs(cross) > 1e-9 * scale) | (dot <= 0)]
+
+        return [tuple(point) for point in points.tolist()]
@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 # coding=utf-8
+import shutil
+
 import pygame as pg
 import pytest
 
@@ -8,3 +10,11 @@ import pytest
 def setup_pygame():
     pg.init()
     _ = pg.display.set_mode((800, 600), pg.HIDDEN)
+
+
+@pytest.fixture
+def map_file(tmp_path):
+    """Copy of the test map, so cache files are written to a temporary path."""
+    _map_file = tmp_path / "map.json"
+    shutil.copy("tests/testdata/map/map.json", _map_file)
+    return _map_file
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding=utf-8
+import os
+import threading
+
+import pygame as pg
+import pytest
+
+from pysurvive.assets import AssetLoader
+from pysurvive.config import IMAGE_DIR
+from pysurvive.player.misc import Spritesheet
+from pysurvive.utils import NoneSound
+
+
+class TestAssetLoader:
+    def test_singleton(self):
+        """Test that all requests share the same loader."""
+        assert AssetLoader() is AssetLoader()
+
+    def test_load_image(self):
+        """Test that an image is decoded by the worker pool."""
+        image = AssetLoader().load_image("tests/testdata/map/wall.png").result()
+        assert (
+            image.get_size() == pg.image.load("tests/testdata/map/wall.png").get_size()
+        )
+
+    def test_load_images__deduplicate(self):
+        """Test that identical requests return the same future."""
+        futures = AssetLoader().load_images(
+            [
+                "tests/testdata/map/floor.png",
+                "tests/testdata/map/../map/floor.png",
+                "tests/testdata/map/wall.png",
+            ]
+        )
+        assert futures[0] is futures[1]
+        assert futures[0] is not futures[2]
+        assert futures[0].result() is futures[1].result()
+
+    def test_load_image__missing(self):
+        """Test that a failed request raises the error of the worker."""
+        with pytest.raises(FileNotFoundError):
+            AssetLoader().load_image("tests/testdata/missing.png").result()
+
+    def test_load_sound__without_mixer(self):
+        """Test that a sound without mixer is a NoneSound."""
+        sound = AssetLoader().load_sound("tests/testdata/map/map.json").result()
+        assert isinstance(sound, NoneSound)
+
+    def test_submit__postprocess_in_caller(self):
+        """
+        Test that the result of the worker is post-processed by the thread
+        calling result() and not by the result thread of the pool.
+        """
+        threads = []
+
+        def postprocess(pid):
+            threads.append(threading.current_thread())
+            return pid
+
+        future = AssetLoader()._submit(("pid", "test"), os.getpid, postprocess)
+        future.future.result()
+        assert not threads
+        assert future.result() != os.getpid()
+        assert future.result() == future.result()
+        assert threads == [threading.current_thread()]
+
+    def test_shutdown__discard(self, tmp_path, monkeypatch):
+        """Test that the frame buffers of uncollected spritesheets are removed."""
+        # The workers resolve the (relative) path in the working directory.
+        AssetLoader().shutdown()
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / IMAGE_DIR / "test"
+        path.mkdir(parents=True)
+        pg.image.save(
+            pg.Surface((128, 64), pg.SRCALPHA), str(path / Spritesheet.spritesheet_name)
+        )
+        future = AssetLoader().load_spritesheet("test", sprite_size=64)
+        frame_buffer_file = future.future.result().frame_buffer_file
+        assert os.path.exists(frame_buffer_file)
+        AssetLoader().shutdown()
+        assert not os.path.exists(frame_buffer_file)
+        assert future.future.cancelled()
+        # The spritesheet is loaded again on the next request.
+        assert len(AssetLoader().load_spritesheet("test", sprite_size=64).result()) == 2
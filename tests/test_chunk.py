@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# coding=utf-8
+import pygame as pg
+import pytest
+
+from pysurvive.config import GREEN, RED
+from pysurvive.map.chunk import ChunkCache
+from pysurvive.map.tile import Tile, TileGroupManager
+
+
+class TestChunkCache:
+    @pytest.fixture()
+    def tiles(self):
+        red = pg.Surface((32, 32), pg.SRCALPHA)
+        red.fill(RED)
+        green = pg.Surface((32, 32), pg.SRCALPHA)
+        green.fill(GREEN)
+        tiles = TileGroupManager(cell_size=64)
+        for y in range(8):
+            for x in range(8):
+                tile = Tile(red if (x + y) % 2 else green, enter=True)
+                tile.x = x * 32
+                tile.y = y * 32
+                tiles.add(tile)
+        tiles.build_index()
+        return tiles
+
+    def test_get__bake_tiles(self, tiles):
+        """Test that the chunk contains the tiles of its area."""
+        cache = ChunkCache(tiles, pg.Rect(0, 0, 256, 256), chunk_size=64)
+        chunk = cache.get(1, 0)
+        assert chunk.get_size() == (64, 64)
+        assert chunk.get_at((0, 0)) == GREEN
+        assert chunk.get_at((32, 0)) == RED
+
+    def test_get__outside_of_map(self, tiles):
+        """Test that no chunk is baked outside of the map."""
+        cache = ChunkCache(tiles, pg.Rect(0, 0, 256, 256), chunk_size=64)
+        assert cache.get(-1, 0) is None
+        assert cache.get(4, 4) is None
+        assert not cache.chunks
+
+    def test_get__lru_budget(self, tiles):
+        """Test that the least recently used chunks are dropped."""
+        cache = ChunkCache(
+            tiles, pg.Rect(0, 0, 256, 256), chunk_size=64, budget=2 * 64 * 64 * 4
+        )
+        cache.get(0, 0)
+        cache.get(1, 0)
+        cache.get(0, 0)
+        cache.get(2, 0)
+        assert list(cache.chunks) == [(0, 0), (2, 0)]
+        assert cache.memory <= cache.budget
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+
+import numpy as np
+import pytest
+
+from pysurvive.class_toolchain import (
+    Block,
+    Ray,
+    get_segment_array,
+    intersect_rays,
+)
+
+
+class TestIntersectRays:
+    @pytest.fixture()
+    def walls(self):
+        return [
+            Block(0, 0, 200, 10, (0, 0)),
+            Block(50, 60, 40, 40, (0, 0)),
+            Block(150, 40, 10, 100, (0, 0), ("left", "right")),
+        ]
+
+    def test_get_segment_array(self, walls):
+        """Test that the segments of all walls are collected in order."""
+        segments = get_segment_array(walls)
+        assert segments.shape == (10, 4)
+        assert tuple(segments[0]) == (0, 0, 200, 0)
+        assert tuple(segments[-1]) == (150, 40, 150, 140)
+        assert get_segment_array([]).shape == (0, 4)
+
+    @pytest.mark.parametrize("closest", [True, False])
+    def test_intersect_rays__like_single_rays(self, walls, closest):
+        """Test that the batched intersects are equal to the single rays."""
+        x0, y0 = 120, 50
+        # Vertical rays are missed by Ray.calc_intersection (division by zero).
+        angles = np.linspace(-math.pi, math.pi, 72, endpoint=False) + 0.01
+        xs, ys, params = intersect_rays(
+            x0, y0, angles, get_segment_array(walls), closest=closest
+        )
+        for angle, x, y, param in zip(angles, xs, ys, params):
+            intersect = Ray(x0, y0, angle).get_intersection(walls, closest=closest)
+            if intersect is None:
+                assert math.isinf(param)
+                continue
+            assert param == pytest.approx(intersect["param"])
+            assert int(x) == pytest.approx(intersect["x"], abs=1)
+            assert int(y) == pytest.approx(intersect["y"], abs=1)
+
+    def test_intersect_rays__vertical(self, walls):
+        """Test that vertical rays hit the segments too."""
+        xs, ys, params = intersect_rays(
+            120, 50, [-math.pi / 2, math.pi / 2], get_segment_array(walls)
+        )
+        assert (xs[0], ys[0], params[0]) == pytest.approx((120, 10, 40))
+        assert math.isinf(params[1])
+        assert math.isnan(xs[1]) and math.isnan(ys[1])
+
+    def test_intersect_rays__without_segments(self):
+        """Test that rays without any segment don't hit anything."""
+        _, _, params = intersect_rays(0, 0, [0.0, 1.0], get_segment_array([]))
+        assert np.isinf(params).all()
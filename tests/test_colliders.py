@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# coding=utf-8
+import numpy as np
+import pygame as pg
+
+from pysurvive.map.colliders import ColliderGroup, merge_rects, move_and_slide, sweep
+from pysurvive.map.level import Level
+
+
+def covered_pixels(rects) -> set[tuple[int, int]]:
+    return {
+        (x, y)
+        for rx, ry, rw, rh in rects
+        for x in range(int(rx), int(rx + rw))
+        for y in range(int(ry), int(ry + rh))
+    }
+
+
+class TestMergeRects:
+    def test_merge_rects__wall(self):
+        """Test that a wall of tiles is merged into a single rect."""
+        rects = np.array([(x * 32, 64, 32, 32) for x in range(10)])
+        assert merge_rects(rects) == [(0, 64, 320, 32)]
+
+    def test_merge_rects__exact_union(self):
+        """Test that the union of the merged rects equals the tiles."""
+        rng = np.random.default_rng(1)
+        cells = np.argwhere(rng.random((12, 12)) < 0.5)
+        rects = np.array([(col * 8, row * 8, 8, 8) for row, col in cells])
+        # Tiles with a different bounding rect must not be merged.
+        rects = np.vstack((rects, [(200, 0, 8, 3), (208, 0, 8, 8), (200, 0, 8, 3)]))
+        merged = merge_rects(rects)
+        assert len(merged) < len(rects)
+        assert covered_pixels(merged) == covered_pixels(rects)
+
+    def test_merge_rects__max_size(self):
+        """Test that the merged rects don't exceed the max. size."""
+        rects = np.array([(x * 32, 0, 32, 32) for x in range(10)])
+        assert merge_rects(rects, max_size=128) == [
+            (0, 0, 128, 32),
+            (128, 0, 128, 32),
+            (256, 0, 64, 32),
+        ]
+
+
+class TestColliderGroup:
+    def test_colliders__regions(self):
+        """Test that the rects are merged per region only."""
+        rects = np.array([(x * 32, 0, 32, 32) for x in range(16)])
+        colliders = ColliderGroup(rects, region_size=256)
+        assert sorted(tuple(c.rect) for c in colliders) == [
+            (0, 0, 256, 32),
+            (256, 0, 256, 32),
+        ]
+        assert len(colliders.get_colliders(pg.FRect(300, 10, 5, 5))) == 1
+
+    def test_colliders__line(self):
+        """Test that the colliders on a line are sorted by the distance."""
+        colliders = ColliderGroup(np.array([(100, 0, 10, 10), (50, 0, 10, 10)]))
+        hits = colliders.get_colliders_on_line((0, 5), (200, 5))
+        assert [c.rect.x for c in hits] == [50, 100]
+        assert not colliders.get_colliders_on_line((0, 20), (200, 20))
+
+    def test_colliders__level(self, setup_pygame, map_file):
+        """Test that the colliders of the level cover the collision tiles."""
+        level = Level(str(map_file))
+        tiles = level.tiles.get_movement_collision_tiles(
+            pg.FRect(0, 0, level.map_width, level.map_height)
+        )
+        assert len(level.movement_colliders) == 6
+        assert len(level.bullet_colliders) == 6
+        assert covered_pixels(
+            tuple(c.bounding_rect) for c in level.movement_colliders
+        ) == covered_pixels(tuple(t.bounding_rect) for t in tiles)
+
+
+class TestSweep:
+    @staticmethod
+    def step(rect, dx, dy, colliders):
+        """Reference: Move the rect pixel by pixel (as Player.move did)."""
+        rect = rect.copy()
+        moved = []
+        for axis, distance in ((0, dx), (1, dy)):
+            step = 1 if distance > 0 else -1
+            done = 0
+            for _ in range(abs(distance)):
+                rect.move_ip((step, 0) if axis == 0 else (0, step))
+                if any(rect.colliderect(c.bounding_rect) for c in colliders):
+                    rect.move_ip((-step, 0) if axis == 0 else (0, -step))
+                    break
+                done += step
+            moved.append(done)
+        return tuple(moved)
+
+    def test_sweep__blocked(self):
+        """Test that the rect stops in front of a collider."""
+        colliders = list(ColliderGroup(np.array([(100, 0, 32, 32)])))
+        rect = pg.FRect(50, 10, 20, 20)
+        assert sweep(rect, 0, 50, colliders) == 30
+        assert sweep(rect, 0, -50, colliders) == -50
+        assert sweep(rect, 1, 50, colliders) == 50
+
+    def test_move_and_slide__equals_steps(self):
+        """Test that the swept movement equals the pixel by pixel movement."""
+        rng = np.random.default_rng(7)
+        for _ in range(200):
+            rects = rng.integers(0, 200, (8, 2))
+            sizes = rng.integers(4, 40, (8, 2))
+            colliders = list(ColliderGroup(np.hstack((rects, sizes))))
+            rect = pg.FRect(*rng.uniform(0, 200, 2).round(1), *rng.integers(5, 30, 2))
+            dx, dy = (int(d) for d in rng.integers(-40, 41, 2))
+            assert move_and_slide(rect, dx, dy, colliders) == self.step(
+                rect, dx, dy, colliders
+            )
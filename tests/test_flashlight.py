@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+# coding=utf-8
+from types import SimpleNamespace
+
+import numpy as np
+
+from pysurvive.flashlight import Flashlight
+from pysurvive.game.core import Camera
+from pysurvive.map.occluders import OccluderGroup
+
+
+class TestFlashlight:
+    def test_get_segments__occluders_changed(self, setup_pygame):
+        """
+        Test that the segments are queried again if the occluders changed,
+        even if the number of segments is the same.
+        """
+        occluders = OccluderGroup(np.array([(64, 64, 32, 32)]), (0, 0, 800, 600))
+        game = SimpleNamespace(
+            camera=Camera(), level=SimpleNamespace(occluders=occluders)
+        )
+        flashlight = Flashlight(SimpleNamespace(game=game), 400, 300)
+        segments = flashlight._get_segments()
+        assert flashlight._get_segments() is segments
+
+        occluders.update(np.array([(256, 256, 32, 32)]))
+        assert len(occluders.segments) == len(segments)
+        assert (256, 256, 288, 256) in map(tuple, flashlight._get_segments().tolist())
+        flashlight.update(400, 300)
+        assert (288, 256) in [(round(x), round(y)) for x, y in flashlight.visibility]
@@ -1,6 +1,68 @@
 #!/usr/bin/env python
 # coding=utf-8
+import pygame as pg
+
+from pysurvive.map.level import Level
 
 
 class TestLevel:
-    pass
+    def test_level__tiles(self, setup_pygame, map_file):
+        """Test that the tiles are divided into the groups."""
+        level = Level(str(map_file))
+        assert level.map_width == 8 * 32
+        assert level.map_height == 6 * 32
+        assert len(level.tiles.tiles_all) == 8 * 6 + 26
+        assert len(level.tiles.tiles_movement_collision) == 26
+        assert len(level.tiles.tiles_bullet_collision) == 26
+
+    def test_level__cached(self, setup_pygame, map_file):
+        """Test that the level from the cache equals the parsed level."""
+        level_1 = Level(str(map_file))
+        assert level_1.cache.cache_file.exists()
+        level_2 = Level(str(map_file))
+        for tile_1, tile_2 in zip(
+            level_1.tiles.tiles_all.sprites(), level_2.tiles.tiles_all.sprites()
+        ):
+            assert tile_1.rect == tile_2.rect
+            assert tile_1.bounding_rect == tile_2.bounding_rect
+            assert tile_1.enter == tile_2.enter
+
+    def test_level__tiles_in_rect(self, setup_pygame, map_file):
+        """Test the tile queries of the spatial index."""
+        level = Level(str(map_file))
+        rect = pg.FRect(96, 64, 64, 32)
+        assert len(level.tiles.get_tiles(rect)) == 4
+        assert [
+            tile.rect.topleft for tile in level.tiles.get_movement_collision_tiles(rect)
+        ] == [
+            (96, 64),
+            (128, 64),
+        ]
+
+    def test_level__array_storage(self, setup_pygame, map_file):
+        """Test that the array storage returns the same tiles as the sprites."""
+        level_1 = Level(str(map_file), storage="sprites")
+        level_2 = Level(str(map_file), storage="array")
+        for rect in (pg.FRect(0, 0, 256, 192), pg.FRect(40, 50, 70, 20)):
+            for query in (
+                "get_tiles",
+                "get_movement_collision_tiles",
+                "get_bullet_collision_tiles",
+            ):
+                tiles_1 = getattr(level_1.tiles, query)(rect)
+                tiles_2 = getattr(level_2.tiles, query)(rect)
+                assert [(t.rect, t.bounding_rect) for t in tiles_1] == [
+                    (t.rect, t.bounding_rect) for t in tiles_2
+                ]
+
+    def test_level__gid_table(self, setup_pygame, map_file):
+        """Test the lookup tables indexed by the global tile id."""
+        level = Level(str(map_file))
+        assert level._get_tileset(0) is None
+        assert level._get_tileset(2).name == "floor"
+        assert level._get_tileset(3).name == "wall"
+        assert level._get_tileset(99) is None
+        assert level.gid_tile_indices.tolist() == [-1, 0, 1, 0, 1]
+        assert level.tile_types[0] is None
+        assert level.tile_types[4].block
+        assert level.tile_types[4].bounding_rect == pg.FRect(0, 0, 32, 10)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# coding=utf-8
+import os
+
+import numpy as np
+
+from pysurvive.map.cache import FLAG_BLOCK, FLAG_ENTER, LevelCache
+from pysurvive.utils import load_arrays, save_arrays
+
+
+class TestLevelCache:
+    def test_load__without_cache(self, map_file):
+        """Test that there is no compiled level without cache file."""
+        assert LevelCache(map_file).load() is None
+
+    def test_compile__layers_and_tables(self, map_file):
+        """Test the compiled tile id grid and the tables per tile id."""
+        compiled = LevelCache(map_file).compile()
+        assert compiled.map_size == (8, 6)
+        assert compiled.tile_size == (32, 32)
+        assert compiled.layers.shape == (2, 6, 8)
+        assert compiled.layers[1, 2, 4] == 4
+        assert compiled.flags[1] == FLAG_ENTER
+        assert compiled.flags[3] == FLAG_BLOCK
+        assert compiled.bounding_rects[3].tolist() == [0, 0, 32, 32]
+        assert compiled.bounding_rects[4].tolist() == [0, 0, 32, 10]
+
+    def test_load__compiled(self, map_file):
+        """Test that the cache file contains the compiled level."""
+        compiled = LevelCache(map_file).compile()
+        cached = LevelCache(map_file).load()
+        assert isinstance(cached.layers, np.memmap) or isinstance(
+            cached.layers.base, np.memmap
+        )
+        assert np.array_equal(cached.layers, compiled.layers)
+        assert np.array_equal(cached.bounding_rects, compiled.bounding_rects)
+        assert np.array_equal(cached.flags, compiled.flags)
+        assert cached.tilesets.keys() == compiled.tilesets.keys()
+        for ts_id, ts_config in cached.tilesets.items():
+            assert ts_config.firstgid == compiled.tilesets[ts_id].firstgid
+            assert ts_config.image == compiled.tilesets[ts_id].image
+
+    def test_load__touched_map_file(self, map_file):
+        """Test that the cache is still valid if only the mtime changed."""
+        LevelCache(map_file).compile()
+        stat = os.stat(map_file)
+        os.utime(map_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert LevelCache(map_file).load() is not None
+
+    def test_load__changed_map_file(self, map_file):
+        """Test that the cache is invalid if the map file changed."""
+        LevelCache(map_file).compile()
+        map_file.write_text(map_file.read_text().replace('"ground"', '"floor"'))
+        assert LevelCache(map_file).load() is None
+
+    def test_load__invalid_cache_file(self, map_file):
+        """Test that an invalid cache file is ignored."""
+        cache = LevelCache(map_file)
+        cache.cache_file.write_bytes(b"invalid")
+        assert cache.load() is None
+
+    def test_compile__relative_image_paths(self, map_file):
+        """Test that the tileset images are stored relative to the map file."""
+        cache = LevelCache(map_file)
+        cache.compile()
+        header, _ = load_arrays(cache.cache_file)
+        assert header["images"]
+        for image_file in header["images"]:
+            assert not os.path.isabs(image_file)
+            assert (map_file.parent / image_file).exists()
+
+    def test_load__arrays_mismatch(self, map_file):
+        """Test that a cache with arrays not matching the map is ignored."""
+        cache = LevelCache(map_file)
+        compiled = cache.compile()
+        header, arrays = load_arrays(cache.cache_file)
+        arrays = dict(arrays, bounding_rects=compiled.bounding_rects[:2])
+        save_arrays(cache.cache_file, header, arrays)
+        assert cache.load() is None
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+
+import numpy as np
+import pygame as pg
+import pytest
+
+from pysurvive.lighting import Light, LightMap, get_gradient
+from pysurvive.map.occluders import OccluderGroup
+
+
+class TestLightMap:
+    @pytest.fixture()
+    def occluders(self):
+        """Room of 400x400 with a wall right of the center."""
+        rects = np.array([(256, y * 32, 32, 32) for y in range(4, 9)])
+        return OccluderGroup(rects, (0, 0, 400, 400))
+
+    @pytest.fixture()
+    def lightmap(self, setup_pygame):
+        return LightMap((400, 400), scale=4, ambient=(0, 0, 0), budget=1)
+
+    def test_get_gradient(self):
+        """Test that the gradient falls off from the center to the border."""
+        gradient = get_gradient(16, (255, 128, 0))
+        assert gradient.shape == (16, 16, 3)
+        assert tuple(gradient[8, 8]) > tuple(gradient[12, 8]) > (0, 0, 0)
+        assert not gradient[0, 0].any()
+        assert gradient[8, 8, 2] == 0
+
+    def test_get_gradient__cone(self):
+        """Test that a cone light is dark outside of the cone."""
+        gradient = get_gradient(16, (255, 255, 255), 0.0, math.radians(60))
+        assert gradient[12, 8].all()
+        assert not gradient[3, 8].any()
+        assert not gradient[8, 12].any()
+
+    def test_get_texture__cached(self, lightmap):
+        """Test that the textures are cached by size, color and direction."""
+        light = Light(100, 100, 50, spread=math.radians(60))
+        texture = lightmap.get_texture(20, light)
+        light.direction += 0.01
+        assert lightmap.get_texture(20, light) is texture
+        light.direction += math.pi
+        assert lightmap.get_texture(20, light) is not texture
+        lightmap.texture_cache_size = 1
+        lightmap.get_texture(10, light)
+        assert len(lightmap.textures) == 1
+
+    def test_render__shadow(self, lightmap, occluders):
+        """Test that the wall casts a shadow and the ambient light is kept."""
+        lightmap.ambient = (10, 10, 10)
+        lightmap.add(Light(200, 200, 150))
+        buffer = lightmap.render(pg.FRect(0, 0, 400, 400), occluders)
+        assert buffer.get_size() == (100, 100)
+        # Left of the light, behind the wall and outside of the light.
+        assert buffer.get_at((40, 50))[0] > 10
+        assert buffer.get_at((78, 50))[0] == 10
+        assert buffer.get_at((5, 5))[0] == 10
+
+    def test_render__lights_are_added(self, lightmap, occluders):
+        """Test that overlapping lights add up."""
+        rect = pg.FRect(0, 0, 400, 400)
+        lightmap.add(Light(100, 200, 100, (100, 0, 0)))
+        single = lightmap.render(rect, occluders).get_at((30, 50))
+        lightmap.add(Light(140, 200, 100, (0, 0, 100)))
+        both = lightmap.render(rect, occluders).get_at((30, 50))
+        assert both[0] == single[0] and both[2] > 0
+
+    def test_update__expired(self, lightmap):
+        """Test that short-lived lights are removed after their duration."""
+        lamp = Light(100, 100, 50)
+        lightmap.add(lamp)
+        lightmap.add(Light(100, 100, 50, duration=0.05))
+        lightmap.update(0.03)
+        assert len(lightmap.lights) == 2
+        lightmap.update(0.03)
+        assert lightmap.lights == [lamp]
+
+    def test_render__reduction(self, lightmap, occluders):
+        """Test that the least important lights are reduced over budget."""
+        rect = pg.FRect(0, 0, 400, 400)
+        flashlight = Light(200, 200, 150, spread=math.radians(60), priority=1)
+        lamp = Light(60, 60, 100)
+        lightmap.add(flashlight)
+        lightmap.add(lamp)
+        lightmap.budget = 0
+        lightmap.render(rect, occluders)
+        assert (flashlight.reduction, lamp.reduction) == (0, 1)
+        for _ in range(10):
+            lightmap.render(rect, occluders)
+        assert (flashlight.reduction, lamp.reduction) == (2, 2)
+
+        lightmap.budget = 1
+        for _ in range(4):
+            lightmap.render(rect, occluders)
+        assert (flashlight.reduction, lamp.reduction) == (0, 0)
@@ -0,0 +1,543 @@
+#!/usr/bin/env python
+# coding=utf-8
+import heapq
+import math
+import random
+
+import numpy as np
+import pytest
+import triangle as tr
+
+from pysurvive.map.level import Level
+from pysurvive.navmesh.astar import distance, find_nodes, find_path
+from pysurvive.navmesh.builder import (
+    get_chunk,
+    get_collider_rects,
+    get_outline,
+    get_walkable_grid,
+)
+from pysurvive.navmesh.builder import triangulate as triangulate_rects
+from pysurvive.navmesh.builder import triangulate_chunks
+from pysurvive.navmesh.cache import NavMeshCache
+from pysurvive.navmesh.flowfield import FlowField
+from pysurvive.navmesh.funnel import get_portals, shrink_portals, string_pull
+from pysurvive.navmesh.hierarchy import ClusterGraph
+from pysurvive.navmesh.locator import TriangleLocator
+from pysurvive.navmesh.mesh import NavMesh, build_mesh
+
+
+def triangulate(width, height, blocks):
+    """Triangulate a rectangular room with rectangular blocks (holes)."""
+    vertices = [(0, 0), (width, 0), (width, height), (0, height)]
+    segments = [(0, 1), (1, 2), (2, 3), (3, 0)]
+    holes = []
+    for x, y, w, h in blocks:
+        i = len(vertices)
+        vertices += [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+        segments += [(i, i + 1), (i + 1, i + 2), (i + 2, i + 3), (i + 3, i)]
+        holes.append((x + w / 2, y + h / 2))
+    result = tr.triangulate(
+        dict(vertices=vertices, segments=segments, holes=holes), "pq"
+    )
+    return build_mesh(result["vertices"].tolist(), result["triangles"].tolist())
+
+
+def get_triangle(mesh, point):
+    for triangle in mesh:
+        if triangle.is_point_in_triangle(point):
+            return triangle
+    return None
+
+
+def path_length(path):
+    return sum(distance(p1, p2) for p1, p2 in zip(path, path[1:]))
+
+
+def dijkstra(start, end, start_triangle, end_triangle):
+    """Reference: Shortest path length over the same graph."""
+    costs = {node: distance(start, node.position) for node in start_triangle.nodes}
+    queue = [(cost, id(node), node) for node, cost in costs.items()]
+    heapq.heapify(queue)
+    best = math.inf
+    while queue:
+        cost, _, node = heapq.heappop(queue)
+        if cost > costs[node]:
+            continue
+        if node in end_triangle.nodes:
+            best = min(best, cost + distance(node.position, end))
+        for neighbor in node.neighbors:
+            new_cost = cost + distance(node.position, neighbor.position)
+            if new_cost < costs.get(neighbor, math.inf):
+                costs[neighbor] = new_cost
+                heapq.heappush(queue, (new_cost, id(neighbor), neighbor))
+    return best
+
+
+class TestAStar:
+    @pytest.fixture(scope="class")
+    def mesh(self):
+        return triangulate(400, 300, [(100, 0, 20, 250), (250, 50, 20, 250)])
+
+    def test_build_mesh__shared_nodes(self, mesh):
+        """Test that adjacent triangles share the node of the common side."""
+        for triangle in mesh:
+            for node in triangle.nodes:
+                assert len(node.triangles) == 2
+                assert triangle in node.triangles
+
+    def test_build_mesh__neighbors(self, mesh):
+        """Test that neighbors are the triangles with a common side."""
+        for triangle in mesh:
+            neighbors = [
+                other
+                for other in mesh
+                if other is not triangle
+                and len(set(other.triangle) & set(triangle.triangle)) == 2
+            ]
+            assert set(map(id, triangle.neighbors)) == set(map(id, neighbors))
+            assert len(triangle.nodes) == len(neighbors)
+
+    def test_find_path__same_triangle(self, mesh):
+        """Test the path within a single triangle."""
+        triangle = mesh[0]
+        point = triangle.center
+        assert find_path(point, point, triangle, triangle) == [point, point]
+
+    def test_find_path__shortest(self, mesh):
+        """Test that the path is the shortest path of the graph."""
+        points = [(10, 10), (390, 10), (180, 290), (50, 280), (300, 20)]
+        for start in points:
+            for end in points:
+                start_triangle = get_triangle(mesh, start)
+                end_triangle = get_triangle(mesh, end)
+                if start_triangle is end_triangle:
+                    continue
+                path = find_path(start, end, start_triangle, end_triangle)
+                assert path[0] == start
+                assert path[-1] == end
+                assert path_length(path) == pytest.approx(
+                    dijkstra(start, end, start_triangle, end_triangle)
+                )
+
+    def test_find_path__around_walls(self, mesh):
+        """Test that the path goes around the walls."""
+        path = find_path(
+            (10, 10),
+            (390, 10),
+            get_triangle(mesh, (10, 10)),
+            get_triangle(mesh, (390, 10)),
+        )
+        # Below the first wall and above the second wall.
+        assert any(p[0] > 100 and p[1] > 250 for p in path)
+        assert any(p[0] > 250 and p[1] < 50 for p in path)
+
+
+class TestTriangleLocator:
+    @pytest.fixture(scope="class")
+    def mesh(self):
+        return triangulate(400, 300, [(100, 0, 20, 250), (250, 50, 20, 250)])
+
+    def test_locate(self, mesh):
+        """Test that the locator returns the triangle of the point."""
+        locator = TriangleLocator(mesh, cell_size=32)
+        rng = random.Random(3)
+        for _ in range(500):
+            point = (rng.uniform(-10, 410), rng.uniform(-10, 310))
+            hint = rng.choice(mesh + [None])
+            triangle = locator.locate(point, hint)
+            if triangle is None:
+                assert get_triangle(mesh, point) is None
+            else:
+                assert triangle.is_point_in_triangle(point)
+
+    def test_locate__walk(self, mesh):
+        """Test that the walk from the hint finds the neighbor triangles."""
+        locator = TriangleLocator(mesh)
+        for triangle in mesh:
+            for neighbor in triangle.neighbors:
+                assert locator._walk(neighbor.center, triangle) is neighbor
+
+
+class TestFunnel:
+    @pytest.fixture(scope="class")
+    def mesh(self):
+        return triangulate(400, 300, [(100, 0, 20, 250), (250, 50, 20, 250)])
+
+    @staticmethod
+    def smooth(mesh, start, end, radius=0.0):
+        start_triangle = get_triangle(mesh, start)
+        nodes = find_nodes(start, end, start_triangle, get_triangle(mesh, end))
+        portals = shrink_portals(get_portals(start_triangle, nodes), radius)
+        return string_pull(start, end, portals)
+
+    def test_string_pull__corners(self, mesh):
+        """Test that the path consists of the corners of the walls only."""
+        assert self.smooth(mesh, (10, 10), (390, 10)) == [
+            (10, 10),
+            (100, 250),
+            (120, 250),
+            (250, 50),
+            (390, 10),
+        ]
+
+    def test_string_pull__direct(self, mesh):
+        """Test that a path without obstacle is a direct line."""
+        assert self.smooth(mesh, (10, 10), (90, 290)) == [(10, 10), (90, 290)]
+        assert self.smooth(mesh, (130, 10), (240, 290)) == [(130, 10), (240, 290)]
+
+    def test_string_pull__radius(self, mesh):
+        """Test that the path keeps the radius to the walls."""
+        path = self.smooth(mesh, (10, 10), (390, 10), radius=5)
+        corners = [(100, 250), (120, 250), (250, 50), (270, 50)]
+        for point in path[1:-1]:
+            for corner in corners:
+                assert distance(point, corner) >= 5 - 1e-6
+        # Every segment is located on the navmesh.
+        for p1, p2 in zip(path, path[1:]):
+            for t in range(101):
+                point = (
+                    p1[0] + (p2[0] - p1[0]) * t / 100,
+                    p1[1] + (p2[1] - p1[1]) * t / 100,
+                )
+                assert get_triangle(mesh, point) is not None
+
+    def test_string_pull__shorter(self, mesh):
+        """Test that the smoothed path is not longer than the raw path."""
+        points = [(10, 10), (390, 10), (180, 290), (50, 280), (300, 20)]
+        for start in points:
+            for end in points:
+                raw = find_path(
+                    start, end, get_triangle(mesh, start), get_triangle(mesh, end)
+                )
+                assert (
+                    path_length(self.smooth(mesh, start, end))
+                    <= path_length(raw) + 1e-6
+                )
+
+
+class TestBuilder:
+    # A room (walls of 32 px) with an L-shaped block in the middle.
+    bounds = (0, 0, 256, 192)
+    rects = np.array(
+        [
+            (0, 0, 256, 32),
+            (0, 160, 256, 32),
+            (0, 32, 32, 128),
+            (224, 32, 32, 128),
+            (96, 64, 32, 32),
+            (128, 64, 32, 10),
+        ]
+    )
+
+    @staticmethod
+    def area(vertices, triangles):
+        a, b, c = (vertices[triangles[:, i]] for i in range(3))
+        cross = (b - a)[:, 0] * (c - a)[:, 1] - (b - a)[:, 1] * (c - a)[:, 0]
+        return np.abs(cross).sum() / 2
+
+    def test_walkable_grid(self):
+        """Test that the walkable cells are the area without the rects."""
+        xs, ys, walkable = get_walkable_grid(self.bounds, self.rects)
+        widths = np.diff(xs)[np.newaxis, :]
+        heights = np.diff(ys)[:, np.newaxis]
+        assert (walkable * widths * heights).sum() == 192 * 128 - 32 * 32 - 32 * 10
+
+    def test_outline(self):
+        """Test that the collinear edges are merged into a single segment."""
+        xs, ys, walkable = get_walkable_grid(self.bounds, self.rects)
+        segments = get_outline(xs, ys, walkable)
+        # 4 sides of the room and 6 sides of the L-shaped block.
+        assert len(segments) == 10
+        assert ((32.0, 32.0), (224.0, 32.0)) in segments
+
+    def test_outline__diagonal(self):
+        """Test that the outline is split where two cells touch diagonally."""
+        xs, ys, walkable = get_walkable_grid(
+            (0, 0, 20, 20), np.array([(0, 0, 10, 10), (10, 10, 10, 10)])
+        )
+        segments = get_outline(xs, ys, walkable)
+        assert len(segments) == 8
+        assert all(
+            10.0 in (p1[0], p2[0]) or 10.0 in (p1[1], p2[1]) for p1, p2 in segments
+        )
+
+    def test_triangulate(self):
+        """Test that the triangles cover exactly the walkable area."""
+        vertices, triangles = triangulate_rects(self.bounds, self.rects)
+        assert self.area(vertices, triangles) == pytest.approx(
+            192 * 128 - 32 * 32 - 32 * 10
+        )
+        # No additional vertices (minimal number of triangles).
+        assert len(vertices) == 10
+        centers = vertices[triangles].mean(axis=1)
+        for x0, y0, w, h in self.rects.tolist():
+            inside = (
+                (centers[:, 0] > x0)
+                & (centers[:, 0] < x0 + w)
+                & (centers[:, 1] > y0)
+                & (centers[:, 1] < y0 + h)
+            )
+            assert not inside.any()
+
+    def test_triangulate__blocked(self):
+        """Test that a completely blocked area has no triangles."""
+        vertices, triangles = triangulate_rects(
+            (0, 0, 10, 10), np.array([(0, 0, 10, 10)])
+        )
+        assert not len(vertices)
+        assert not len(triangles)
+
+    def test_navmesh__level(self, setup_pygame, map_file):
+        """Test that the path of the navmesh of the level avoids the walls."""
+        navmesh = NavMesh(Level(str(map_file)))
+        path = navmesh.get_astar_path((80, 80), (176, 112))
+        assert path[0] == (80, 80)
+        assert path[-1] == (176, 112)
+        for x, y in path:
+            assert 32 <= x <= 224 and 32 <= y <= 160
+        assert navmesh.get_triangle((10, 10)) is None
+
+    def test_navmesh__cache(self, setup_pygame, map_file):
+        """Test that the navmesh from the cache equals the built navmesh."""
+        level = Level(str(map_file))
+        built = NavMesh(level)
+        assert NavMeshCache(map_file, 256).load(get_collider_rects(level)) is not None
+        cached = NavMesh(level)
+        assert [t.triangle for t in cached.mesh] == [t.triangle for t in built.mesh]
+        assert [[n.position for n in t.nodes] for t in cached.mesh] == [
+            [n.position for n in t.nodes] for t in built.mesh
+        ]
+
+    def test_navmesh__path(self, setup_pygame, map_file):
+        """Test the smoothed path and the direct line query on the level."""
+        navmesh = NavMesh(Level(str(map_file)))
+        assert navmesh.is_walkable_line((40, 40), (216, 40))
+        assert not navmesh.is_walkable_line((80, 80), (176, 80))
+        assert not navmesh.is_walkable_line((40, 40), (216, 40), radius=16)
+        assert navmesh.get_path((40, 100), (200, 120), radius=0) == [
+            (40, 100),
+            (200, 120),
+        ]
+        path = navmesh.get_path((80, 80), (176, 80), radius=0)
+        assert len(navmesh.get_path((80, 80), (176, 80), radius=8)) == 4
+        assert path == [(80, 80), (96, 64), (160, 64), (176, 80)]
+        for p1, p2 in zip(path, path[1:]):
+            assert navmesh.is_walkable_line(p1, p2)
+
+
+class TestFlowField:
+    @pytest.fixture(scope="class")
+    def mesh(self):
+        return triangulate(400, 300, [(100, 0, 20, 250), (250, 50, 20, 250)])
+
+    def test_update__same_triangle(self, mesh):
+        """Test that the field is only recomputed on another triangle."""
+        field = FlowField(mesh)
+        triangle = get_triangle(mesh, (390, 10))
+        assert field.update((390, 10), triangle)
+        assert not field.update(triangle.center, triangle)
+        assert field.target == triangle.center
+        assert field.update((10, 10), get_triangle(mesh, (10, 10)))
+
+    def test_get_distance(self, mesh):
+        """Test that the distances equal the shortest paths of the graph."""
+        target = (390, 10)
+        target_triangle = get_triangle(mesh, target)
+        field = FlowField(mesh)
+        field.update(target, target_triangle)
+        for triangle in mesh[::7]:
+            if triangle is target_triangle:
+                continue
+            assert field.get_distance(triangle) == pytest.approx(
+                dijkstra(triangle.center, target, triangle, target_triangle)
+            )
+
+    def test_get_direction(self, mesh):
+        """Test that following the directions leads to the target."""
+        target = (390, 10)
+        field = FlowField(mesh)
+        field.update(target, get_triangle(mesh, target))
+        point = (10, 10)
+        for _ in range(1000):
+            triangle = get_triangle(mesh, point)
+            assert triangle is not None
+            dx, dy = field.get_direction(point, triangle)
+            if (dx, dy) == (0.0, 0.0):
+                break
+            point = (point[0] + dx, point[1] + dy)
+        assert distance(point, target) < 1
+
+
+class TestClusterGraph:
+    @pytest.fixture(scope="class")
+    def mesh(self):
+        return triangulate(400, 300, [(100, 0, 20, 250), (250, 50, 20, 250)])
+
+    @pytest.fixture(scope="class")
+    def graph(self, mesh):
+        return ClusterGraph(mesh, cluster_size=100)
+
+    def test_entrances(self, graph):
+        """Test that the entrances are located between two clusters."""
+        for entrances in graph.entrances.values():
+            for entrance in entrances:
+                clusters = {graph.get_cluster(t.center) for t in entrance.triangles}
+                assert len(clusters) == 2
+
+    def test_edges(self, graph):
+        """Test that the edges are symmetric and not shorter than a line."""
+        for cluster_edges in graph.edges.values():
+            for entrance, edges in cluster_edges.items():
+                for other, cost in edges.items():
+                    assert cluster_edges[other][entrance] == pytest.approx(cost)
+                    assert cost >= distance(entrance.position, other.position) - 1e-6
+
+    def test_find_path__same_cluster(self, mesh, graph):
+        """Test that there is no abstract path within a cluster."""
+        triangle = get_triangle(mesh, (10, 10))
+        assert graph.find_path((10, 10), (20, 20), triangle, triangle) is None
+
+    def test_find_path(self, mesh, graph):
+        """Test the refined first segment and the entrances of the path."""
+        start, end = (10, 10), (390, 10)
+        start_triangle = get_triangle(mesh, start)
+        path = graph.find_path(start, end, start_triangle, get_triangle(mesh, end))
+        assert path[0] == start
+        assert path[-1] == end
+        # Around both walls.
+        assert any(p[0] > 100 and p[1] > 250 for p in path)
+        assert any(p[0] > 250 and p[1] < 50 for p in path)
+        # The first segment leads through adjacent triangles of the start cluster.
+        nodes = {node.position: node for t in mesh for node in t.nodes}
+        first = nodes[path[1]]
+        assert first in start_triangle.nodes
+        cluster = graph.get_cluster(start_triangle.center)
+        for p1, p2 in zip(path[1:], path[2:]):
+            node = nodes[p1]
+            if node in graph.entrances[cluster]:
+                break
+            assert any(
+                nodes[p2] in t.nodes and graph.get_cluster(t.center) == cluster
+                for t in node.triangles
+            )
+
+
+def check_mesh(mesh):
+    """Test that the adjacency of the triangles is consistent."""
+    sides = {}
+    for triangle in mesh:
+        for i in range(3):
+            side = (triangle.triangle[i], triangle.triangle[(i + 1) % 3])
+            sides.setdefault((min(side), max(side)), []).append(triangle)
+    for triangle in mesh:
+        assert len(triangle.nodes) == len(triangle.neighbors)
+        for neighbor in triangle.neighbors:
+            assert any(n is triangle for n in neighbor.neighbors)
+            assert len(set(neighbor.triangle) & set(triangle.triangle)) == 2
+        for node in triangle.nodes:
+            assert any(t is triangle for t in node.triangles)
+            for other in node.neighbors:
+                assert any(other in t.nodes for t in node.triangles)
+    for side_triangles in sides.values():
+        assert len(side_triangles) <= 2
+        if len(side_triangles) == 2:
+            assert any(n is side_triangles[1] for n in side_triangles[0].neighbors)
+    # No T-junctions: A vertex is never located inside the side of another
+    # triangle.
+    vertices = {point for triangle in mesh for point in triangle.triangle}
+    for p1, p2 in sides:
+        for x, y in vertices:
+            if p1[0] == p2[0] == x:
+                assert not min(p1[1], p2[1]) < y < max(p1[1], p2[1])
+            elif p1[1] == p2[1] == y:
+                assert not min(p1[0], p2[0]) < x < max(p1[0], p2[0])
+
+
+class TestChunks:
+    bounds = (0, 0, 400, 300)
+    # The last rect ends on the border of a chunk.
+    rects = np.array(
+        [(100, 0, 20, 250), (250, 50, 20, 250), (30, 60, 10, 20), (140, 100, 20, 28)]
+    )
+
+    def test_triangulate_chunks(self):
+        """Test that the chunks cover the walkable area without T-junctions."""
+        vertices, triangles = triangulate_chunks(self.bounds, self.rects, 64)
+        area = TestBuilder.area(vertices, triangles)
+        assert area == pytest.approx(
+            400 * 300 - 20 * 250 - 20 * 250 - 10 * 20 - 20 * 28
+        )
+        check_mesh(build_mesh(vertices.tolist(), triangles.tolist()))
+
+    def test_triangulate_chunks__in_chunk(self):
+        """Test that every triangle is located in a single chunk."""
+        vertices, triangles = triangulate_chunks(self.bounds, self.rects, 64)
+        for triangle in vertices[triangles]:
+            cx, cy = get_chunk(triangle.mean(axis=0), 64)
+            for x, y in triangle:
+                assert cx * 64 <= x <= (cx + 1) * 64
+                assert cy * 64 <= y <= (cy + 1) * 64
+
+
+class TestNavMeshUpdate:
+    @pytest.fixture
+    def navmesh(self, setup_pygame, map_file):
+        return NavMesh(Level(str(map_file)), chunk_size=64)
+
+    @staticmethod
+    def triangles(navmesh):
+        return sorted(tuple(sorted(t.triangle)) for t in navmesh.mesh)
+
+    def test_block_region(self, navmesh):
+        """Test that a blocked region disconnects the navmesh."""
+        path = navmesh.get_path((80, 80), (200, 120), radius=0)
+        assert path
+        navmesh.block_region((160, 32, 16, 128))
+        check_mesh(navmesh.mesh)
+        assert navmesh.get_triangle((168, 100)) is None
+        assert navmesh.get_path((80, 80), (200, 120), radius=0) == []
+        assert navmesh.is_path_affected(path, 0)
+        assert not navmesh.is_path_affected(path, navmesh.revision)
+
+    def test_block_region__stale_hint(self, navmesh):
+        """Test that a removed triangle is not used as hint anymore."""
+        hint = navmesh.get_triangle((168, 100))
+        navmesh.block_region((160, 32, 16, 128))
+        assert hint.index is None and not hint.neighbors
+        assert navmesh.get_triangle((168, 100), hint) is None
+        assert navmesh.get_path((168, 100), (200, 120), start_hint=hint) == []
+        assert navmesh.get_flow_direction((168, 100), hint) == ((0.0, 0.0), None)
+
+    def test_unblock_region(self, navmesh):
+        """Test that the unblocked region restores the navmesh."""
+        triangles = self.triangles(navmesh)
+        navmesh.block_region((160, 32, 16, 128))
+        navmesh.unblock_region((160, 32, 16, 128))
+        check_mesh(navmesh.mesh)
+        assert self.triangles(navmesh) == triangles
+        assert navmesh.get_path((80, 80), (200, 120), radius=0)
+        assert [t.index for t in navmesh.mesh] == list(range(len(navmesh.mesh)))
+
+    def test_block_region__flow_field(self, navmesh):
+        """Test that the flow field is recomputed after an update."""
+        navmesh.update_flow_field((200, 120))
+        navmesh.block_region((160, 32, 16, 128))
+        navmesh.update_flow_field((200, 120))
+        direction, triangle = navmesh.get_flow_direction((80, 80))
+        assert direction == (0.0, 0.0)
+        assert navmesh.flow_field.get_distance(triangle) == math.inf
+
+    def test_block_region__clusters(self, navmesh):
+        """Test that the updated cluster graph equals a new cluster graph."""
+        navmesh._clusters = ClusterGraph(navmesh.mesh, cluster_size=64)
+        navmesh.block_region((160, 32, 16, 128))
+        expected = ClusterGraph(navmesh.mesh, cluster_size=64)
+        clusters = navmesh.clusters
+        for cluster, edges in expected.edges.items():
+            assert {
+                entrance.position: {o.position: c for o, c in costs.items()}
+                for entrance, costs in edges.items()
+            } == {
+                entrance.position: {o.position: c for o, c in costs.items()}
+                for entrance, costs in clusters.edges.get(cluster, {}).items()
+            }
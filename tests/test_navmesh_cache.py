@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# coding=utf-8
+import numpy as np
+
+from pysurvive.navmesh.builder import get_adjacency, triangulate
+from pysurvive.navmesh.cache import NavMeshCache
+
+BOUNDS = (0, 0, 256, 192)
+RECTS = np.array([(0, 0, 256, 32), (96, 64, 32, 32)], dtype=np.float64)
+
+
+class TestNavMeshCache:
+    @staticmethod
+    def save(cache, rects=RECTS):
+        vertices, triangles = triangulate(BOUNDS, rects)
+        adjacency = get_adjacency(triangles)
+        cache.save(rects, vertices, triangles, adjacency)
+        return vertices, triangles, adjacency
+
+    def test_load__without_cache(self, map_file):
+        """Test that there is no navmesh without cache file."""
+        assert NavMeshCache(map_file, 256).load(RECTS) is None
+
+    def test_load__saved(self, map_file):
+        """Test that the cache file contains the memory-mapped arrays."""
+        saved = self.save(NavMeshCache(map_file, 256))
+        loaded = NavMeshCache(map_file, 256).load(RECTS)
+        for array, cached in zip(saved, loaded):
+            assert isinstance(cached.base, np.memmap)
+            assert np.array_equal(array, cached)
+
+    def test_load__changed_map_file(self, map_file):
+        """Test that the cache is invalid if the map file changed."""
+        self.save(NavMeshCache(map_file, 256))
+        map_file.write_text(map_file.read_text().replace('"ground"', '"floor"'))
+        assert NavMeshCache(map_file, 256).load(RECTS) is None
+
+    def test_load__changed_colliders(self, map_file):
+        """Test that the cache is invalid if the colliders changed."""
+        self.save(NavMeshCache(map_file, 256))
+        assert NavMeshCache(map_file, 256).load(RECTS[:1]) is None
+
+    def test_load__invalid_cache_file(self, map_file):
+        """Test that an invalid cache file is ignored."""
+        cache = NavMeshCache(map_file, 256)
+        cache.cache_file.write_bytes(b"invalid")
+        assert cache.load(RECTS) is None
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# coding=utf-8
+import numpy as np
+import pygame as pg
+
+from pysurvive.map.level import Level
+from pysurvive.map.occluders import OccluderGroup
+
+
+class TestOccluderGroup:
+    def test_occluders__merged_outline(self):
+        """Test that the edges of adjacent tiles are merged into the outline."""
+        rects = np.array([(x * 32, 64, 32, 32) for x in range(2, 6)])
+        occluders = OccluderGroup(rects, (0, 0, 320, 320))
+        segments = {tuple(segment) for segment in occluders}
+        # The sides of the bounds and the 4 sides of the wall.
+        assert len(occluders) == 8
+        assert (64, 64, 192, 64) in segments
+        assert (64, 96, 192, 96) in segments
+        assert (64, 64, 64, 96) in segments
+        assert (192, 64, 192, 96) in segments
+
+    def test_occluders__wall_at_border(self):
+        """Test that walls at the border of the bounds have no outer edges."""
+        rects = np.array([(0, y * 32, 32, 32) for y in range(10)])
+        occluders = OccluderGroup(rects, (0, 0, 320, 320))
+        segments = {tuple(segment) for segment in occluders}
+        assert (32, 0, 32, 320) in segments
+        assert not any(x1 == x2 == 0 for x1, _, x2, _ in segments)
+
+    def test_get_segments__clipped(self):
+        """Test that the segments are clipped to the query rect."""
+        rects = np.array([(64, 64, 128, 32)])
+        occluders = OccluderGroup(rects, (0, 0, 1024, 1024))
+        segments = occluders.get_segments(pg.FRect(100, 50, 200, 100))
+        assert sorted(map(tuple, segments.tolist())) == [
+            (100, 64, 192, 64),
+            (100, 96, 192, 96),
+            (192, 64, 192, 96),
+        ]
+        assert not len(occluders.get_segments(pg.FRect(300, 300, 10, 10)))
+
+    def test_level__occluders(self, setup_pygame, map_file):
+        """Test that the level builds the occluders from the bullet colliders."""
+        level = Level(str(map_file))
+        assert len(level.occluders) == 10
+        segments = level.occluders.get_segments(pg.FRect(0, 0, 256, 192))
+        assert len(segments) == 10
+
+    def test_update(self):
+        """Test that the segments are rebuilt and the version is increased."""
+        occluders = OccluderGroup(np.array([(64, 64, 32, 32)]), (0, 0, 320, 320))
+        occluders.update(np.zeros((0, 4)))
+        assert occluders.version == 1
+        assert len(occluders) == 4
+        assert not len(occluders.get_segments(pg.FRect(64, 64, 32, 32)))
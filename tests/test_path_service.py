@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# coding=utf-8
+from concurrent import futures
+
+import pytest
+
+from pysurvive.map.level import Level
+from pysurvive.navmesh.mesh import NavMesh
+from pysurvive.navmesh.service import PathService
+
+
+class TestPathService:
+    @pytest.fixture
+    def service(self, setup_pygame, map_file):
+        service = PathService(NavMesh(Level(str(map_file))), budget=1.0)
+        yield service
+        service.shutdown()
+
+    def test_request(self, service):
+        """Test that the path is searched after the next frame."""
+        future = service.request((80, 80), (176, 80), radius=0)
+        assert not future.done()
+        service.update()
+        assert future.result(timeout=5) == service.navmesh.get_path(
+            (80, 80), (176, 80), radius=0
+        )
+
+    def test_request__coalesced(self, service):
+        """Test that identical requests share a single search."""
+        future_1 = service.request((80, 80), (176, 80))
+        future_2 = service.request((80.2, 79.8), (176, 80))
+        future_3 = service.request((80, 80), (176, 80), radius=0)
+        assert future_1 is future_2
+        assert future_1 is not future_3
+        assert len(service.queue) == 2
+        service.update()
+        assert future_1.result(timeout=5) == future_2.result(timeout=5)
+        future_3.result(timeout=5)
+        assert not service.pending
+
+    def test_update__budget(self, service):
+        """Test that nothing is searched without a budget."""
+        service.budget = 0
+        future = service.request((80, 80), (176, 80))
+        service.update()
+        with pytest.raises(futures.TimeoutError):
+            future.result(timeout=0.1)
+        service.budget = 1.0
+        service.update()
+        assert future.result(timeout=5)
+
+    def test_shutdown(self, service):
+        """Test that the queued requests are cancelled on shutdown."""
+        future = service.request((80, 80), (176, 80))
+        service.shutdown()
+        assert future.cancelled()
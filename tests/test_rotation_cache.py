@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+
+import pygame as pg
+import pytest
+
+from pysurvive.config import RED
+from pysurvive.player.misc import RotatableImage, RotationCache
+
+
+class TestRotationCache:
+    @pytest.fixture()
+    def image(self):
+        surface = pg.Surface((64, 64), pg.SRCALPHA)
+        pg.draw.rect(surface, RED, (8, 12, 40, 10))
+        return RotatableImage(surface)
+
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        _cache = RotationCache()
+        monkeypatch.setattr(RotatableImage, "cache", _cache)
+        return _cache
+
+    def test_rotate__cached(self, image, cache):
+        """Test that a rotation is cached with its bounding rect."""
+        rotated, bounding_rect = image.rotate_with_bounding_rect(math.pi / 3)
+        assert len(cache) == 1
+        assert bounding_rect == rotated.get_bounding_rect()
+        # Angles within the same step share the cache entry.
+        assert image.rotate(math.pi / 3 + 0.001) is rotated
+        assert len(cache) == 1
+
+    def test_quantize(self):
+        """Test that the angles are quantized to the step."""
+        assert RotatableImage.quantize(5, step=2) == 4
+        assert RotatableImage.quantize(-1, step=2) == 358
+        assert RotatableImage.quantize(-360, step=2) == 0
+        assert RotatableImage.quantize(359, step=1) == 359
+
+    def test_put__budget(self, image, cache):
+        """Test that the least recently used rotations are dropped."""
+        image.rotated(0)
+        cache.budget = cache.memory * 2
+        image.rotated(90)
+        image.rotated(0)
+        image.rotated(180)
+        assert [degree for _, degree in cache.entries] == [0, 180]
+        assert cache.memory <= cache.budget
+
+    def test_prefill(self, image, cache):
+        """Test that the cache is filled in the background."""
+        cache.prefill([image], step=30).join()
+        assert len(cache) == 12
+
+    def test_prefill__budget(self, image, cache):
+        """Test that the prefill stops at the budget without dropping entries."""
+        image.rotated(45)
+        cache.budget = cache.memory * 4
+        cache.prefill([image], step=30).join()
+        assert (id(image), 45) in cache.entries
+        assert 1 < len(cache) < 12
+        assert cache.memory <= cache.budget
+
+    def test_release(self, cache):
+        """Test that the rotations of a freed image are dropped."""
+        image = RotatableImage(pg.Surface((32, 32)))
+        image.rotated(0)
+        image.rotated(90)
+        assert len(cache) == 2
+        del image
+        assert not len(cache)
+        assert cache.memory == 0
+        assert not cache.degrees
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# coding=utf-8
+import pygame as pg
+import pytest
+
+from pysurvive.map.spatial import SpatialHashGrid
+
+
+class TestSpatialHashGrid:
+    @pytest.fixture()
+    def grid(self):
+        grid = SpatialHashGrid(cell_size=64)
+        for y in range(10):
+            for x in range(10):
+                grid.insert((x, y), pg.FRect(x * 32, y * 32, 32, 32))
+        return grid
+
+    def test_query__returns_colliding_items(self, grid):
+        """Test that only items colliding with the rect are returned."""
+        items = grid.query(pg.FRect(40, 40, 40, 10))
+        assert items == [(1, 1), (2, 1)]
+
+    def test_query__keeps_insertion_order(self, grid):
+        """Test that the query result is ordered like the insertion."""
+        items = grid.query(pg.FRect(0, 0, 320, 320))
+        assert items == [(x, y) for y in range(10) for x in range(10)]
+
+    def test_query__large_item_without_duplicates(self):
+        """Test that items spanning multiple cells are returned once."""
+        grid = SpatialHashGrid(cell_size=16)
+        grid.insert("large", pg.FRect(0, 0, 100, 100))
+        assert grid.query(pg.FRect(10, 10, 80, 80)) == ["large"]
+        assert len(grid.query_indices(pg.FRect(0, 0, 100, 100))) == 1
+
+    def test_query__outside(self, grid):
+        """Test a query outside of every item."""
+        assert not grid.query(pg.FRect(-100, -100, 50, 50))
+        assert not grid.query(pg.FRect(320, 0, 10, 10))
+
+    def test_remove(self, grid):
+        """Test that a removed item is not returned and keeps the indices."""
+        grid.remove(11)
+        assert grid.query(pg.FRect(40, 40, 40, 10)) == [(2, 1)]
+        assert len(grid) == 99
+        assert (1, 1) not in list(grid)
+        index = grid.insert((1, 1), pg.FRect(32, 32, 32, 32))
+        assert index == 100
+        assert grid.query(pg.FRect(40, 40, 40, 10)) == [(2, 1), (1, 1)]
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# coding=utf-8
+import os
+import pickle
+
+import pygame as pg
+import pytest
+
+from pysurvive.config import BLUE, IMAGE_DIR, RED
+from pysurvive.player.misc import FRAME_BUFFER_DIR, Spritesheet
+
+
+class TestSpritesheet:
+    @pytest.fixture()
+    def spritesheet_path(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        path = tmp_path / IMAGE_DIR / "test"
+        path.mkdir(parents=True)
+        image = pg.Surface((3 * 64, 64), pg.SRCALPHA)
+        for frame, color in enumerate((RED, BLUE)):
+            image.fill(color, (frame * 64, 0, 64, 64))
+        pg.image.save(image, str(path / Spritesheet.spritesheet_name))
+        return "test"
+
+    def test_attach(self, spritesheet_path):
+        """Test that the frames are scaled into the frame buffer."""
+        spritesheet = Spritesheet(spritesheet_path, sprite_size=64)
+        assert not len(spritesheet)
+        spritesheet.attach()
+        assert len(spritesheet) == 3
+        assert spritesheet[0].image.get_size() == (32, 32)
+        assert spritesheet[0].image.get_at((16, 16)) == RED
+        assert spritesheet[1].image.get_at((16, 16)) == BLUE
+        assert spritesheet[2].image.get_at((16, 16)).a == 0
+
+    def test_attach__pickled(self, spritesheet_path):
+        """Test that only the name of the frame buffer is pickled."""
+        spritesheet = pickle.loads(
+            pickle.dumps(Spritesheet(spritesheet_path, sprite_size=64))
+        )
+        assert len(pickle.dumps(spritesheet)) < 1024
+        spritesheet.attach()
+        assert spritesheet[1].image.get_at((0, 0)) == BLUE
+
+    def test_discard(self, spritesheet_path):
+        """Test that the frame buffer of a dropped spritesheet is removed."""
+        spritesheet = Spritesheet(spritesheet_path, sprite_size=64)
+        frame_buffer_file = spritesheet.frame_buffer_file
+        assert os.path.exists(frame_buffer_file)
+        spritesheet.discard()
+        assert not os.path.exists(frame_buffer_file)
+        spritesheet.attach()
+        assert not len(spritesheet)
+
+    def test_split_spritesheet__error(self, spritesheet_path, monkeypatch):
+        """Test that the frame buffer is removed if the frames can't be written."""
+        files = set(os.listdir(FRAME_BUFFER_DIR))
+
+        def smoothscale(*args):
+            raise pg.error("out of memory")
+
+        monkeypatch.setattr(pg.transform, "smoothscale", smoothscale)
+        with pytest.raises(pg.error):
+            Spritesheet(spritesheet_path, sprite_size=64)
+        assert set(os.listdir(FRAME_BUFFER_DIR)) == files
+
+    def test_missing_directory(self, tmp_path, monkeypatch):
+        """Test that a missing spritesheet contains no frames."""
+        monkeypatch.chdir(tmp_path)
+        spritesheet = Spritesheet("missing")
+        spritesheet.attach()
+        assert not len(spritesheet)
@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 # coding=utf-8
+import numpy as np
 import pytest
 
 from pysurvive.config import COLORKEY
+from pysurvive.map.cache import LevelCache
 from pysurvive.map.tileset import Tileset
 
 
@@ -19,3 +21,20 @@ class TestTileset:
         tile_table = Tileset._load(tileset, 64, 64)
         for tile in tile_table:
             assert tile.get_at((0, 0)) == COLORKEY
+
+
+class TestTilesetBoundingRects:
+    def test_load__bounding_rects(self, setup_pygame, map_file):
+        """Test that the precomputed bounding rects are used."""
+        compiled = LevelCache(map_file).compile()
+        bounding_rects = np.array(compiled.bounding_rects)
+        bounding_rects[4] = (1, 2, 3, 4)
+        tileset = Tileset(compiled.tilesets[3], bounding_rects)
+        assert tuple(tileset.get_tile(4).bounding_rect) == (1, 2, 3, 4)
+
+    def test_load__bounding_rects_mismatch(self, setup_pygame, map_file):
+        """Test that bounding rects not matching the tileset are computed again."""
+        compiled = LevelCache(map_file).compile()
+        tileset = Tileset(compiled.tilesets[3], compiled.bounding_rects[:4])
+        assert tileset.bounding_rects is None
+        assert tuple(tileset.get_tile(4).bounding_rect) == (0, 0, 32, 10)
@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+# coding=utf-8
+import numpy as np
+
+from pysurvive.utils import load_arrays, save_arrays
+
+
+class TestArrays:
+    def test_save_arrays(self, tmp_path):
+        """Test that the arrays are stored and the arguments are not modified."""
+        column = np.arange(12, dtype=np.int32).reshape(3, 4)[:, 1]
+        arrays = {"column": column, "empty": np.zeros((0, 4))}
+        save_arrays(tmp_path / "arrays", {"name": "test"}, arrays)
+        assert arrays["column"] is column
+        header, loaded = load_arrays(tmp_path / "arrays")
+        assert header == {"name": "test"}
+        assert loaded["column"].tolist() == [1, 5, 9]
+        assert loaded["empty"].shape == (0, 4)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# coding=utf-8
+import math
+
+import numpy as np
+import pygame as pg
+import pytest
+
+from pysurvive.class_toolchain import intersect_rays
+from pysurvive.visibility import (
+    VisibilityCache,
+    get_angular_intervals,
+    get_visibility_polygon,
+)
+
+
+def get_rect_segments(x, y, width, height):
+    return [
+        (x, y, x + width, y),
+        (x + width, y, x + width, y + height),
+        (x + width, y + height, x, y + height),
+        (x, y + height, x, y),
+    ]
+
+
+class TestVisibility:
+    @pytest.fixture()
+    def segments(self):
+        """Room of 400x300 with some blocks (touching each other)."""
+        segments = get_rect_segments(0, 0, 400, 300)
+        for rect in (
+            (50, 50, 40, 40),
+            (90, 50, 40, 20),
+            (250, 100, 20, 120),
+            (150, 220, 60, 30),
+            (300, 30, 30, 30),
+        ):
+            segments += get_rect_segments(*rect)
+        return np.array(segments, dtype=np.float64)
+
+    def test_get_angular_intervals__split(self):
+        """Test that segments crossing the angle pi are split."""
+        intervals = get_angular_intervals((0, 0), [(-10, 5, -10, -5), (5, 0, 10, 0)])
+        assert intervals == [
+            (0, pytest.approx(math.atan2(5, -10)), math.pi, 0, 2),
+            (0, -math.pi, pytest.approx(math.atan2(-5, -10)), 2, 1),
+        ]
+
+    def test_get_visibility_polygon__room(self):
+        """Test that the polygon of an empty room are its corners."""
+        polygon = get_visibility_polygon((100, 50), get_rect_segments(0, 0, 400, 300))
+        assert polygon == [
+            pytest.approx((0, 0)),
+            pytest.approx((400, 0)),
+            pytest.approx((400, 300)),
+            pytest.approx((0, 300)),
+        ]
+
+    def test_get_visibility_polygon__bounds(self):
+        """Test that the bounds are added as segments."""
+        polygon = get_visibility_polygon((100, 50), [], pg.Rect(0, 0, 400, 300))
+        assert len(polygon) == 4
+        assert (400, 300) == pytest.approx(polygon[2])
+
+    @pytest.mark.parametrize(
+        "origin", [(200.5, 150.25), (20, 20), (260, 90), (100, 90)]
+    )
+    def test_get_visibility_polygon__like_rays(self, segments, origin):
+        """Test that the border of the polygon is the closest hit of each ray."""
+        polygon = np.array(get_visibility_polygon(origin, segments))
+        edges = np.hstack([polygon, np.roll(polygon, -1, axis=0)])
+        angles = np.random.default_rng(0).uniform(-math.pi, math.pi, 500)
+        _, _, expected = intersect_rays(*origin, angles, segments)
+        _, _, params = intersect_rays(*origin, angles, edges)
+        assert params == pytest.approx(expected)
+
+    def test_get_visibility_polygon__gap(self):
+        """Test that the polygon is closed at the origin without a segment."""
+        polygon = get_visibility_polygon((0, 0), [(10, -10, 10, 10)])
+        assert polygon == [
+            pytest.approx((10, -10)),
+            pytest.approx((10, 10)),
+            (0, 0),
+        ]
+
+
+class TestVisibilityCache:
+    @pytest.fixture()
+    def segments(self):
+        """Room of 400x300 with a grid of blocks."""
+        segments = get_rect_segments(0, 0, 400, 300)
+        for x in range(40, 360, 60):
+            for y in range(40, 260, 60):
+                segments += get_rect_segments(x, y, 20, 20)
+        return np.array(segments, dtype=np.float64)
+
+    def test_get_polygon__quantized(self, segments):
+        """Test that the last polygon is returned for a small move."""
+        cache = VisibilityCache(quantum=2)
+        polygon = cache.get_polygon((30.2, 30.2), segments, version=0)
+        assert cache.get_polygon((30.6, 29.8), segments, version=0) is polygon
+        # Another version of the segments or no version at all.
+        polygon = cache.get_polygon((30.6, 29.8), segments, version=1)
+        assert polygon is not cache.get_polygon((30.6, 29.8), segments, version=0)
+        polygon = cache.get_polygon((30.6, 29.8), segments)
+        assert polygon is not cache.get_polygon((30.6, 29.8), segments)
+
+    def test_get_polygon__incremental(self, segments):
+        """Test that a moving viewer sweeps only some sectors again."""
+        cache = VisibilityCache(sectors=32, quantum=1e-6)
+        cache.get_polygon((30, 30), segments, version=0)
+        assert cache.swept == 32
+
+        swept = 0
+        for step in range(1, 50):
+            origin = (30 + step * 0.5, 30 + step * 0.2)
+            polygon = cache.get_polygon(origin, segments, version=0)
+            swept += cache.swept
+            assert polygon == pytest.approx(get_visibility_polygon(origin, segments))
+        assert swept < 49 * 32 / 2
+
+    def test_get_polygon__bounds_changed(self, segments):
+        """Test that all sectors are swept again if the bounds changed."""
+        cache = VisibilityCache(sectors=8)
+        cache.get_polygon((30, 30), segments, pg.Rect(0, 0, 400, 300), version=0)
+        cache.get_polygon((40, 30), segments, pg.Rect(0, 0, 300, 300), version=0)
+        assert cache.swept == 8